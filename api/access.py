@@ -0,0 +1,74 @@
+"""
+Portfolio access policy for HackWestTX Class Portfolio
+Expresses who may see a ClassPortfolio as one composable Q filter so that
+listing endpoints can push access checks into SQL instead of Python loops
+"""
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import ClassPortfolio, PortfolioPurchase
+
+
+def _is_authenticated(user) -> bool:
+    return user is not None and user.is_authenticated
+
+
+def public_portfolios_q() -> Q:
+    """Portfolios visible to everyone, including visitors"""
+    return Q(is_public=True)
+
+
+def owned_portfolios_q(user) -> Q:
+    """Portfolios created by the user"""
+    return Q(created_by=user)
+
+
+def purchased_portfolios_q(user) -> Q:
+    """Portfolios the user bought through a marketplace listing"""
+    purchases = PortfolioPurchase.objects.filter(
+        listing__portfolio=OuterRef('pk'),
+        buyer=user
+    )
+    return Q(Exists(purchases))
+
+
+def portfolio_access_q(user) -> Q:
+    """
+    Filter matching every portfolio the user can access
+
+    Args:
+        user: Django user, AnonymousUser or None for visitors
+
+    Returns:
+        Q object usable on any ClassPortfolio queryset
+    """
+    if not _is_authenticated(user):
+        return public_portfolios_q()
+
+    return public_portfolios_q() | owned_portfolios_q(user) | purchased_portfolios_q(user)
+
+
+def accessible_portfolios(user, queryset=None):
+    """Restrict a ClassPortfolio queryset to the portfolios the user can access"""
+    if queryset is None:
+        queryset = ClassPortfolio.objects.all()
+    return queryset.filter(portfolio_access_q(user))
+
+
+def can_access_portfolio(portfolio, user) -> bool:
+    """Single-object counterpart of portfolio_access_q"""
+    if portfolio.is_public:
+        return True
+    if not _is_authenticated(user):
+        return False
+    if portfolio.created_by_id == user.pk:
+        return True
+    return PortfolioPurchase.objects.filter(
+        listing__portfolio=portfolio,
+        buyer=user
+    ).exists()
+
+
+def can_edit_portfolio(portfolio, user) -> bool:
+    """Only the portfolio owner may edit it"""
+    return _is_authenticated(user) and portfolio.created_by_id == user.pk
@@ -5,7 +5,8 @@ from .models import (
     MarketplaceListing, PortfolioPurchase, Syllabus, SyllabusExtraction,
     ImportantDate, LectureMaterial, Flashcard, Quiz, QuizQuestion, QuizSubmission,
     ClassReview, StudyGroup, Notification, ResourceRecommendation,
-    Post, Like, Comment, ProcessedFile, Document, DocumentQuiz, YouTubeVideo, CalendarEvent
+    Post, Like, Comment, ProcessedFile, Document, DocumentQuiz, YouTubeVideo, CalendarEvent,
+    ContentCache, PortfolioSnapshot, LLMUsage
 )
 
 @admin.register(User)
@@ -181,6 +182,26 @@ class ProcessedFileAdmin(admin.ModelAdmin):
         }),
     )
 
+@admin.register(ContentCache)
+class ContentCacheAdmin(admin.ModelAdmin):
+    list_display = ['key', 'kind', 'size', 'hits', 'created_at', 'last_accessed_at', 'expires_at']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['key']
+    readonly_fields = ['key', 'kind', 'value', 'size', 'hits', 'created_at', 'last_accessed_at']
+
+@admin.register(LLMUsage)
+class LLMUsageAdmin(admin.ModelAdmin):
+    list_display = ['user', 'day', 'model', 'requests', 'cached_requests', 'prompt_tokens', 'completion_tokens', 'cost']
+    list_filter = ['day', 'model']
+    search_fields = ['user__username']
+    readonly_fields = ['user', 'day', 'model', 'requests', 'cached_requests', 'prompt_tokens', 'completion_tokens', 'cost']
+
+@admin.register(PortfolioSnapshot)
+class PortfolioSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['portfolio', 'access_level', 'version', 'built_at']
+    list_filter = ['access_level']
+    readonly_fields = ['portfolio', 'access_level', 'content', 'version', 'built_at']
+
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
     list_display = ['filename', 'uploaded_by', 'learn_method', 'is_processed', 'is_successful', 'created_at']
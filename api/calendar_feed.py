@@ -0,0 +1,97 @@
+"""
+Calendar windows for HackWestTX Class Portfolio
+Serves a user's calendar events one date range at a time. The window is
+required and bounded, the lookup runs on the (user, due_date) index, linked
+resources come from a single prefetch, and portfolios are sent once per
+response as references instead of being embedded in every event.
+"""
+
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import CalendarEvent, ClassPortfolio, YouTubeVideo
+
+MAX_RANGE_DAYS = getattr(settings, 'CALENDAR_MAX_RANGE_DAYS', 366)
+
+# Columns the compact projection reads; everything else stays in the database
+EVENT_FIELDS = (
+    'id', 'class_portfolio_id', 'title', 'event_type', 'due_date', 'status',
+    'priority', 'points', 'location', 'completed_at',
+)
+RESOURCE_FIELDS = ('id', 'title', 'url', 'link_type')
+PORTFOLIO_FIELDS = ('id', 'course', 'professor', 'semester', 'year', 'color')
+
+FILTER_PARAMS = {
+    'event_type': 'event_type',
+    'status': 'status',
+    'priority': 'priority',
+    'class_id': 'class_portfolio_id',
+}
+
+
+def parse_bound(value: Optional[str]) -> Optional[datetime]:
+    """An ISO date or datetime as an aware datetime; a bare date means midnight"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_range(start: Optional[str], end: Optional[str]) -> Tuple[datetime, datetime]:
+    """
+    Validate a [start, end) window
+
+    Raises:
+        ValueError: with a client-facing message when a bound is missing,
+            malformed, reversed or the window is too wide
+    """
+    if not start or not end:
+        raise ValueError('start and end are required')
+    start_at, end_at = parse_bound(start), parse_bound(end)
+    if start_at is None or end_at is None:
+        raise ValueError('start and end must be ISO 8601 dates or datetimes')
+    if end_at <= start_at:
+        raise ValueError('end must be after start')
+    if end_at - start_at > timedelta(days=MAX_RANGE_DAYS):
+        raise ValueError(f'Range cannot exceed {MAX_RANGE_DAYS} days')
+    return start_at, end_at
+
+
+def events_in_range(user, start_at: datetime, end_at: datetime, filters: Optional[Dict[str, Any]] = None):
+    """The user's events due in [start_at, end_at), with linked resources prefetched"""
+    events = CalendarEvent.objects.filter(
+        user=user,
+        due_date__gte=start_at,
+        due_date__lt=end_at
+    )
+    for param, field in FILTER_PARAMS.items():
+        value = (filters or {}).get(param)
+        if value:
+            events = events.filter(**{field: value})
+
+    return events.only(*EVENT_FIELDS).order_by('due_date', 'id').prefetch_related(
+        Prefetch('linked_resources', queryset=YouTubeVideo.objects.only(*RESOURCE_FIELDS).order_by('id'))
+    )
+
+
+def portfolio_refs(events: Iterable[CalendarEvent]) -> Dict[str, Dict[str, Any]]:
+    """Summary of every portfolio the events point at, keyed by id, from one query"""
+    ids = {event.class_portfolio_id for event in events if event.class_portfolio_id}
+    if not ids:
+        return {}
+    return {
+        str(portfolio['id']): portfolio
+        for portfolio in ClassPortfolio.objects.filter(id__in=ids).values(*PORTFOLIO_FIELDS)
+    }
@@ -0,0 +1,123 @@
+"""
+Content-addressed cache for HackWestTX Class Portfolio
+Stores the results of expensive, deterministic work (file text extraction, AI
+summaries) in the ContentCache table, keyed by hashes of the inputs, so the
+same slide deck uploaded by a whole class is parsed and summarized only once.
+Entries expire after a TTL and each kind is trimmed back to a size limit in
+least-recently-used order.
+"""
+
+import hashlib
+import json
+import logging
+import random
+from datetime import timedelta
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ContentCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_DAYS = getattr(settings, 'CONTENT_CACHE_TTL_DAYS', 30)
+MAX_ENTRIES_PER_KIND = getattr(settings, 'CONTENT_CACHE_MAX_ENTRIES', 5000)
+MAX_VALUE_BYTES = getattr(settings, 'CONTENT_CACHE_MAX_VALUE_BYTES', 5 * 1024 * 1024)
+# Eviction scans the table, so only a fraction of writes pay for it
+EVICTION_PROBABILITY = 0.05
+# Bumping last_accessed_at on every hit is wasted writes for hot keys
+TOUCH_INTERVAL = timedelta(minutes=5)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def sha256_file(file) -> str:
+    """Hash an UploadedFile/FieldFile in chunks without loading it into memory"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    if hasattr(file, 'chunks'):
+        for chunk in file.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    else:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def make_key(kind: str, *parts: Any) -> str:
+    """Namespaced, fixed-length key from arbitrary input parts"""
+    raw = ':'.join([kind] + [str(part) for part in parts])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def lookup(kind: str, key: str) -> Optional[Any]:
+    """Cached value or None; records the hit for LRU eviction"""
+    now = timezone.now()
+    entry = ContentCache.objects.filter(key=key, kind=kind).only(
+        'id', 'value', 'expires_at', 'last_accessed_at'
+    ).first()
+    if entry is None:
+        return None
+    if entry.expires_at is not None and entry.expires_at <= now:
+        entry.delete()
+        return None
+
+    updates = {'hits': F('hits') + 1}
+    if now - entry.last_accessed_at > TOUCH_INTERVAL:
+        updates['last_accessed_at'] = now
+    ContentCache.objects.filter(pk=entry.pk).update(**updates)
+    return entry.value
+
+
+def store(kind: str, key: str, value: Any, ttl_days: Optional[int] = DEFAULT_TTL_DAYS) -> bool:
+    """Store a JSON-serializable value; returns False when it is too large to cache"""
+    size = len(json.dumps(value, default=str))
+    if size > MAX_VALUE_BYTES:
+        logger.info(f"Not caching {kind} entry of {size} bytes")
+        return False
+
+    now = timezone.now()
+    defaults = {
+        'kind': kind,
+        'value': value,
+        'size': size,
+        'last_accessed_at': now,
+        'expires_at': now + timedelta(days=ttl_days) if ttl_days else None,
+    }
+    try:
+        with transaction.atomic():
+            ContentCache.objects.update_or_create(key=key, defaults=defaults)
+    except IntegrityError:
+        # A concurrent writer stored the same content first; its value is equivalent
+        pass
+
+    if random.random() < EVICTION_PROBABILITY:
+        evict(kind)
+    return True
+
+
+def evict(kind: Optional[str] = None, max_entries: int = MAX_ENTRIES_PER_KIND) -> int:
+    """Drop expired entries, then the least recently used beyond max_entries"""
+    deleted, _ = ContentCache.objects.filter(expires_at__lte=timezone.now()).delete()
+
+    kinds = [kind] if kind else [choice for choice, _ in ContentCache.KIND_CHOICES]
+    for cache_kind in kinds:
+        cutoff = ContentCache.objects.filter(kind=cache_kind).order_by(
+            '-last_accessed_at'
+        ).values_list('last_accessed_at', flat=True)[max_entries:max_entries + 1]
+        cutoff = list(cutoff)
+        if cutoff:
+            removed, _ = ContentCache.objects.filter(
+                kind=cache_kind,
+                last_accessed_at__lte=cutoff[0]
+            ).delete()
+            deleted += removed
+    return deleted
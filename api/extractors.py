@@ -0,0 +1,409 @@
+"""
+Text Extractor Registry for HackWestTX Class Portfolio
+One place that turns an uploaded document into text. Extractors register for
+file extensions and MIME types, import their parsing library on first use,
+and share caching, timing and error handling, so processed files and syllabi
+get identical extraction behaviour.
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+from . import content_cache
+from .pdf_extraction import iter_page_texts, pdf_source
+
+logger = logging.getLogger(__name__)
+
+# Bump when extractor output changes so stale cached text isn't served
+EXTRACTION_VERSION = 1
+
+
+class ExtractionError(Exception):
+    """Raised by extract_plain_text when a document can't be turned into text"""
+
+
+class Extractor:
+    """Base class for format-specific extractors"""
+    name = 'base'
+    label = ''
+    extensions = ()
+    mime_types = ()
+    # Module imported on first use and exposed as self.library
+    library_name = None
+
+    _library = None
+    _library_lock = threading.Lock()
+
+    @property
+    def library(self):
+        if self._library is None:
+            with self._library_lock:
+                if self._library is None:
+                    type(self)._library = importlib.import_module(self.library_name)
+        return self._library
+
+    def extract(self, file, **options) -> Dict[str, Any]:
+        """Return {'text', 'metadata', 'word_count', 'char_count'}; raise on failure"""
+        raise NotImplementedError
+
+
+_by_extension: Dict[str, Extractor] = {}
+_by_mime_type: Dict[str, Extractor] = {}
+
+# Per-extractor counters for monitoring; guarded because workers may be threaded
+EXTRACTION_STATS: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+def register(extractor_class):
+    """Class decorator adding an extractor to the registry"""
+    extractor = extractor_class()
+    for extension in extractor.extensions:
+        _by_extension[extension] = extractor
+    for mime_type in extractor.mime_types:
+        _by_mime_type[mime_type] = extractor
+    return extractor_class
+
+
+def get_extractor(file_name: str = '', content_type: str = '') -> Optional[Extractor]:
+    """Extractor for a file by extension; the MIME type is only used for extension-less names"""
+    extension = os.path.splitext(file_name or '')[1].lower()
+    if extension:
+        return _by_extension.get(extension)
+    if content_type:
+        return _by_mime_type.get(content_type.split(';')[0].strip().lower())
+    return None
+
+
+def supported_extensions():
+    return sorted(_by_extension)
+
+
+def _record(name: str, seconds: float, chars: int, success: bool, cached: bool) -> None:
+    with _stats_lock:
+        stats = EXTRACTION_STATS.setdefault(name, {
+            'count': 0, 'failures': 0, 'cache_hits': 0, 'total_seconds': 0.0, 'total_chars': 0
+        })
+        stats['count'] += 1
+        stats['total_seconds'] += seconds
+        stats['total_chars'] += chars
+        if not success:
+            stats['failures'] += 1
+        if cached:
+            stats['cache_hits'] += 1
+
+
+def _failure(error: str) -> Dict[str, Any]:
+    return {
+        'success': False,
+        'error': error,
+        'text': '',
+        'metadata': {}
+    }
+
+
+def _content_type(file) -> str:
+    content_type = getattr(file, 'content_type', '')
+    if not content_type and hasattr(file, 'file'):
+        content_type = getattr(file.file, 'content_type', '')
+    return content_type or ''
+
+
+def extract_text(file, file_name: Optional[str] = None, use_cache: bool = True, **options) -> Dict[str, Any]:
+    """
+    Extract text from an UploadedFile or FieldFile
+
+    The file is read in place (no copy into memory beyond what the parser
+    needs). Successful results are cached by the SHA-256 of the file bytes.
+
+    Returns:
+        Dict with success, text, metadata, word_count, char_count (or error)
+    """
+    file_name = file_name or file.name
+    extractor = get_extractor(file_name, _content_type(file))
+    if extractor is None:
+        extension = os.path.splitext(file_name)[1].lower()
+        return _failure(f'Unsupported file type: {extension}')
+
+    started = time.perf_counter()
+    cache_key = None
+    if use_cache:
+        try:
+            file_hash = content_cache.sha256_file(file)
+            cache_key = content_cache.make_key('extraction', EXTRACTION_VERSION, extractor.name, file_hash)
+            cached = content_cache.lookup('extraction', cache_key)
+            if cached is not None:
+                _record(extractor.name, time.perf_counter() - started, cached.get('char_count', 0), True, True)
+                logger.info(f"Extraction cache hit for {file_name}")
+                return dict(cached, cached=True)
+        except Exception as e:
+            logger.warning(f"Extraction cache unavailable for {file_name}: {str(e)}")
+            cache_key = None
+
+    try:
+        file.seek(0)
+        result = extractor.extract(file, **options)
+        result['success'] = True
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        _record(extractor.name, elapsed, 0, False, False)
+        logger.error(f"Error processing {extractor.label} {file_name}: {str(e)}")
+        return _failure(f'Error processing {extractor.label}: {str(e)}')
+
+    elapsed = time.perf_counter() - started
+    _record(extractor.name, elapsed, result['char_count'], True, False)
+    logger.info(f"Extracted {result['char_count']} chars from {file_name} with {extractor.name} in {elapsed:.2f}s")
+
+    if cache_key:
+        try:
+            content_cache.store('extraction', cache_key, result)
+        except Exception as e:
+            logger.warning(f"Could not cache extraction for {file_name}: {str(e)}")
+    return result
+
+
+def extract_plain_text(file, **options) -> str:
+    """Text of a document, raising ExtractionError instead of returning an error dict"""
+    result = extract_text(file, **options)
+    if not result['success']:
+        raise ExtractionError(result['error'])
+    return result['text']
+
+
+def _finish(text_parts, metadata, separator='\n\n') -> Dict[str, Any]:
+    full_text = separator.join(text_parts)
+    return {
+        'text': full_text,
+        'metadata': metadata,
+        'word_count': len(full_text.split()),
+        'char_count': len(full_text)
+    }
+
+
+@register
+class PdfExtractor(Extractor):
+    name = 'pdf'
+    label = 'PDF'
+    extensions = ('.pdf',)
+    mime_types = ('application/pdf',)
+    library_name = 'PyPDF2'
+
+    def extract(self, file, max_pages=None, max_chars=None, workers=None, parallel_min_pages=None, **options):
+        max_pages = max_pages or getattr(settings, 'PDF_MAX_PAGES', 1000)
+        max_chars = max_chars or getattr(settings, 'PDF_MAX_TEXT_CHARS', 5000000)
+        workers = workers or getattr(settings, 'PDF_EXTRACTION_WORKERS', 1)
+        parallel_min_pages = parallel_min_pages or getattr(settings, 'PDF_PARALLEL_MIN_PAGES', 40)
+
+        pdf_reader = self.library.PdfReader(file)
+
+        text_content = []
+        metadata = {
+            'file_type': 'PDF',
+            'page_count': len(pdf_reader.pages),
+            'title': '',
+            'author': '',
+            'subject': '',
+            'creator': '',
+            'producer': '',
+            'creation_date': '',
+            'modification_date': ''
+        }
+
+        # Extract metadata if available
+        if pdf_reader.metadata:
+            metadata.update({
+                'title': pdf_reader.metadata.get('/Title', ''),
+                'author': pdf_reader.metadata.get('/Author', ''),
+                'subject': pdf_reader.metadata.get('/Subject', ''),
+                'creator': pdf_reader.metadata.get('/Creator', ''),
+                'producer': pdf_reader.metadata.get('/Producer', ''),
+                'creation_date': str(pdf_reader.metadata.get('/CreationDate', '')),
+                'modification_date': str(pdf_reader.metadata.get('/ModDate', ''))
+            })
+
+        # Stream pages through the budget; counts are kept incrementally so the
+        # joined text is never re-scanned and huge documents stop early
+        page_count = len(pdf_reader.pages)
+        page_limit = min(page_count, max_pages)
+        source = None
+        if workers > 1 and page_limit >= parallel_min_pages:
+            source = pdf_source(file)
+
+        char_count = 0
+        word_count = 0
+        pages_read = 0
+        truncated = page_count > page_limit
+        for page_num, page_text in iter_page_texts(
+            pdf_reader,
+            source=source,
+            max_pages=page_limit,
+            workers=workers,
+            parallel_min_pages=parallel_min_pages
+        ):
+            pages_read = page_num + 1
+            if not page_text.strip():
+                continue
+            block = f"--- Page {page_num + 1} ---\n{page_text}"
+            block_chars = len(block) + (2 if text_content else 0)  # '\n\n' separator
+            if char_count + block_chars > max_chars:
+                truncated = True
+                break
+            text_content.append(block)
+            char_count += block_chars
+            word_count += len(block.split())
+
+        metadata['pages_extracted'] = pages_read
+        metadata['truncated'] = truncated
+
+        return {
+            'text': '\n\n'.join(text_content),
+            'metadata': metadata,
+            'word_count': word_count,
+            'char_count': char_count
+        }
+
+
+def _core_properties(properties) -> Dict[str, str]:
+    return {
+        'title': properties.title or '',
+        'author': properties.author or '',
+        'subject': properties.subject or '',
+        'keywords': properties.keywords or '',
+        'comments': properties.comments or '',
+        'last_modified_by': properties.last_modified_by or '',
+        'created': str(properties.created) if properties.created else '',
+        'modified': str(properties.modified) if properties.modified else ''
+    }
+
+
+@register
+class WordExtractor(Extractor):
+    name = 'word'
+    label = 'Word document'
+    extensions = ('.docx', '.doc')
+    mime_types = (
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'application/msword',
+    )
+    library_name = 'docx'
+
+    def extract(self, file, **options):
+        doc = self.library.Document(file)
+
+        text_content = []
+        metadata = {
+            'file_type': 'Word Document',
+            'paragraph_count': len(doc.paragraphs),
+            'title': '',
+            'author': '',
+            'subject': '',
+            'keywords': '',
+            'comments': '',
+            'last_modified_by': '',
+            'created': '',
+            'modified': ''
+        }
+
+        # Extract document properties
+        if doc.core_properties:
+            metadata.update(_core_properties(doc.core_properties))
+
+        # Extract text from paragraphs
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                text_content.append(paragraph.text)
+
+        # Extract text from tables
+        for table in doc.tables:
+            table_text = []
+            for row in table.rows:
+                row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+                if row_text:
+                    table_text.append(' | '.join(row_text))
+            if table_text:
+                text_content.append('\n'.join(table_text))
+
+        return _finish(text_content, metadata)
+
+
+@register
+class PowerPointExtractor(Extractor):
+    name = 'powerpoint'
+    label = 'PowerPoint'
+    extensions = ('.pptx', '.ppt')
+    mime_types = (
+        'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        'application/vnd.ms-powerpoint',
+    )
+    library_name = 'pptx'
+
+    def extract(self, file, **options):
+        prs = self.library.Presentation(file)
+
+        text_content = []
+        metadata = {
+            'file_type': 'PowerPoint Presentation',
+            'slide_count': len(prs.slides),
+            'title': '',
+            'author': '',
+            'subject': '',
+            'keywords': '',
+            'comments': '',
+            'last_modified_by': '',
+            'created': '',
+            'modified': ''
+        }
+
+        # Extract presentation properties
+        if prs.core_properties:
+            metadata.update(_core_properties(prs.core_properties))
+
+        # Extract text from each slide
+        for slide_num, slide in enumerate(prs.slides):
+            slide_text = [f"--- Slide {slide_num + 1} ---"]
+
+            # Extract text from shapes
+            for shape in slide.shapes:
+                if hasattr(shape, "text") and shape.text.strip():
+                    slide_text.append(shape.text.strip())
+
+            if len(slide_text) > 1:  # More than just the slide header
+                text_content.append('\n'.join(slide_text))
+
+        return _finish(text_content, metadata)
+
+
+@register
+class TextExtractor(Extractor):
+    name = 'text'
+    label = 'text file'
+    extensions = ('.txt',)
+    mime_types = ('text/plain',)
+
+    def extract(self, file, **options):
+        text_content = file.read()
+        if isinstance(text_content, bytes):
+            text_content = text_content.decode('utf-8')
+
+        metadata = {
+            'file_type': 'Text Document',
+            'encoding': 'utf-8',
+            'line_count': len(text_content.splitlines()),
+            'title': '',
+            'author': '',
+            'created': '',
+            'modified': ''
+        }
+
+        return {
+            'text': text_content,
+            'metadata': metadata,
+            'word_count': len(text_content.split()),
+            'char_count': len(text_content)
+        }
@@ -0,0 +1,160 @@
+"""
+Search facets for HackWestTX Class Portfolio
+Computes every global_search facet from two aggregate queries and caches the
+result per normalized filter signature, under a generation shared by every
+worker (api.generations) that catalog changes bump
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Q
+
+from . import generations
+from .models import PortfolioTag
+
+logger = logging.getLogger(__name__)
+
+FACET_CACHE_TIMEOUT = getattr(settings, 'FACET_CACHE_TIMEOUT', 300)
+GENERATION_NAME = 'facets'
+
+# A portfolio is "paid" when it has a price; there is no separate visibility field
+PAID_Q = Q(price__gt=0)
+
+PRICE_BUCKETS = [
+    ('0-10', Q(price__lte=10)),
+    ('10-25', Q(price__gt=10, price__lte=25)),
+    ('25-50', Q(price__gt=25, price__lte=50)),
+    ('50+', Q(price__gt=50)),
+]
+
+MAX_SCHOOLS = 10
+MAX_PROFESSORS = 20
+MAX_TERMS = 10
+MAX_TAGS = 20
+
+
+def visibility_q(visibility: str) -> Optional[Q]:
+    """Translate the `visibility` search parameter into a portfolio filter"""
+    if visibility == 'paid':
+        return PAID_Q
+    if visibility == 'private':
+        return Q(is_public=False)
+    if visibility in ('public', 'public_full', 'public_preview'):
+        return Q(is_public=True)
+    return None
+
+
+def _top(counts: Dict[str, int], limit: int):
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [{'name': name, 'count': count} for name, count in ranked]
+
+
+def compute_facets(queryset) -> Dict[str, Any]:
+    """
+    Aggregate facet counts for a ClassPortfolio queryset
+
+    Query 1 groups by (university, professor, semester) with conditional
+    price-bucket counts and min/max, which are rolled up in Python.
+    Query 2 groups the matching PortfolioTag rows by name.
+    """
+    # Sorting may have added joins/aggregates (reviews, purchases); aggregate over the bare id set
+    queryset = queryset.model.objects.filter(pk__in=queryset.order_by().values('pk'))
+
+    bucket_counts = {
+        f'bucket_{index}': Count('id', filter=PAID_Q & condition)
+        for index, (_, condition) in enumerate(PRICE_BUCKETS)
+    }
+    groups = queryset.values('created_by__university', 'professor', 'semester').annotate(
+        count=Count('id'),
+        paid=Count('id', filter=PAID_Q),
+        min_price=Min('price', filter=PAID_Q),
+        max_price=Max('price', filter=PAID_Q),
+        **bucket_counts
+    )
+
+    total = paid = 0
+    schools, professors, terms = {}, {}, {}
+    buckets = [0] * len(PRICE_BUCKETS)
+    min_price = max_price = None
+    for group in groups:
+        count = group['count']
+        total += count
+        paid += group['paid']
+        if group['created_by__university']:
+            school = group['created_by__university']
+            schools[school] = schools.get(school, 0) + count
+        if group['professor']:
+            professors[group['professor']] = professors.get(group['professor'], 0) + count
+        if group['semester']:
+            terms[group['semester']] = terms.get(group['semester'], 0) + count
+        for index in range(len(PRICE_BUCKETS)):
+            buckets[index] += group[f'bucket_{index}']
+        if group['min_price'] is not None:
+            min_price = group['min_price'] if min_price is None else min(min_price, group['min_price'])
+            max_price = group['max_price'] if max_price is None else max(max_price, group['max_price'])
+
+    tags = PortfolioTag.objects.filter(
+        portfolio__in=queryset.values('pk')
+    ).values('name').annotate(
+        count=Count('portfolio')
+    ).order_by('-count', 'name')[:MAX_TAGS]
+
+    price_ranges = []
+    if paid:
+        price_ranges = [
+            {'range': label, 'count': buckets[index]}
+            for index, (label, _) in enumerate(PRICE_BUCKETS)
+        ]
+
+    return {
+        'total': total,
+        'schools': _top(schools, MAX_SCHOOLS),
+        'departments': [],  # Not available since we removed course field
+        'professors': _top(professors, MAX_PROFESSORS),
+        'terms': _top(terms, MAX_TERMS),
+        'tags': [{'name': tag['name'], 'count': tag['count']} for tag in tags],
+        'price_ranges': price_ranges,
+        'price_stats': {
+            'min': float(min_price) if min_price is not None else None,
+            'max': float(max_price) if max_price is not None else None,
+        },
+    }
+
+
+def _generation() -> int:
+    return generations.current(GENERATION_NAME)
+
+
+def invalidate_facets() -> None:
+    """Bump the generation so every worker treats its cached facet sets as stale"""
+    generations.bump(GENERATION_NAME)
+
+
+def filter_signature(filters: Dict[str, Any], user=None) -> str:
+    """Stable key for a set of search filters; access scope is part of it"""
+    normalized = {}
+    for name, value in filters.items():
+        if isinstance(value, (list, tuple)):
+            value = sorted(str(item).strip().lower() for item in value if str(item).strip())
+        elif value is not None:
+            value = str(value).strip().lower()
+        if value:
+            normalized[name] = value
+    normalized['scope'] = user.pk if user is not None and user.is_authenticated else 'anonymous'
+    payload = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def get_facets(queryset, filters: Dict[str, Any], user=None) -> Dict[str, Any]:
+    """Cached compute_facets keyed by the filter signature and facet generation"""
+    key = f"facets:{_generation()}:{filter_signature(filters, user)}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
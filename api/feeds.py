@@ -0,0 +1,77 @@
+"""
+Community feed queries for HackWestTX Class Portfolio
+Builds Post querysets that carry their like/comment counts and the viewer's
+like state as SQL annotations, and prefetch a capped set of comments with
+their authors, so a page of posts costs a fixed number of queries. Further
+comments are paged with an opaque (created_at, id) cursor.
+"""
+
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Count, Exists, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Like, Post
+from .pagination import encode_cursor, keyset_page
+
+# Comments embedded with each post in a feed; the rest are fetched through the cursor
+COMMENTS_PER_POST = getattr(settings, 'FEED_COMMENTS_PER_POST', 3)
+MAX_COMMENTS_PAGE = 50
+COMMENT_ORDERING = ('created_at', 'id')
+
+
+def _count_subquery(model, field: str = 'post'):
+    # A correlated COUNT per row; joining likes and comments together would multiply the counts
+    counts = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def feed_queryset(user=None, queryset=None, comments_per_post: int = COMMENTS_PER_POST):
+    """
+    Posts annotated with likes_count, comments_count and is_liked
+
+    Each post also gets `preview_comments`: its first comments_per_post
+    comments, authors included, loaded in one prefetch query for the page.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+
+    if user is not None and user.is_authenticated:
+        is_liked = Exists(Like.objects.filter(post=OuterRef('pk'), user=user))
+    else:
+        is_liked = Value(False)
+
+    return queryset.select_related('author').annotate(
+        likes_count=_count_subquery(Like),
+        comments_count=_count_subquery(Comment),
+        is_liked=is_liked,
+    ).prefetch_related(
+        Prefetch(
+            'comments',
+            queryset=Comment.objects.select_related('author').order_by(*COMMENT_ORDERING)[:comments_per_post],
+            to_attr='preview_comments'
+        )
+    )
+
+
+def encode_comment_cursor(comment: Comment) -> str:
+    return encode_cursor(COMMENT_ORDERING, comment)
+
+
+def comments_after(post_id: int, cursor: Optional[str] = None, limit: int = COMMENTS_PER_POST):
+    """
+    One page of a post's comments in (created_at, id) order
+
+    Returns:
+        (comments, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        ValueError: if the cursor can't be decoded
+    """
+    limit = max(1, min(limit, MAX_COMMENTS_PAGE))
+    comments = Comment.objects.filter(post_id=post_id).select_related('author').order_by(*COMMENT_ORDERING)
+    page = keyset_page(comments, cursor=cursor, limit=limit)
+    return page['rows'], page['next_cursor']
@@ -1,29 +1,40 @@
 """
 File Processing Module for HackWestTX Class Portfolio
-Handles PDF, PowerPoint, and Word document text extraction
+Handles PDF, PowerPoint, and Word document text extraction (via api.extractors)
+and AI summarization
 """
 
-import os
-import io
 import logging
 from typing import Optional, Dict, Any
 from django.core.files.uploadedfile import UploadedFile
 
-# File processing libraries
-import PyPDF2
-from docx import Document
-from pptx import Presentation
-
 # OpenAI for text summarization
 import openai
 from django.conf import settings
 
+from . import content_cache, llm_gateway
+from .extractors import extract_text
+from .summarization import condense
+
 logger = logging.getLogger(__name__)
 
 class FileProcessor:
     """Handles text extraction from various file formats"""
     
-    def __init__(self):
+    SUMMARY_MODEL = "gpt-3.5-turbo"
+    
+    def __init__(self, use_cache: bool = True, user_id: Optional[int] = None):
+        self.use_cache = use_cache
+        # OpenAI usage is charged to this user (see api.llm_gateway)
+        self.user_id = user_id
+        # PDF budgets and page-parallelism (see api.pdf_extraction)
+        self.pdf_max_pages = getattr(settings, 'PDF_MAX_PAGES', 1000)
+        self.pdf_max_chars = getattr(settings, 'PDF_MAX_TEXT_CHARS', 5000000)
+        self.pdf_workers = getattr(settings, 'PDF_EXTRACTION_WORKERS', 1)
+        self.pdf_parallel_min_pages = getattr(settings, 'PDF_PARALLEL_MIN_PAGES', 40)
+        # Text longer than one prompt is summarized chunk by chunk (see api.summarization)
+        self.summary_chunk_chars = getattr(settings, 'SUMMARY_CHUNK_CHARS', 12000)
+        self.summary_workers = getattr(settings, 'SUMMARY_WORKERS', 4)
         # Initialize OpenAI client only if API key is available
         api_key = getattr(settings, 'OPENAI_API_KEY', None)
         if api_key:
@@ -41,273 +52,14 @@ class FileProcessor:
         Returns:
             Dict containing extracted text and metadata
         """
-        file_name = uploaded_file.name
-        file_extension = os.path.splitext(file_name)[1].lower()
-        
-        try:
-            if file_extension == '.pdf':
-                return self._extract_from_pdf(uploaded_file)
-            elif file_extension in ['.docx', '.doc']:
-                return self._extract_from_word(uploaded_file)
-            elif file_extension in ['.pptx', '.ppt']:
-                return self._extract_from_powerpoint(uploaded_file)
-            elif file_extension == '.txt':
-                return self._extract_from_text(uploaded_file)
-            else:
-                return {
-                    'success': False,
-                    'error': f'Unsupported file type: {file_extension}',
-                    'text': '',
-                    'metadata': {}
-                }
-        except Exception as e:
-            logger.error(f"Error processing file {file_name}: {str(e)}")
-            return {
-                'success': False,
-                'error': f'Error processing file: {str(e)}',
-                'text': '',
-                'metadata': {}
-            }
-    
-    def _extract_from_pdf(self, uploaded_file: UploadedFile) -> Dict[str, Any]:
-        """Extract text from PDF file"""
-        try:
-            # Reset file pointer
-            uploaded_file.seek(0)
-            
-            # Create PDF reader
-            pdf_reader = PyPDF2.PdfReader(uploaded_file)
-            
-            text_content = []
-            metadata = {
-                'file_type': 'PDF',
-                'page_count': len(pdf_reader.pages),
-                'title': '',
-                'author': '',
-                'subject': '',
-                'creator': '',
-                'producer': '',
-                'creation_date': '',
-                'modification_date': ''
-            }
-            
-            # Extract metadata if available
-            if pdf_reader.metadata:
-                metadata.update({
-                    'title': pdf_reader.metadata.get('/Title', ''),
-                    'author': pdf_reader.metadata.get('/Author', ''),
-                    'subject': pdf_reader.metadata.get('/Subject', ''),
-                    'creator': pdf_reader.metadata.get('/Creator', ''),
-                    'producer': pdf_reader.metadata.get('/Producer', ''),
-                    'creation_date': str(pdf_reader.metadata.get('/CreationDate', '')),
-                    'modification_date': str(pdf_reader.metadata.get('/ModDate', ''))
-                })
-            
-            # Extract text from each page
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_content.append(f"--- Page {page_num + 1} ---\n{page_text}")
-                except Exception as e:
-                    logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
-                    continue
-            
-            full_text = '\n\n'.join(text_content)
-            
-            return {
-                'success': True,
-                'text': full_text,
-                'metadata': metadata,
-                'word_count': len(full_text.split()),
-                'char_count': len(full_text)
-            }
-            
-        except Exception as e:
-            logger.error(f"Error processing PDF: {str(e)}")
-            return {
-                'success': False,
-                'error': f'Error processing PDF: {str(e)}',
-                'text': '',
-                'metadata': {}
-            }
-    
-    def _extract_from_word(self, uploaded_file: UploadedFile) -> Dict[str, Any]:
-        """Extract text from Word document"""
-        try:
-            # Reset file pointer
-            uploaded_file.seek(0)
-            
-            # Create document object
-            doc = Document(uploaded_file)
-            
-            text_content = []
-            metadata = {
-                'file_type': 'Word Document',
-                'paragraph_count': len(doc.paragraphs),
-                'title': '',
-                'author': '',
-                'subject': '',
-                'keywords': '',
-                'comments': '',
-                'last_modified_by': '',
-                'created': '',
-                'modified': ''
-            }
-            
-            # Extract document properties
-            if doc.core_properties:
-                metadata.update({
-                    'title': doc.core_properties.title or '',
-                    'author': doc.core_properties.author or '',
-                    'subject': doc.core_properties.subject or '',
-                    'keywords': doc.core_properties.keywords or '',
-                    'comments': doc.core_properties.comments or '',
-                    'last_modified_by': doc.core_properties.last_modified_by or '',
-                    'created': str(doc.core_properties.created) if doc.core_properties.created else '',
-                    'modified': str(doc.core_properties.modified) if doc.core_properties.modified else ''
-                })
-            
-            # Extract text from paragraphs
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_content.append(paragraph.text)
-            
-            # Extract text from tables
-            for table in doc.tables:
-                table_text = []
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
-                    if row_text:
-                        table_text.append(' | '.join(row_text))
-                if table_text:
-                    text_content.append('\n'.join(table_text))
-            
-            full_text = '\n\n'.join(text_content)
-            
-            return {
-                'success': True,
-                'text': full_text,
-                'metadata': metadata,
-                'word_count': len(full_text.split()),
-                'char_count': len(full_text)
-            }
-            
-        except Exception as e:
-            logger.error(f"Error processing Word document: {str(e)}")
-            return {
-                'success': False,
-                'error': f'Error processing Word document: {str(e)}',
-                'text': '',
-                'metadata': {}
-            }
-    
-    def _extract_from_powerpoint(self, uploaded_file: UploadedFile) -> Dict[str, Any]:
-        """Extract text from PowerPoint presentation"""
-        try:
-            # Reset file pointer
-            uploaded_file.seek(0)
-            
-            # Create presentation object
-            prs = Presentation(uploaded_file)
-            
-            text_content = []
-            metadata = {
-                'file_type': 'PowerPoint Presentation',
-                'slide_count': len(prs.slides),
-                'title': '',
-                'author': '',
-                'subject': '',
-                'keywords': '',
-                'comments': '',
-                'last_modified_by': '',
-                'created': '',
-                'modified': ''
-            }
-            
-            # Extract presentation properties
-            if prs.core_properties:
-                metadata.update({
-                    'title': prs.core_properties.title or '',
-                    'author': prs.core_properties.author or '',
-                    'subject': prs.core_properties.subject or '',
-                    'keywords': prs.core_properties.keywords or '',
-                    'comments': prs.core_properties.comments or '',
-                    'last_modified_by': prs.core_properties.last_modified_by or '',
-                    'created': str(prs.core_properties.created) if prs.core_properties.created else '',
-                    'modified': str(prs.core_properties.modified) if prs.core_properties.modified else ''
-                })
-            
-            # Extract text from each slide
-            for slide_num, slide in enumerate(prs.slides):
-                slide_text = []
-                slide_text.append(f"--- Slide {slide_num + 1} ---")
-                
-                # Extract text from shapes
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        slide_text.append(shape.text.strip())
-                
-                if len(slide_text) > 1:  # More than just the slide header
-                    text_content.append('\n'.join(slide_text))
-            
-            full_text = '\n\n'.join(text_content)
-            
-            return {
-                'success': True,
-                'text': full_text,
-                'metadata': metadata,
-                'word_count': len(full_text.split()),
-                'char_count': len(full_text)
-            }
-            
-        except Exception as e:
-            logger.error(f"Error processing PowerPoint: {str(e)}")
-            return {
-                'success': False,
-                'error': f'Error processing PowerPoint: {str(e)}',
-                'text': '',
-                'metadata': {}
-            }
-    
-    def _extract_from_text(self, uploaded_file: UploadedFile) -> Dict[str, Any]:
-        """Extract text from plain text file"""
-        try:
-            # Reset file pointer
-            uploaded_file.seek(0)
-            
-            # Read the text content
-            text_content = uploaded_file.read().decode('utf-8')
-            
-            metadata = {
-                'file_type': 'Text Document',
-                'encoding': 'utf-8',
-                'line_count': len(text_content.splitlines()),
-                'title': '',
-                'author': '',
-                'created': '',
-                'modified': ''
-            }
-            
-            return {
-                'success': True,
-                'text': text_content,
-                'metadata': metadata,
-                'word_count': len(text_content.split()),
-                'char_count': len(text_content)
-            }
-            
-        except Exception as e:
-            logger.error(f"Error processing text file: {str(e)}")
-            return {
-                'success': False,
-                'error': f'Error processing text file: {str(e)}',
-                'text': '',
-                'metadata': {}
-            }
+        return extract_text(
+            uploaded_file,
+            use_cache=self.use_cache,
+            max_pages=self.pdf_max_pages,
+            max_chars=self.pdf_max_chars,
+            workers=self.pdf_workers,
+            parallel_min_pages=self.pdf_parallel_min_pages
+        )
     
     def summarize_text_with_chatgpt(self, text: str, context: str = "academic content") -> Dict[str, Any]:
         """
@@ -333,11 +85,36 @@ class FileProcessor:
                 }
             }
         
+        # Summaries depend only on the text, the context and the model
+        cache_key = None
+        if self.use_cache:
+            try:
+                cache_key = content_cache.make_key('summary', content_cache.sha256_text(text), context, self.SUMMARY_MODEL)
+                cached = content_cache.lookup('summary', cache_key)
+                if cached is not None:
+                    logger.info("Summary cache hit")
+                    return dict(cached, cached=True)
+            except Exception as e:
+                logger.warning(f"Summary cache unavailable: {str(e)}")
+                cache_key = None
+        
+        original_length = len(text)
+        chunking = None
         try:
-            # Truncate text if too long (ChatGPT has token limits)
-            max_chars = 12000  # Leave room for prompt and response
-            if len(text) > max_chars:
-                text = text[:max_chars] + "\n\n[Text truncated due to length]"
+            # Too long for one prompt: condense chunk notes until they fit (map-reduce)
+            if len(text) > self.summary_chunk_chars:
+                chunking = condense(
+                    self.openai_client,
+                    text,
+                    context,
+                    self.SUMMARY_MODEL,
+                    max_chars=self.summary_chunk_chars,
+                    chunk_chars=self.summary_chunk_chars,
+                    workers=self.summary_workers,
+                    use_cache=self.use_cache,
+                    user_id=self.user_id
+                )
+                text = chunking['text']
             
             # Create the prompt
             prompt = f"""
@@ -355,40 +132,55 @@ Content to analyze:
 Please provide a clear, well-structured summary that would be useful for a student studying this material.
 """
             
-            # Call OpenAI API
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert academic assistant that helps students understand and summarize educational content."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.3
-            )
-            
-            summary = response.choices[0].message.content
-            
-            return {
+            # Call OpenAI API; whole results are cached above, so the gateway's cache is skipped
+            summary = llm_gateway.complete(
+                self.openai_client,
+                llm_gateway.chat_params(
+                    self.SUMMARY_MODEL,
+                    [
+                        {"role": "system", "content": "You are an expert academic assistant that helps students understand and summarize educational content."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    1000,
+                    0.3
+                ),
+                user_id=self.user_id,
+                use_cache=False
+            ).content
+            
+            result = {
                 'success': True,
                 'summary': summary,
                 'metadata': {
-                    'model_used': 'gpt-3.5-turbo',
-                    'original_text_length': len(text),
+                    'model_used': self.SUMMARY_MODEL,
+                    'original_text_length': original_length,
                     'summary_length': len(summary),
                     'context': context
                 }
             }
+            if chunking:
+                result['metadata'].update({
+                    'chunk_count': chunking['chunk_count'],
+                    'cached_chunks': chunking['cached_chunks'],
+                    'reduce_levels': chunking['levels']
+                })
+            if cache_key:
+                try:
+                    content_cache.store('summary', cache_key, result)
+                except Exception as e:
+                    logger.warning(f"Could not cache summary: {str(e)}")
+            return result
             
         except Exception as e:
             logger.error(f"Error calling OpenAI API: {str(e)}")
-            # Check if it's a quota error
-            if "quota" in str(e).lower() or "429" in str(e):
+            # Check if it's a quota error, or our own limiter ran out of budget
+            if isinstance(e, llm_gateway.RateLimited) or "quota" in str(e).lower() or "429" in str(e):
                 return {
                     'success': True,
                     'summary': 'AI summarization temporarily unavailable due to API quota limits. Text extraction completed successfully.',
                     'metadata': {
                         'model_used': 'none',
-                        'original_text_length': len(text),
+                        'original_text_length': original_length,
                         'summary_length': 0,
                         'context': context,
                         'note': 'OpenAI API quota exceeded'
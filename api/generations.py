@@ -0,0 +1,24 @@
+"""
+Shared cache generations for HackWestTX Class Portfolio
+A cache namespace (facet sets, link-directory pages) puts its generation in
+every key, so bumping the generation retires every entry at once. The number
+lives in a CacheGeneration row rather than the default cache, which is per
+process: every gunicorn worker sees a bump immediately, for one indexed
+lookup per read.
+"""
+
+from django.db.models import F
+
+from .models import CacheGeneration
+
+
+def current(name: str) -> int:
+    """The namespace's generation; 0 until it is first bumped"""
+    return CacheGeneration.objects.filter(name=name).values_list('value', flat=True).first() or 0
+
+
+def bump(name: str) -> None:
+    """Move the namespace to a new generation so every worker treats its entries as stale"""
+    if not CacheGeneration.objects.filter(name=name).update(value=F('value') + 1):
+        CacheGeneration.objects.bulk_create([CacheGeneration(name=name)], ignore_conflicts=True)
+        CacheGeneration.objects.filter(name=name).update(value=F('value') + 1)
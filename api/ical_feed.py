@@ -0,0 +1,274 @@
+"""
+iCal subscription feeds for HackWestTX Class Portfolio
+Serves a user's ImportantDates and CalendarEvents as one .ics body behind a
+secret per-user token. Calendar clients poll these URLs every few minutes, so
+every response carries an ETag and Last-Modified taken from a single query
+(the token lookup with max(updated_at) and row counts of both tables), and an
+unchanged feed is answered with a 304 before any event row is read. Changed
+feeds are streamed one VEVENT at a time from database iterators.
+"""
+
+import hashlib
+import secrets
+from datetime import timezone as dt_timezone
+from typing import Iterable, Iterator, Optional, Sequence
+from urllib.parse import urlencode
+
+from django.db.models import Exists, F, Func, IntegerField, OuterRef, Q, Subquery
+from django.urls import reverse
+
+from .models import CalendarEvent, CalendarFeedToken, ImportantDate, PortfolioPurchase
+
+PRODID = '-//Class Portfolio//EN'
+UID_DOMAIN = 'classportfolio.com'
+ITERATOR_CHUNK_SIZE = 500
+
+# Alarm names accepted in ?alarms=, with their VALARM trigger
+ALARM_TRIGGERS = {
+    'week': '-P7D',
+    'day': '-P1D',
+    'hour': '-PT1H',
+}
+# sync_to_calendar's reminder_settings keys
+REMINDER_SETTINGS = {
+    'week_before': 'week',
+    'day_before': 'day',
+    'hour_before': 'hour',
+}
+
+# RFC 5545 PRIORITY: 1 is highest, 9 lowest
+EVENT_PRIORITIES = {'urgent': 1, 'high': 3, 'medium': 5, 'low': 9}
+
+DATE_FIELDS = ('id', 'portfolio_id', 'title', 'date_type', 'due_date', 'description', 'updated_at')
+EVENT_FIELDS = (
+    'id', 'class_portfolio_id', 'title', 'description', 'event_type', 'due_date',
+    'status', 'priority', 'location', 'updated_at',
+)
+
+
+def get_feed_token(user) -> CalendarFeedToken:
+    """The user's feed token, created on first use"""
+    feed_token, _ = CalendarFeedToken.objects.get_or_create(
+        user=user,
+        defaults={'token': secrets.token_urlsafe(32)}
+    )
+    return feed_token
+
+
+def rotate_feed_token(user) -> CalendarFeedToken:
+    """Replace the user's token; subscriptions using the old URL stop working"""
+    feed_token = get_feed_token(user)
+    feed_token.token = secrets.token_urlsafe(32)
+    feed_token.save(update_fields=['token'])
+    return feed_token
+
+
+def parse_alarms(value: Optional[str]) -> tuple:
+    """Known alarm names from a comma-separated ?alarms= value, in a stable order"""
+    requested = {name.strip() for name in (value or '').split(',')}
+    return tuple(name for name in ALARM_TRIGGERS if name in requested)
+
+
+def alarms_from_reminder_settings(reminder_settings) -> tuple:
+    """Alarm names enabled in a sync_to_calendar reminder_settings dict"""
+    return tuple(alarm for key, alarm in REMINDER_SETTINGS.items() if reminder_settings.get(key))
+
+
+def feed_path(token: str, portfolio_id: Optional[int] = None, alarms: Sequence[str] = ()) -> str:
+    """Path of a subscription feed, optionally scoped to one portfolio"""
+    path = reverse('calendar-feed', kwargs={'token': token})
+    params = {}
+    if portfolio_id:
+        params['portfolio'] = portfolio_id
+    if alarms:
+        params['alarms'] = ','.join(alarms)
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def subscribed_dates(user, portfolio_id: Optional[int] = None):
+    """
+    ImportantDates of the portfolios the user owns or bought
+
+    Args:
+        user: a User, a user id, or OuterRef to one when used inside a subquery
+        portfolio_id: restrict to one portfolio
+    """
+    # One level deeper inside the purchase subquery, so an OuterRef needs wrapping again
+    buyer = OuterRef(user) if isinstance(user, OuterRef) else user
+    purchases = PortfolioPurchase.objects.filter(listing__portfolio=OuterRef('portfolio_id'), buyer=buyer)
+    dates = ImportantDate.objects.filter(Q(portfolio__created_by=user) | Q(Exists(purchases)))
+    if portfolio_id:
+        dates = dates.filter(portfolio_id=portfolio_id)
+    return dates
+
+
+def subscribed_events(user, portfolio_id: Optional[int] = None):
+    """The user's CalendarEvents, optionally only those linked to one portfolio"""
+    events = CalendarEvent.objects.filter(user=user)
+    if portfolio_id:
+        events = events.filter(class_portfolio_id=portfolio_id)
+    return events
+
+
+def _aggregate(queryset, function: str, field: str, output_field=None):
+    """Scalar subquery computing function(field) over the whole queryset"""
+    return Subquery(
+        queryset.order_by().annotate(value=Func(F(field), function=function, output_field=output_field)).values('value')
+    )
+
+
+def resolve_feed(token: str, portfolio_id: Optional[int] = None) -> Optional[CalendarFeedToken]:
+    """
+    Look up a feed token together with the change markers of its events
+
+    The returned token carries dates_changed/events_changed (max updated_at)
+    and dates_count/events_count (row counts, so deletions change the ETag),
+    all from one query on the (portfolio, updated_at) and (user, updated_at)
+    indexes. None when the token is unknown.
+    """
+    user = OuterRef('user_id')
+    dates = subscribed_dates(user, portfolio_id)
+    events = subscribed_events(user, portfolio_id)
+    return CalendarFeedToken.objects.filter(token=token).annotate(
+        dates_changed=_aggregate(dates, 'MAX', 'updated_at'),
+        dates_count=_aggregate(dates, 'COUNT', 'id', IntegerField()),
+        events_changed=_aggregate(events, 'MAX', 'updated_at'),
+        events_count=_aggregate(events, 'COUNT', 'id', IntegerField()),
+    ).first()
+
+
+def last_modified(feed_token: CalendarFeedToken):
+    """Newest change across both tables; the token's creation for an empty feed"""
+    changes = [changed for changed in (feed_token.dates_changed, feed_token.events_changed) if changed]
+    return max(changes) if changes else feed_token.created_at
+
+
+def feed_etag(feed_token: CalendarFeedToken, portfolio_id: Optional[int], alarms: Sequence[str]) -> str:
+    """Quoted ETag covering everything the feed body depends on"""
+    parts = (
+        feed_token.token, portfolio_id, ','.join(alarms),
+        feed_token.dates_changed, feed_token.dates_count,
+        feed_token.events_changed, feed_token.events_count,
+    )
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def escape_text(value) -> str:
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)"""
+    return (
+        str(value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+        .replace('\r', '\\n')
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line at 75 octets without splitting a UTF-8 character"""
+    if len(line.encode('utf-8')) <= 75:
+        return line + '\r\n'
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        # Continuation lines start with a space, which counts towards their 75
+        limit = 75 if not parts else 74
+        if size + width > limit:
+            parts.append(''.join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_utc(value) -> str:
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _vevent(lines: Iterable[str], alarms: Sequence[str]) -> str:
+    body = ['BEGIN:VEVENT', *lines]
+    for alarm in alarms:
+        body.extend([
+            'BEGIN:VALARM',
+            f'TRIGGER:{ALARM_TRIGGERS[alarm]}',
+            'ACTION:DISPLAY',
+            'DESCRIPTION:Reminder',
+            'END:VALARM',
+        ])
+    body.append('END:VEVENT')
+    return ''.join(fold_line(line) for line in body)
+
+
+def important_date_vevent(date_obj: ImportantDate, alarms: Sequence[str] = ()) -> str:
+    """One ImportantDate as a folded VEVENT block"""
+    return _vevent([
+        f'UID:important-date-{date_obj.id}@{UID_DOMAIN}',
+        f'DTSTAMP:{format_utc(date_obj.updated_at)}',
+        f'LAST-MODIFIED:{format_utc(date_obj.updated_at)}',
+        f'DTSTART:{format_utc(date_obj.due_date)}',
+        f'SUMMARY:{escape_text(date_obj.title)}',
+        f'DESCRIPTION:{escape_text(date_obj.description)}',
+        f'CATEGORIES:{escape_text(date_obj.get_date_type_display())}',
+        'STATUS:CONFIRMED',
+        'TRANSP:OPAQUE',
+    ], alarms)
+
+
+def calendar_event_vevent(event: CalendarEvent, alarms: Sequence[str] = ()) -> str:
+    """One CalendarEvent as a folded VEVENT block"""
+    lines = [
+        f'UID:calendar-event-{event.id}@{UID_DOMAIN}',
+        f'DTSTAMP:{format_utc(event.updated_at)}',
+        f'LAST-MODIFIED:{format_utc(event.updated_at)}',
+        f'DTSTART:{format_utc(event.due_date)}',
+        f'SUMMARY:{escape_text(event.title)}',
+        f'DESCRIPTION:{escape_text(event.description)}',
+        f'CATEGORIES:{escape_text(event.get_event_type_display())}',
+        f'STATUS:{"CANCELLED" if event.status == "cancelled" else "CONFIRMED"}',
+        f'PRIORITY:{EVENT_PRIORITIES.get(event.priority, 0)}',
+        'TRANSP:OPAQUE',
+    ]
+    if event.location:
+        lines.append(f'LOCATION:{escape_text(event.location)}')
+    return _vevent(lines, alarms)
+
+
+def calendar_header(name: str = 'Class Portfolio') -> str:
+    return ''.join(fold_line(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ))
+
+
+def calendar_footer() -> str:
+    return fold_line('END:VCALENDAR')
+
+
+def iter_calendar(dates: Iterable[ImportantDate], events: Iterable[CalendarEvent] = (),
+                  alarms: Sequence[str] = (), name: str = 'Class Portfolio') -> Iterator[str]:
+    """VCALENDAR text, one chunk per VEVENT"""
+    yield calendar_header(name)
+    for date_obj in dates:
+        yield important_date_vevent(date_obj, alarms)
+    for event in events:
+        yield calendar_event_vevent(event, alarms)
+    yield calendar_footer()
+
+
+def iter_feed(user_id: int, portfolio_id: Optional[int] = None, alarms: Sequence[str] = ()) -> Iterator[str]:
+    """A subscription feed streamed from database iterators; nothing is held in memory"""
+    dates = subscribed_dates(user_id, portfolio_id).only(*DATE_FIELDS).order_by('due_date', 'id')
+    events = subscribed_events(user_id, portfolio_id).only(*EVENT_FIELDS).order_by('due_date', 'id')
+    return iter_calendar(
+        dates.iterator(chunk_size=ITERATOR_CHUNK_SIZE),
+        events.iterator(chunk_size=ITERATOR_CHUNK_SIZE),
+        alarms
+    )
@@ -0,0 +1,271 @@
+"""
+Background job queue for HackWestTX Class Portfolio
+Jobs are rows in the Job table, so no external broker is needed. Workers
+(`python manage.py run_jobs`) claim jobs with an atomic conditional UPDATE,
+which works the same on SQLite and Postgres and never hands one job to two
+workers. A worker renews its lease on a job while running it; a job whose lease
+lapses is requeued, or failed once it has used up its attempts.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = getattr(settings, 'JOBS_RETRY_BASE_SECONDS', 30)
+RETRY_MAX_SECONDS = getattr(settings, 'JOBS_RETRY_MAX_SECONDS', 3600)
+# A running job whose worker hasn't finished it in this long is assumed dead
+STALE_AFTER_SECONDS = getattr(settings, 'JOBS_STALE_AFTER_SECONDS', 900)
+# Running jobs renew locked_at this often, so only dead workers' jobs go stale
+HEARTBEAT_SECONDS = max(STALE_AFTER_SECONDS // 3, 1)
+
+CLAIM_BATCH = 10
+
+
+class PermanentJobError(Exception):
+    """Raised by a task when retrying can't help (bad input, missing rows)"""
+
+
+class TaskSpec:
+    def __init__(self, func: Callable, on_failure: Optional[Callable] = None):
+        self.func = func
+        self.on_failure = on_failure
+
+
+TASKS: Dict[str, TaskSpec] = {}
+
+
+def task(name: str, on_failure: Optional[Callable] = None):
+    """
+    Register a function as a background task
+
+    The function is called with the job payload as keyword arguments.
+    `on_failure(error, **payload)` runs once the job has failed for good.
+    """
+    def decorator(func):
+        TASKS[name] = TaskSpec(func, on_failure)
+        return func
+    return decorator
+
+
+def enqueue(name: str, payload: Optional[Dict[str, Any]] = None, priority: int = 0,
+            max_attempts: int = 3, delay: int = 0) -> Job:
+    """Queue a registered task; with JOBS_RUN_EAGERLY it runs before returning"""
+    if name not in TASKS:
+        raise ValueError(f"Unknown task: {name}")
+
+    job = Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+    if getattr(settings, 'JOBS_RUN_EAGERLY', False):
+        claimed = _claim(job.pk, 'eager')
+        if claimed is not None:
+            run_job(claimed)
+            job.refresh_from_db()
+    return job
+
+
+def _claim(job_id: int, worker_id: str) -> Optional[Job]:
+    updated = Job.objects.filter(pk=job_id, status='queued').update(
+        status='running',
+        locked_by=worker_id,
+        locked_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+    if not updated:
+        return None
+    return Job.objects.get(pk=job_id)
+
+
+def claim_next(worker_id: str) -> Optional[Job]:
+    """Atomically take the highest-priority runnable job, or None"""
+    candidates = Job.objects.filter(
+        status='queued',
+        run_after__lte=timezone.now()
+    ).order_by('-priority', 'run_after', 'pk').values_list('pk', flat=True)[:CLAIM_BATCH]
+
+    for job_id in candidates:
+        # Another worker may win the race for this row; just try the next one
+        job = _claim(job_id, worker_id)
+        if job is not None:
+            return job
+    return None
+
+
+def retry_delay(attempts: int) -> int:
+    """Exponential backoff with jitter: base * 2^(attempts-1), capped"""
+    delay = min(RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), RETRY_MAX_SECONDS)
+    return int(delay * random.uniform(0.8, 1.2))
+
+
+def run_job(job: Job) -> None:
+    """Run a claimed job and record success, retry or failure"""
+    spec = TASKS.get(job.name)
+    if spec is None:
+        _finish(job, 'failed', error=f"Unknown task: {job.name}")
+        return
+
+    try:
+        result = spec.func(**job.payload)
+    except Exception as e:
+        error = f"{e.__class__.__name__}: {e}"
+        permanent = isinstance(e, PermanentJobError)
+        if not permanent and job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            logger.warning(f"Job {job.pk} ({job.name}) failed, retrying in {delay}s: {error}")
+            Job.objects.filter(pk=job.pk).update(
+                status='queued',
+                run_after=timezone.now() + timedelta(seconds=delay),
+                last_error=traceback.format_exc(),
+                locked_by='',
+                locked_at=None,
+            )
+            return
+
+        logger.error(f"Job {job.pk} ({job.name}) failed permanently: {error}")
+        _finish(job, 'failed', error=traceback.format_exc())
+        if spec.on_failure is not None:
+            try:
+                spec.on_failure(str(e) or error, **job.payload)
+            except Exception:
+                logger.exception(f"on_failure hook for job {job.pk} raised")
+        return
+
+    _finish(job, 'succeeded', result=result)
+
+
+def _finish(job: Job, status: str, result: Any = None, error: str = '') -> None:
+    Job.objects.filter(pk=job.pk).update(
+        status=status,
+        result=result,
+        last_error=error,
+        finished_at=timezone.now(),
+        locked_by='',
+        locked_at=None,
+    )
+
+
+class Heartbeat:
+    """Renews a running job's lease from a background thread until stopped"""
+
+    def __init__(self, job: Job, interval: float = HEARTBEAT_SECONDS):
+        self.job = job
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'job-{job.pk}-heartbeat', daemon=True)
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.wait(self.interval):
+                Job.objects.filter(pk=self.job.pk, status='running', locked_by=self.job.locked_by).update(
+                    locked_at=timezone.now()
+                )
+        except Exception:
+            logger.exception(f"Heartbeat for job {self.job.pk} failed")
+        finally:
+            # The thread has its own connection; don't leave it open
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Return jobs abandoned by crashed workers to the queue
+
+    Each claim counted as an attempt, so a job that has already used all of
+    them is failed instead of being run again.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=STALE_AFTER_SECONDS))
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(
+        status='queued',
+        run_after=now,
+        locked_by='',
+        locked_at=None,
+        last_error='Worker lease expired',
+    )
+    for job in stale.filter(attempts__gte=F('max_attempts')):
+        # Conditional on the lease read, in case the job finished in the meantime
+        expired = Job.objects.filter(pk=job.pk, status='running', locked_at=job.locked_at).update(
+            status='failed',
+            last_error='Worker lease expired',
+            finished_at=now,
+            locked_by='',
+            locked_at=None,
+        )
+        if not expired:
+            continue
+        logger.error(f"Job {job.pk} ({job.name}) failed permanently: worker lease expired")
+        spec = TASKS.get(job.name)
+        if spec is not None and spec.on_failure is not None:
+            try:
+                spec.on_failure('Worker lease expired', **job.payload)
+            except Exception:
+                logger.exception(f"on_failure hook for job {job.pk} raised")
+    return requeued
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def work(worker_id: Optional[str] = None, poll_interval: float = 2.0,
+         max_jobs: Optional[int] = None, once: bool = False) -> int:
+    """
+    Worker loop used by the run_jobs command
+
+    Returns:
+        Number of jobs processed
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    last_stale_check = float('-inf')
+
+    while max_jobs is None or processed < max_jobs:
+        # Long-running workers must not hold on to connections the database has dropped
+        close_old_connections()
+
+        if time.monotonic() - last_stale_check > 60:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                logger.warning(f"Requeued {requeued} stale jobs")
+            last_stale_check = time.monotonic()
+
+        job = claim_next(worker_id)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(f"{worker_id} running job {job.pk} ({job.name}, attempt {job.attempts})")
+        with Heartbeat(job):
+            run_job(job)
+        processed += 1
+
+    return processed
@@ -0,0 +1,356 @@
+"""
+AI learning content for HackWestTX Class Portfolio
+A material's summary, flashcards and quiz are requested from OpenAI at the
+same time through one AsyncOpenAI client per process, which lives on a
+background event loop and pools its connections across requests. A request
+waits about as long as its slowest artifact instead of the sum of all three;
+artifacts still running at the request deadline are cancelled and reported as
+timed out. Cache lookups and rate-limit reservations (api.llm_gateway) happen
+on the request thread before the calls are sent, and responses are settled
+back on it. Generated flashcards and quiz questions are saved with bulk_create.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import openai
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import llm_gateway
+from .models import Flashcard, Quiz, QuizQuestion
+from .snapshots import invalidate_snapshots
+from .summarization import condense_for_prompt
+
+logger = logging.getLogger(__name__)
+
+MODEL = 'gpt-3.5-turbo'
+# Seconds a generate request may take, prompt preparation included
+DEADLINE_SECONDS = getattr(settings, 'LEARNING_CONTENT_DEADLINE', 60)
+CONTENT_TYPES = ('summary', 'flashcards', 'quiz')
+# Characters of material text each artifact's prompt gets
+PROMPT_CHARS = {'summary': 4000, 'flashcards': 3000, 'quiz': 3000}
+
+COMMON_TOPICS = [
+    'algorithm', 'data structure', 'programming', 'computer science',
+    'mathematics', 'physics', 'chemistry', 'biology'
+]
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_client: Optional[openai.AsyncOpenAI] = None
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """The process's background loop, started on first use (so after any worker fork)"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='learning-content', daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def get_async_client() -> Optional[openai.AsyncOpenAI]:
+    """The shared client; its requests only run on the background loop, which owns its connections"""
+    global _client
+    if _client is None:
+        api_key = getattr(settings, 'OPENAI_API_KEY', None)
+        if not api_key:
+            return None
+        _client = openai.AsyncOpenAI(api_key=api_key, timeout=DEADLINE_SECONDS)
+    return _client
+
+
+def extract_topics(text_content: str) -> List[str]:
+    """Extract topics from text content"""
+    # Simple topic extraction (in production, use NLP libraries)
+    lower = text_content.lower()
+    return [topic.title() for topic in COMMON_TOPICS if topic in lower][:5]
+
+
+def material_text(material) -> str:
+    processed_file = getattr(material, 'processed_file', None)
+    if processed_file is not None and processed_file.extracted_text:
+        return processed_file.extracted_text
+    return f"Content from {material.title}"
+
+
+def _json_list(content: str) -> Optional[list]:
+    """The JSON array embedded in a model reply, if there is one"""
+    start, end = content.find('['), content.rfind(']') + 1
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(content[start:end])
+    except ValueError:
+        return None
+    return data if isinstance(data, list) else None
+
+
+# Each parser returns (payload, saveable); fallbacks are shown but never saved
+
+def _parse_summary(content: str, text: str, title: str) -> Tuple[Dict[str, Any], bool]:
+    return {'summary': content, 'topics': extract_topics(text), 'generated_at': timezone.now()}, True
+
+
+def _parse_flashcards(content: str, text: str, title: str) -> Tuple[List[Dict[str, Any]], bool]:
+    cards = [
+        {'front': str(card.get('front', '')), 'back': str(card.get('back', '')), 'topic': title}
+        for card in _json_list(content) or [] if isinstance(card, dict) and card.get('front')
+    ]
+    if cards:
+        return cards, True
+    return [
+        {'front': f'What is the main topic of {title}?', 'back': 'Key concepts from the material', 'topic': title},
+        {'front': f'What are the important points in {title}?', 'back': 'Main points covered', 'topic': title}
+    ], False
+
+
+def _question(data: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(data, dict) or not data.get('question'):
+        return None
+    options = data.get('options')
+    if not isinstance(options, list) or len(options) < 2:
+        return None
+    correct = data.get('correct_answer', 0)
+    if not isinstance(correct, int) or not 0 <= correct < len(options):
+        return None
+    return {
+        'question': str(data['question']),
+        'options': [str(option) for option in options],
+        'correct_answer': correct,
+        'question_type': 'multiple_choice'
+    }
+
+
+def _parse_quiz(content: str, text: str, title: str) -> Tuple[List[Dict[str, Any]], bool]:
+    questions = [question for question in map(_question, _json_list(content) or []) if question]
+    if questions:
+        return questions, True
+    return [{
+        'question': f'What is the main topic covered in {title}?',
+        'options': ['Topic A', 'Topic B', 'Topic C', 'Topic D'],
+        'correct_answer': 0,
+        'question_type': 'multiple_choice'
+    }], False
+
+
+# content type: (system message, user prompt prefix, max_tokens, parser)
+ARTIFACTS = {
+    'summary': (
+        "You are an expert academic assistant. Create a concise summary of the following lecture material, highlighting key concepts and main points.",
+        "Summarize this lecture material:",
+        500,
+        _parse_summary,
+    ),
+    'flashcards': (
+        "You are an expert educational content creator. Create 5 flashcards from the following material. Format each flashcard as JSON with 'front' and 'back' fields.",
+        "Create flashcards from this material:",
+        800,
+        _parse_flashcards,
+    ),
+    'quiz': (
+        "You are an expert quiz creator. Create 5 multiple-choice questions from the following material. Format each question as JSON with 'question', 'options' (array of 4 options), and 'correct_answer' (index 0-3) fields.",
+        "Create quiz questions from this material:",
+        1000,
+        _parse_quiz,
+    ),
+}
+
+
+def artifact_params(content_type: str, text: str) -> Dict[str, Any]:
+    system, instruction, max_tokens, _ = ARTIFACTS[content_type]
+    return llm_gateway.chat_params(
+        MODEL,
+        [
+            {"role": "system", "content": system},
+            {"role": "user", "content": f"{instruction}\n\n{text}"}
+        ],
+        max_tokens,
+        0.7
+    )
+
+
+def _failed(content_type: str, title: str, error: str) -> Tuple[Any, bool]:
+    """The placeholder shown for an artifact that errored or ran out of time"""
+    if content_type == 'summary':
+        return {'summary': f"Error generating summary: {error}", 'topics': [], 'generated_at': timezone.now()}, False
+    if content_type == 'flashcards':
+        return [{'front': 'Error generating flashcards', 'back': error, 'topic': title}], False
+    return [{
+        'question': 'Error generating quiz', 'options': ['A', 'B', 'C', 'D'],
+        'correct_answer': 0, 'question_type': 'multiple_choice'
+    }], False
+
+
+async def _create(client: openai.AsyncOpenAI, params: Dict[str, Any]) -> Any:
+    return await client.chat.completions.create(**params)
+
+
+async def _send(calls: Dict[str, Dict[str, Any]], timeout: float) -> Dict[str, Any]:
+    """
+    Send every call at once
+
+    Returns:
+        {content type: response, or the exception it raised (asyncio.TimeoutError
+        when it was still running at the timeout)}
+    """
+    client = get_async_client()
+    tasks = {name: asyncio.ensure_future(_create(client, params)) for name, params in calls.items()}
+    _, pending = await asyncio.wait(tasks.values(), timeout=max(timeout, 0.0))
+    for task in pending:
+        task.cancel()
+    return {
+        name: asyncio.TimeoutError() if task in pending else task.exception() or task.result()
+        for name, task in tasks.items()
+    }
+
+
+def generate_artifacts(material, content_types: Sequence[str], deadline: Optional[float] = None,
+                       user_id: Optional[int] = None) -> Dict[str, Tuple[Any, bool]]:
+    """
+    Generate the requested artifacts concurrently within deadline seconds
+    (LEARNING_CONTENT_DEADLINE by default), charging usage to user_id
+
+    Returns:
+        {content type: (payload, saveable)}; errors and timeouts come back as
+        the placeholder payloads the endpoint has always shown
+    """
+    started = time.monotonic()
+    deadline = DEADLINE_SECONDS if deadline is None else deadline
+    content_types = [name for name in CONTENT_TYPES if name in content_types]
+    if not content_types:
+        return {}
+    title = material.title
+    if get_async_client() is None:
+        return {name: _failed(name, title, 'OpenAI API key is not configured') for name in content_types}
+
+    source = material_text(material)
+    # Artifacts with the same budget share one condensed text
+    condensed: Dict[int, str] = {}
+    texts: Dict[str, str] = {}
+    for name in content_types:
+        budget = PROMPT_CHARS[name]
+        if budget not in condensed:
+            condensed[budget] = condense_for_prompt(source, budget, user_id=user_id)
+        texts[name] = condensed[budget]
+
+    results: Dict[str, Tuple[Any, bool]] = {}
+    contents: Dict[str, str] = {}
+    calls: Dict[str, Dict[str, Any]] = {}
+    reserved: Dict[str, float] = {}
+    for name in content_types:
+        params = artifact_params(name, texts[name])
+        hit = llm_gateway.cached(params, user_id)
+        if hit is not None:
+            contents[name] = hit.content
+            continue
+        try:
+            reserved[name] = llm_gateway.reserve(params, wait=max(deadline - (time.monotonic() - started), 0.0))
+        except llm_gateway.RateLimited as e:
+            results[name] = _failed(name, title, str(e))
+            continue
+        calls[name] = params
+
+    if calls:
+        remaining = deadline - (time.monotonic() - started)
+        future = asyncio.run_coroutine_threadsafe(_send(calls, remaining), _event_loop())
+        # _send enforces the deadline itself; the margin only covers cancellation
+        responses = future.result(timeout=max(remaining, 0.0) + 5)
+        for name, response in responses.items():
+            if isinstance(response, BaseException):
+                llm_gateway.release(reserved[name])
+                error = 'timed out' if isinstance(response, asyncio.TimeoutError) else str(response)
+                logger.error(f"Generating {name} for {title} failed: {error}")
+                results[name] = _failed(name, title, error)
+            else:
+                contents[name] = llm_gateway.settle(calls[name], response, reserved[name], user_id=user_id).content
+
+    for name, content in contents.items():
+        results[name] = ARTIFACTS[name][3](content, texts[name], title)
+    return {name: results[name] for name in content_types}
+
+
+def _question_key(text: str, options: List[str], correct: Optional[int]) -> Tuple[str, Tuple[str, ...], Optional[int]]:
+    return text, tuple(options or ()), correct
+
+
+def _existing_quiz(material, title: str, questions: List[Dict[str, Any]]) -> Optional[Quiz]:
+    """A quiz already generated for this material with exactly these questions"""
+    wanted = [_question_key(q['question'], q['options'], q['correct_answer']) for q in questions]
+    quizzes = Quiz.objects.filter(portfolio_id=material.portfolio_id, title=title).prefetch_related('questions')
+    for quiz in quizzes:
+        existing = [
+            _question_key(q.question_text, q.options, q.correct_option_index)
+            for q in sorted(quiz.questions.all(), key=lambda q: q.pk)
+        ]
+        if existing == wanted:
+            return quiz
+    return None
+
+
+def save_artifacts(material, user, results: Dict[str, Tuple[Any, bool]]) -> Dict[str, Any]:
+    """
+    Store generated flashcards and quiz questions; returns their ids
+
+    Saving is idempotent: flashcards the material already has and a quiz
+    with the same questions are reused rather than inserted again, so a
+    repeated request (often answered from the completion cache) adds nothing.
+    """
+    saved: Dict[str, Any] = {}
+    cards, cards_ok = results.get('flashcards', (None, False))
+    questions, quiz_ok = results.get('quiz', (None, False))
+    if not cards_ok and not quiz_ok:
+        return saved
+
+    inserted = False
+    with transaction.atomic():
+        if cards_ok:
+            existing = {
+                (front, back): pk
+                for pk, front, back in Flashcard.objects.filter(material=material).values_list('pk', 'front', 'back')
+            }
+            new_cards = {}
+            for card in cards:
+                key = (card['front'], card['back'])
+                if key not in existing and key not in new_cards:
+                    new_cards[key] = Flashcard(material=material, front=card['front'], back=card['back'])
+            for card in Flashcard.objects.bulk_create(list(new_cards.values())):
+                existing[(card.front, card.back)] = card.pk
+            saved['flashcard_ids'] = list(dict.fromkeys(existing[(card['front'], card['back'])] for card in cards))
+            inserted = bool(new_cards)
+        if quiz_ok:
+            title = f"{material.title} Quiz"[:200]
+            quiz = _existing_quiz(material, title, questions)
+            if quiz is None:
+                quiz = Quiz.objects.create(
+                    portfolio_id=material.portfolio_id,
+                    title=title,
+                    quiz_type='multiple_choice',
+                    topic=(material.topic or material.title)[:100],
+                    created_by=user
+                )
+                QuizQuestion.objects.bulk_create([
+                    QuizQuestion(
+                        quiz=quiz,
+                        question_text=question['question'],
+                        question_type='multiple_choice',
+                        options=question['options'],
+                        correct_option_index=question['correct_answer']
+                    )
+                    for question in questions
+                ])
+                inserted = True
+            saved['quiz_id'] = quiz.pk
+
+    if inserted:
+        # The bulk inserts skip the signals that drop this portfolio's cached snapshots
+        invalidate_snapshots(material.portfolio_id)
+    return saved
@@ -0,0 +1,127 @@
+"""
+Public learning-link directory for HackWestTX Class Portfolio
+Serves /api/youtube-videos/public/ as keyset-paged cards built from the
+stored link_type/domain/video_id columns, filterable by link type and domain.
+Each page is cached with its ETag under a generation that any link save or
+delete bumps. The generation is shared by every worker (api.generations), so
+a repeat request costs one indexed lookup before it is answered from the
+cache (or with a 304).
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import generations
+from .models import LINK_TYPES, DEFAULT_LINK_TYPE, YouTubeVideo, normalize_domain
+from .pagination import clamp_limit, keyset_page, page_payload
+
+DIRECTORY_CACHE_TIMEOUT = getattr(settings, 'LINK_DIRECTORY_CACHE_TIMEOUT', 300)
+# How long browsers and shared caches may reuse a page before revalidating
+DIRECTORY_MAX_AGE = getattr(settings, 'LINK_DIRECTORY_MAX_AGE', 60)
+GENERATION_NAME = 'links:directory'
+
+CARD_FIELDS = ('id', 'user_id', 'url', 'title', 'description', 'link_type', 'domain', 'video_id', 'created_at')
+# Query parameters that change a directory page
+PARAMS = ('link_type', 'domain', 'title', 'user_id', 'cursor', 'limit', 'total')
+
+# Lower-cased ?link_type= value -> stored link_type
+KNOWN_LINK_TYPES = {
+    name.lower(): name for name in [*(name for _, name in LINK_TYPES), DEFAULT_LINK_TYPE]
+}
+
+
+def _generation() -> int:
+    return generations.current(GENERATION_NAME)
+
+
+def invalidate_directory() -> None:
+    """Bump the generation so every worker treats its cached directory pages as stale"""
+    generations.bump(GENERATION_NAME)
+
+
+def link_card(link: YouTubeVideo) -> Dict[str, Any]:
+    """Everything a directory card renders, from stored columns only"""
+    return {
+        'id': link.id,
+        'user_id': link.user_id,
+        'url': link.url,
+        'title': link.title,
+        'description': link.description,
+        'link_type': link.link_type,
+        'domain': link.domain,
+        'video_id': link.video_id,
+        'thumbnail_url': link.thumbnail_url,
+        'embed_url': link.embed_url,
+        'created_at': link.created_at,
+    }
+
+
+def directory_queryset(params):
+    """
+    Links matching the directory filters, newest first
+
+    Raises:
+        ValueError: for an unknown link_type or a non-numeric user_id
+    """
+    links = YouTubeVideo.objects.only(*CARD_FIELDS).order_by('-created_at', '-pk')
+
+    link_type = params.get('link_type')
+    if link_type:
+        if link_type.strip().lower() not in KNOWN_LINK_TYPES:
+            raise ValueError(f"link_type must be one of: {', '.join(sorted(KNOWN_LINK_TYPES.values()))}")
+        links = links.filter(link_type=KNOWN_LINK_TYPES[link_type.strip().lower()])
+
+    domain = normalize_domain(params.get('domain'))
+    if domain:
+        links = links.filter(domain=domain)
+
+    title = params.get('title')
+    if title:
+        links = links.filter(title__icontains=title)
+
+    user_id = params.get('user_id')
+    if user_id:
+        if not str(user_id).isdigit():
+            raise ValueError('user_id must be an integer')
+        links = links.filter(user_id=int(user_id))
+    return links
+
+
+def _page_key(params) -> str:
+    selected = {name: params.get(name) for name in PARAMS if params.get(name)}
+    signature = hashlib.sha1(json.dumps(selected, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"links:directory:{_generation()}:{signature}"
+
+
+def directory_page(params) -> Tuple[Dict[str, Any], str]:
+    """
+    (response body, ETag) of one directory page, cached per filter set
+
+    Raises:
+        ValueError: with a client-facing message for bad filters or cursor
+    """
+    key = _page_key(params)
+    cached: Optional[Dict[str, Any]] = cache.get(key)
+    if cached is None:
+        page = keyset_page(
+            directory_queryset(params),
+            cursor=params.get('cursor'),
+            limit=clamp_limit(params.get('limit')),
+            total=params.get('total') or None
+        )
+        body = json.dumps(
+            page_payload(page, [link_card(link) for link in page['rows']]),
+            cls=DjangoJSONEncoder, sort_keys=True
+        )
+        # Stored as rendered JSON so a cached page and a fresh one are byte-identical
+        cached = {
+            'payload': json.loads(body),
+            'etag': f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"',
+        }
+        cache.set(key, cached, DIRECTORY_CACHE_TIMEOUT)
+    return cached['payload'], cached['etag']
@@ -0,0 +1,213 @@
+"""
+OpenAI gateway for HackWestTX Class Portfolio
+Every chat completion goes through here. Responses are cached in ContentCache
+keyed by the model, a hash of the messages and the sampling parameters, so an
+identical request is answered without calling the API. Calls draw from two
+token buckets (requests and tokens per minute) stored in LLMRateBucket, so all
+gunicorn workers and job runners share one budget: a burst waits for budget
+instead of failing with 429s, and only gives up (RateLimited) after
+LLM_RATE_LIMIT_WAIT seconds. Each user's requests, tokens and estimated cost
+are totalled per day in LLMUsage.
+
+Callers that make several calls at once reserve budget and look up the cache
+on their own thread, send from a pool or event loop, then settle each
+response back on their thread, so the database is only used from one thread.
+"""
+
+import json
+import logging
+import random
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from . import content_cache
+from .models import LLMRateBucket, LLMUsage
+
+logger = logging.getLogger(__name__)
+
+REQUESTS_PER_MINUTE = getattr(settings, 'LLM_REQUESTS_PER_MINUTE', 300)
+TOKENS_PER_MINUTE = getattr(settings, 'LLM_TOKENS_PER_MINUTE', 90000)
+# Longest a call waits for budget before giving up
+RATE_LIMIT_WAIT = getattr(settings, 'LLM_RATE_LIMIT_WAIT', 30)
+CACHE_TTL_DAYS = getattr(settings, 'LLM_CACHE_TTL_DAYS', 7)
+# USD per 1K (prompt, completion) tokens
+PRICES = getattr(settings, 'LLM_PRICES', {
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+})
+
+# Capacity of each bucket; a bucket refills its whole capacity every minute. 0 disables it.
+BUCKETS = {
+    'requests': REQUESTS_PER_MINUTE,
+    'tokens': TOKENS_PER_MINUTE,
+}
+# Re-check a bucket at least this often while waiting, since other workers return unused budget
+MAX_SLEEP = 1.0
+# Rough characters per token for estimates made before the call
+CHARS_PER_TOKEN = 4
+
+
+class RateLimited(Exception):
+    """No budget became available within the wait; treat it like a 429"""
+
+
+class Completion(NamedTuple):
+    content: str
+    cached: bool
+    prompt_tokens: int
+    completion_tokens: int
+
+
+def chat_params(model: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float) -> Dict[str, Any]:
+    """Keyword arguments for chat.completions.create; also what the cache is keyed on"""
+    return {'model': model, 'messages': messages, 'max_tokens': max_tokens, 'temperature': temperature}
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    messages = content_cache.sha256_text(json.dumps(params['messages'], sort_keys=True))
+    options = json.dumps({name: value for name, value in params.items() if name not in ('model', 'messages')}, sort_keys=True)
+    return content_cache.make_key('completion', params['model'], messages, options)
+
+
+def estimate_tokens(params: Dict[str, Any]) -> int:
+    """Upper-end token count of a call, charged before it is made and corrected after"""
+    prompt = sum(len(message['content']) // CHARS_PER_TOKEN + 4 for message in params['messages'])
+    return prompt + params['max_tokens']
+
+
+def _take(name: str, amount: float, deadline: float) -> float:
+    """Take amount from a bucket, waiting until deadline (time.monotonic) for it to refill"""
+    capacity = BUCKETS[name]
+    if not capacity or amount <= 0:
+        return 0
+    # A call bigger than the bucket could never run; let it through on a full bucket
+    amount = min(amount, capacity)
+    per_second = capacity / 60.0
+    while True:
+        bucket = LLMRateBucket.objects.filter(name=name).values('tokens', 'updated_at', 'version').first()
+        if bucket is None:
+            LLMRateBucket.objects.bulk_create([LLMRateBucket(name=name, tokens=capacity)], ignore_conflicts=True)
+            continue
+        now = timezone.now()
+        elapsed = max((now - bucket['updated_at']).total_seconds(), 0.0)
+        available = min(capacity, bucket['tokens'] + elapsed * per_second)
+        if available >= amount:
+            # Conditional on the version read, so two workers can't spend the same budget
+            taken = LLMRateBucket.objects.filter(name=name, version=bucket['version']).update(
+                tokens=available - amount, updated_at=now, version=F('version') + 1
+            )
+            if taken:
+                return amount
+            continue
+        wait = (amount - available) / per_second
+        if time.monotonic() + wait > deadline:
+            raise RateLimited(f"OpenAI {name} budget exhausted")
+        time.sleep(min(wait, MAX_SLEEP) + random.uniform(0, 0.05))
+
+
+def _give(name: str, amount: float) -> None:
+    """Return unused budget to a bucket; a negative amount charges an overrun"""
+    if not BUCKETS[name] or not amount:
+        return
+    LLMRateBucket.objects.filter(name=name).update(tokens=F('tokens') + amount, version=F('version') + 1)
+
+
+def reserve(params: Dict[str, Any], wait: Optional[float] = None) -> float:
+    """
+    Take one request and the estimated tokens of a call from the shared budget
+
+    Returns:
+        the tokens reserved, to pass to settle() or release()
+
+    Raises:
+        RateLimited: if the budget isn't there within wait seconds
+    """
+    deadline = time.monotonic() + (RATE_LIMIT_WAIT if wait is None else wait)
+    _take('requests', 1, deadline)
+    try:
+        return _take('tokens', estimate_tokens(params), deadline)
+    except RateLimited:
+        _give('requests', 1)
+        raise
+
+
+def release(reserved: float) -> None:
+    """Give back the tokens of a call that failed before using them"""
+    _give('tokens', reserved)
+
+
+def record_usage(user_id: Optional[int], model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 cached: bool = False) -> None:
+    """Add one call to the user's totals for today; calls made for nobody aren't recorded"""
+    if user_id is None:
+        return
+    prompt_price, completion_price = PRICES.get(model, (0, 0))
+    cost = (Decimal(str(prompt_price)) * prompt_tokens + Decimal(str(completion_price)) * completion_tokens) / 1000
+    day = timezone.localdate()
+    try:
+        LLMUsage.objects.bulk_create([LLMUsage(user_id=user_id, day=day, model=model)], ignore_conflicts=True)
+        LLMUsage.objects.filter(user_id=user_id, day=day, model=model).update(
+            requests=F('requests') + 1,
+            cached_requests=F('cached_requests') + int(cached),
+            prompt_tokens=F('prompt_tokens') + prompt_tokens,
+            completion_tokens=F('completion_tokens') + completion_tokens,
+            cost=F('cost') + cost
+        )
+    except Exception as e:
+        logger.warning(f"Could not record OpenAI usage: {str(e)}")
+
+
+def cached(params: Dict[str, Any], user_id: Optional[int] = None) -> Optional[Completion]:
+    """The cached response to an identical earlier call, if any"""
+    try:
+        value = content_cache.lookup('completion', cache_key(params))
+    except Exception as e:
+        logger.warning(f"Completion cache unavailable: {str(e)}")
+        return None
+    if value is None:
+        return None
+    record_usage(user_id, params['model'], cached=True)
+    return Completion(value['content'], True, 0, 0)
+
+
+def settle(params: Dict[str, Any], response: Any, reserved: float, user_id: Optional[int] = None,
+           use_cache: bool = True) -> Completion:
+    """Correct the token reservation to the call's real usage, record it and cache the response"""
+    content = response.choices[0].message.content or ''
+    usage = getattr(response, 'usage', None)
+    prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+    completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+    if usage is not None:
+        _give('tokens', reserved - prompt_tokens - completion_tokens)
+    record_usage(user_id, params['model'], prompt_tokens, completion_tokens)
+    if use_cache:
+        try:
+            content_cache.store('completion', cache_key(params), {'content': content}, ttl_days=CACHE_TTL_DAYS)
+        except Exception as e:
+            logger.warning(f"Could not cache completion: {str(e)}")
+    return Completion(content, False, prompt_tokens, completion_tokens)
+
+
+def complete(client, params: Dict[str, Any], user_id: Optional[int] = None, use_cache: bool = True,
+             wait: Optional[float] = None) -> Completion:
+    """
+    One chat completion through the cache and the shared rate limits
+
+    Raises:
+        RateLimited: if no budget became available within wait seconds
+    """
+    if use_cache:
+        hit = cached(params, user_id)
+        if hit is not None:
+            return hit
+    reserved = reserve(params, wait)
+    try:
+        response = client.chat.completions.create(**params)
+    except Exception:
+        release(reserved)
+        raise
+    return settle(params, response, reserved, user_id=user_id, use_cache=use_cache)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from api.models import SearchDocument
+from api.search import get_search_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for portfolios, syllabi and processed files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete every existing search document before re-indexing',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = SearchDocument.objects.all().delete()
+            self.stdout.write(f"Deleted {deleted} search documents")
+
+        total = rebuild_index(batch_size=options['batch_size'])
+        backend = get_search_backend()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {total} objects using the '{backend.name}' search backend"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.tags import rebuild_tag_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the TagCount table (tag and professor popularity) from all portfolios'
+
+    def handle(self, *args, **options):
+        total = rebuild_tag_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} tag counts"))
@@ -0,0 +1,78 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from api.syllabus_batch import BATCH_SIZE, reextract_syllabi
+
+
+class Command(BaseCommand):
+    help = 'Re-run syllabus extraction over every syllabus on a process pool, resumable from a checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes (1 runs in this process)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Syllabi extracted and written per batch',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default='reextract_syllabi.checkpoint',
+            help='Progress file; an interrupted run resumes after its last syllabus',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and start from the first syllabus',
+        )
+        parser.add_argument(
+            '--reparse-files',
+            action='store_true',
+            help='Extract text from the uploaded files again instead of using the stored text',
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only syllabi without an extraction',
+        )
+        parser.add_argument(
+            '--no-index',
+            action='store_true',
+            help='Skip search index updates (run rebuild_search_index afterwards)',
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = options['checkpoint']
+        if options['restart'] and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        def report(stats):
+            self.stdout.write(
+                f"{stats['processed']} syllabi ({stats['failed']} failed), "
+                f"through id {stats['last_id']}, {stats['per_second']}/s"
+            )
+
+        try:
+            stats = reextract_syllabi(
+                workers=max(1, options['workers']),
+                batch_size=max(1, options['batch_size']),
+                checkpoint=checkpoint,
+                reparse=options['reparse_files'],
+                missing_only=options['missing_only'],
+                reindex=not options['no_index'],
+                progress=report,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(f"Interrupted; run again to resume from {checkpoint}")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-extracted {stats['succeeded']} of {stats['processed']} syllabi "
+            f"in {stats['seconds']}s ({stats['per_second']}/s)"
+        ))
@@ -0,0 +1,51 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from api.jobs import default_worker_id, work
+
+
+class Command(BaseCommand):
+    help = 'Run a background job worker (file processing and other queued tasks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty instead of polling',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=None,
+            help='Exit after processing this many jobs',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep when the queue is empty',
+        )
+        parser.add_argument(
+            '--worker-id',
+            default=None,
+            help='Identifier recorded on claimed jobs (defaults to host:pid)',
+        )
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
+        worker_id = options['worker_id'] or default_worker_id()
+        self.stdout.write(f"Worker {worker_id} started")
+
+        try:
+            processed = work(
+                worker_id=worker_id,
+                poll_interval=options['poll_interval'],
+                max_jobs=options['max_jobs'],
+                once=options['once'],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Worker interrupted")
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} processed {processed} jobs"))
@@ -0,0 +1,356 @@
+"""
+Request metrics for HackWestTX Class Portfolio
+MetricsMiddleware records latency, database queries/time, response size and
+status for every request, keyed by route. Each thread writes only to its own
+buckets, so recording takes no locks. Every few seconds a worker writes a
+snapshot to METRICS_DIR/<pid>.json; readers merge the snapshots of all
+gunicorn workers on the host. Latency is kept as a fixed-bucket histogram,
+which merges by addition and gives p50/p95/p99 without storing samples.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = getattr(settings, 'METRICS_DIR', '') or os.path.join(tempfile.gettempdir(), 'hackwesttx-metrics')
+FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+# Snapshots from workers that haven't written for this long are dropped
+RETENTION_SECONDS = getattr(settings, 'METRICS_RETENTION_SECONDS', 3600)
+
+# Upper bounds in milliseconds; the last bucket is +Inf
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Layout of one series: fixed counters followed by the latency histogram
+COUNT, LATENCY_SUM, DB_QUERIES, DB_TIME, RESPONSE_BYTES, STATUS_2XX, STATUS_3XX, STATUS_4XX, STATUS_5XX = range(9)
+FIRST_BUCKET = 9
+SERIES_LENGTH = FIRST_BUCKET + len(LATENCY_BUCKETS_MS) + 1
+
+PROCESS_STARTED = time.time()
+
+_local = threading.local()
+# (thread, buckets) for every thread that has recorded; the lock is only taken
+# when a thread records for the first time and when dead threads are folded away
+_thread_buckets: List[Tuple[threading.Thread, Dict[Tuple[str, str], List[float]]]] = []
+_retired: Dict[str, List[float]] = {}
+_registry_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_next_flush = 0.0
+
+
+def _buckets() -> Dict[Tuple[str, str], List[float]]:
+    buckets = getattr(_local, 'buckets', None)
+    if buckets is None:
+        buckets = _local.buckets = {}
+        with _registry_lock:
+            _thread_buckets.append((threading.current_thread(), buckets))
+    return buckets
+
+
+def _retire_dead_threads() -> None:
+    # The dev server starts a thread per request; fold finished threads into one series set
+    with _registry_lock:
+        alive = []
+        for thread, buckets in _thread_buckets:
+            if thread.is_alive():
+                alive.append((thread, buckets))
+            else:
+                for (route, method), series in buckets.items():
+                    _merge_into(_retired, _series_key(route, method), series)
+        _thread_buckets[:] = alive
+
+
+def _bucket_index(duration_ms: float) -> int:
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if duration_ms <= bound:
+            return FIRST_BUCKET + index
+    return SERIES_LENGTH - 1
+
+
+def record(route: str, method: str, status_code: int, duration_ms: float,
+           db_queries: int = 0, db_time_ms: float = 0.0, response_bytes: int = 0) -> None:
+    """Add one request to this thread's buckets"""
+    buckets = _buckets()
+    series = buckets.get((route, method))
+    if series is None:
+        series = buckets[(route, method)] = [0.0] * SERIES_LENGTH
+    series[COUNT] += 1
+    series[LATENCY_SUM] += duration_ms
+    series[DB_QUERIES] += db_queries
+    series[DB_TIME] += db_time_ms
+    series[RESPONSE_BYTES] += response_bytes
+    series[STATUS_2XX + min(max(status_code // 100, 2), 5) - 2] += 1
+    series[_bucket_index(duration_ms)] += 1
+
+
+def _merge_into(target: Dict[str, List[float]], key: str, series: List[float]) -> None:
+    existing = target.get(key)
+    if existing is None:
+        target[key] = list(series)
+    else:
+        for index, value in enumerate(series):
+            existing[index] += value
+
+
+def _series_key(route: str, method: str) -> str:
+    return f"{method} {route}"
+
+
+def local_snapshot() -> Dict[str, Any]:
+    """This process's totals"""
+    merged: Dict[str, List[float]] = {}
+    with _registry_lock:
+        for key, series in _retired.items():
+            _merge_into(merged, key, series)
+        threads = list(_thread_buckets)
+    for _, buckets in threads:
+        for (route, method), series in list(buckets.items()):
+            _merge_into(merged, _series_key(route, method), series)
+    return {
+        'pid': os.getpid(),
+        'started_at': PROCESS_STARTED,
+        'written_at': time.time(),
+        'series': merged,
+    }
+
+
+def flush(force: bool = False) -> None:
+    """Write this process's snapshot for other workers, at most every FLUSH_INTERVAL seconds"""
+    global _next_flush
+    now = time.monotonic()
+    if not force and now < _next_flush:
+        return
+    # Only one thread writes; the others carry on serving
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _next_flush = now + FLUSH_INTERVAL
+        _retire_dead_threads()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as snapshot_file:
+            json.dump(local_snapshot(), snapshot_file)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write metrics snapshot: {str(e)}")
+    finally:
+        _flush_lock.release()
+
+
+def _read_snapshots() -> List[Dict[str, Any]]:
+    snapshots = [local_snapshot()]
+    own_file = f"{os.getpid()}.json"
+    try:
+        names = os.listdir(METRICS_DIR)
+    except OSError:
+        return snapshots
+
+    cutoff = time.time() - RETENTION_SECONDS
+    for name in names:
+        if not name.endswith('.json') or name == own_file:
+            continue
+        path = os.path.join(METRICS_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                continue
+            with open(path) as snapshot_file:
+                snapshots.append(json.load(snapshot_file))
+        except (OSError, ValueError):
+            # Removed or half-written by another worker; it will be back next flush
+            continue
+    return snapshots
+
+
+def aggregate() -> Dict[str, Any]:
+    """Totals across every worker on this host"""
+    snapshots = _read_snapshots()
+    series: Dict[str, List[float]] = {}
+    for snapshot in snapshots:
+        for key, values in snapshot.get('series', {}).items():
+            if len(values) == SERIES_LENGTH:
+                _merge_into(series, key, values)
+    return {
+        'workers': len(snapshots),
+        'started_at': min(snapshot.get('started_at', PROCESS_STARTED) for snapshot in snapshots),
+        'series': series,
+    }
+
+
+def percentile(series: List[float], fraction: float) -> Optional[float]:
+    """Latency percentile in ms, interpolated within the histogram bucket"""
+    total = series[COUNT]
+    if not total:
+        return None
+    rank = fraction * total
+    seen = 0.0
+    lower = 0.0
+    for index, bound in enumerate(LATENCY_BUCKETS_MS + [None]):
+        in_bucket = series[FIRST_BUCKET + index]
+        if in_bucket and seen + in_bucket >= rank:
+            if bound is None:
+                return float(LATENCY_BUCKETS_MS[-1])
+            return lower + (bound - lower) * (rank - seen) / in_bucket
+        seen += in_bucket
+        if bound is not None:
+            lower = bound
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+def summarize(series: List[float]) -> Dict[str, Any]:
+    count = series[COUNT]
+
+    def rounded(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        'requests': int(count),
+        'errors': int(series[STATUS_5XX]),
+        'client_errors': int(series[STATUS_4XX]),
+        'error_rate': round(series[STATUS_5XX] / count, 4) if count else 0.0,
+        'latency_ms': {
+            'avg': rounded(series[LATENCY_SUM] / count) if count else None,
+            'p50': rounded(percentile(series, 0.50)),
+            'p95': rounded(percentile(series, 0.95)),
+            'p99': rounded(percentile(series, 0.99)),
+        },
+        'db': {
+            'avg_queries': round(series[DB_QUERIES] / count, 2) if count else None,
+            'avg_time_ms': round(series[DB_TIME] / count, 2) if count else None,
+        },
+        'avg_response_bytes': int(series[RESPONSE_BYTES] / count) if count else None,
+    }
+
+
+def report(top: int = 20) -> Dict[str, Any]:
+    """Overall and per-route numbers for the performance endpoints"""
+    data = aggregate()
+    overall = [0.0] * SERIES_LENGTH
+    for values in data['series'].values():
+        for index, value in enumerate(values):
+            overall[index] += value
+
+    uptime = max(time.time() - data['started_at'], 1.0)
+    busiest = sorted(data['series'].items(), key=lambda item: -item[1][COUNT])[:top]
+    return {
+        'workers': data['workers'],
+        'uptime_seconds': int(uptime),
+        'requests_per_minute': round(overall[COUNT] / uptime * 60, 2),
+        'overall': summarize(overall),
+        'routes': {key: summarize(values) for key, values in busiest},
+    }
+
+
+def _labels(key: str) -> str:
+    method, route = key.split(' ', 1)
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'route="{route}",method="{method}"'
+
+
+def prometheus_text() -> str:
+    """Prometheus text exposition (format 0.0.4) of the aggregated metrics"""
+    data = aggregate()
+    lines = [
+        '# HELP hackwesttx_http_requests_total HTTP requests by route, method and status class.',
+        '# TYPE hackwesttx_http_requests_total counter',
+    ]
+    for key, values in sorted(data['series'].items()):
+        for status_class, index in (('2xx', STATUS_2XX), ('3xx', STATUS_3XX), ('4xx', STATUS_4XX), ('5xx', STATUS_5XX)):
+            if values[index]:
+                lines.append(f'hackwesttx_http_requests_total{{{_labels(key)},status="{status_class}"}} {int(values[index])}')
+
+    lines += [
+        '# HELP hackwesttx_http_request_duration_seconds HTTP request latency.',
+        '# TYPE hackwesttx_http_request_duration_seconds histogram',
+    ]
+    for key, values in sorted(data['series'].items()):
+        labels = _labels(key)
+        cumulative = 0
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            cumulative += int(values[FIRST_BUCKET + index])
+            lines.append(f'hackwesttx_http_request_duration_seconds_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}')
+        lines.append(f'hackwesttx_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {int(values[COUNT])}')
+        lines.append(f'hackwesttx_http_request_duration_seconds_sum{{{labels}}} {values[LATENCY_SUM] / 1000:.6f}')
+        lines.append(f'hackwesttx_http_request_duration_seconds_count{{{labels}}} {int(values[COUNT])}')
+
+    for name, index, help_text, scale in (
+        ('hackwesttx_db_queries_total', DB_QUERIES, 'Database queries issued while serving requests.', 1),
+        ('hackwesttx_db_query_seconds_total', DB_TIME, 'Time spent in database queries.', 1000),
+        ('hackwesttx_http_response_bytes_total', RESPONSE_BYTES, 'Response body bytes sent.', 1),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for key, values in sorted(data['series'].items()):
+            value = values[index] / scale
+            lines.append(f'{name}{{{_labels(key)}}} {value:.6f}' if scale != 1 else f'{name}{{{_labels(key)}}} {int(value)}')
+
+    lines += [
+        '# HELP hackwesttx_metrics_workers Worker processes contributing to these metrics.',
+        '# TYPE hackwesttx_metrics_workers gauge',
+        f"hackwesttx_metrics_workers {data['workers']}",
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+class _QueryTimer:
+    """connection.execute_wrapper that counts queries and their time"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _route(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    # The pattern, not the path, keeps the number of series bounded
+    return match.route or match.view_name or '<unmatched>'
+
+
+class MetricsMiddleware:
+    """Records every request into the per-thread metric buckets"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        timer = _QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            size = len(response.content) if not response.streaming else 0
+            record(
+                _route(request), request.method, response.status_code, duration_ms,
+                timer.queries, timer.seconds * 1000, size
+            )
+            flush()
+        except Exception:
+            logger.exception("Failed to record request metrics")
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-16 20:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classportfolio',
+            name='tags',
+            field=models.JSONField(blank=True, default=list, help_text="Topic tags, e.g. ['calculus', 'exam-prep']"),
+        ),
+        migrations.CreateModel(
+            name='PortfolioTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, max_length=50)),
+                ('portfolio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_rows', to='api.classportfolio')),
+            ],
+            options={
+                'unique_together': {('portfolio', 'name')},
+            },
+        ),
+    ]
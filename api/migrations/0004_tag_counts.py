@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-16 20:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_portfolio_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('tag', 'Tag'), ('professor', 'Professor')], max_length=20)),
+                ('name', models.CharField(max_length=100)),
+                ('portfolio_count', models.IntegerField(default=0)),
+                ('trending_score', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', '-trending_score'], name='tagcount_trending_idx'), models.Index(fields=['kind', '-portfolio_count'], name='tagcount_popular_idx')],
+                'unique_together': {('kind', 'name')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-16 20:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA-256 of the namespaced cache key', max_length=64, unique=True)),
+                ('kind', models.CharField(choices=[('extraction', 'Text Extraction'), ('summary', 'AI Summary')], max_length=20)),
+                ('value', models.JSONField()),
+                ('size', models.PositiveIntegerField(default=0, help_text='Approximate size of value in bytes')),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'last_accessed_at'], name='contentcache_lru_idx'), models.Index(fields=['expires_at'], name='contentcache_expiry_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-16 21:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_quiz_answer_key_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classportfolio',
+            name='snapshot_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='PortfolioSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('access_level', models.CharField(choices=[('preview', 'Preview'), ('full', 'Full Access')], max_length=10)),
+                ('content', models.JSONField(default=dict)),
+                ('version', models.PositiveIntegerField(default=0, help_text='ClassPortfolio.snapshot_version this was built from')),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('portfolio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='api.classportfolio')),
+            ],
+            options={
+                'unique_together': {('portfolio', 'access_level')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:05
+
+from django.db import migrations, models
+
+
+def fill_link_details(apps, schema_editor):
+    from api.models import detect_link_type, extract_video_id, normalize_domain
+
+    YouTubeVideo = apps.get_model('api', 'YouTubeVideo')
+    links = list(YouTubeVideo.objects.only('id', 'url'))
+    for link in links:
+        link.link_type = detect_link_type(link.url)
+        link.domain = normalize_domain(link.url)
+        link.video_id = extract_video_id(link.url)
+    YouTubeVideo.objects.bulk_update(links, ['link_type', 'domain', 'video_id'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_calendar_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='youtubevideo',
+            name='link_type',
+            field=models.CharField(blank=True, editable=False, help_text='Detected resource type', max_length=30),
+        ),
+        migrations.AddField(
+            model_name='youtubevideo',
+            name='domain',
+            field=models.CharField(blank=True, editable=False, help_text='Host without www.', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='youtubevideo',
+            name='video_id',
+            field=models.CharField(blank=True, editable=False, help_text='YouTube video ID', max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='youtubevideo',
+            index=models.Index(fields=['link_type', '-created_at'], name='learninglink_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='youtubevideo',
+            index=models.Index(fields=['domain', '-created_at'], name='learninglink_domain_idx'),
+        ),
+        migrations.RunPython(fill_link_details, migrations.RunPython.noop),
+    ]
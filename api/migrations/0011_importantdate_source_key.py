@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_learning_link_details'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importantdate',
+            name='source_key',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='importantdate',
+            unique_together={('portfolio', 'source_key')},
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_importantdate_source_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contentcache',
+            name='kind',
+            field=models.CharField(choices=[('extraction', 'Text Extraction'), ('summary', 'AI Summary'), ('completion', 'AI Completion')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='LLMRateBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20, unique=True)),
+                ('tokens', models.FloatField(help_text='Budget left as of updated_at')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('version', models.PositiveIntegerField(default=0, help_text='Bumped by every write; takes are conditional on it')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LLMUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('model', models.CharField(max_length=50)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('cached_requests', models.PositiveIntegerField(default=0, help_text='Answered from the response cache, free')),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('cost', models.DecimalField(decimal_places=6, default=0, help_text='Estimated USD', max_digits=10)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='llm_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-day'],
+                'unique_together': {('user', 'day', 'model')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 11:40
+
+from django.db import migrations
+
+
+def detach_processed_files(apps, schema_editor):
+    SearchDocument = apps.get_model('api', 'SearchDocument')
+    SearchDocument.objects.filter(kind='processed_file').update(portfolio=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_cache_generation'),
+    ]
+
+    operations = [
+        migrations.RunPython(detach_processed_files, migrations.RunPython.noop),
+    ]
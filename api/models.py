@@ -4,6 +4,22 @@ from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator, URLValidator
 from django.core.exceptions import ValidationError
 import re
+from urllib.parse import urlsplit
+
+def save_without_counters(instance, counters, args, kwargs):
+    """
+    Save an existing row without writing back counters that are bumped with F() UPDATEs
+
+    A full save of an instance loaded before the bump would otherwise put the
+    old value back.
+    """
+    if (not instance._state.adding and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert') and len(args) == 0):
+        kwargs['update_fields'] = [
+            field.name for field in instance._meta.concrete_fields
+            if not field.primary_key and field.name not in counters
+        ]
+    return models.Model.save(instance, *args, **kwargs)
 
 class User(AbstractUser):
     # User roles
@@ -64,6 +80,15 @@ class PasswordResetToken(models.Model):
     def is_valid(self):
         return not self.is_used and not self.is_expired()
 
+class CalendarFeedToken(models.Model):
+    """Secret that authenticates a user's iCal subscription URL (see api.ical_feed)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='calendar_feed_token')
+    token = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Calendar feed for {self.user.username}"
+
 class Department(models.Model):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=10, unique=True)
@@ -93,13 +118,31 @@ class ClassPortfolio(models.Model):
         default='#6366F1',
         help_text="Hex color code for visual identification (e.g., #FF5733)"
     )
+    tags = models.JSONField(default=list, blank=True, help_text="Topic tags, e.g. ['calculus', 'exam-prep']")
+    # Bumped whenever the portfolio or its content changes; cached preview snapshots carry it (see api.snapshots)
+    snapshot_version = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         unique_together = ['professor', 'semester', 'year']
     
     def __str__(self):
         return f"{self.professor} ({self.semester} {self.year})"
-    
+
+    def save(self, *args, **kwargs):
+        from .tags import normalize_tags
+        self.tags = normalize_tags(self.tags)
+        save_without_counters(self, ('snapshot_version',), args, kwargs)
+
+    def can_user_access(self, user):
+        """Check whether the user can view this portfolio (see api.access)"""
+        from .access import can_access_portfolio
+        return can_access_portfolio(self, user)
+
+    def can_user_edit(self, user):
+        """Check whether the user can edit this portfolio (see api.access)"""
+        from .access import can_edit_portfolio
+        return can_edit_portfolio(self, user)
+
     @staticmethod
     def generate_random_color():
         """Generate a random pleasant color for class identification"""
@@ -123,6 +166,41 @@ class ClassPortfolio(models.Model):
         ]
         return random.choice(colors)
 
+class PortfolioTag(models.Model):
+    """One row per portfolio tag, mirrored from ClassPortfolio.tags so tags can be grouped in SQL"""
+    portfolio = models.ForeignKey(ClassPortfolio, on_delete=models.CASCADE, related_name='tag_rows')
+    name = models.CharField(max_length=50, db_index=True)
+    
+    class Meta:
+        unique_together = ['portfolio', 'name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.portfolio_id})"
+
+class TagCount(models.Model):
+    """Running portfolio count and decayed trending score per tag or professor name"""
+    KIND_CHOICES = [
+        ('tag', 'Tag'),
+        ('professor', 'Professor'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    name = models.CharField(max_length=100)
+    portfolio_count = models.IntegerField(default=0)
+    # Log of the exponentially decayed number of recent additions (see api.tags)
+    trending_score = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['kind', 'name']
+        indexes = [
+            models.Index(fields=['kind', '-trending_score'], name='tagcount_trending_idx'),
+            models.Index(fields=['kind', '-portfolio_count'], name='tagcount_popular_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind}:{self.name} ({self.portfolio_count})"
+
 class MarketplaceListing(models.Model):
     """Marketplace listing for paid portfolios"""
     STATUS_CHOICES = [
@@ -290,10 +368,17 @@ class ImportantDate(models.Model):
     description = models.TextField(blank=True)
     points = models.IntegerField(null=True, blank=True)
     is_synced = models.BooleanField(default=False)  # Google/Outlook sync
+    # Set on dates imported from a syllabus extraction so a re-import updates them
+    source_key = models.CharField(max_length=40, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['portfolio', 'updated_at'], name='importantdate_changed_idx'),
+        ]
+        unique_together = ['portfolio', 'source_key']
     
     def __str__(self):
         return f"{self.title} - {self.due_date.strftime('%Y-%m-%d')}"
@@ -344,9 +429,14 @@ class Quiz(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_published = models.BooleanField(default=False)
     time_limit_minutes = models.IntegerField(null=True, blank=True, help_text="Time limit in minutes (optional)")
+    # Bumped whenever a question changes; part of the cached answer key's name (see api.quiz_scoring)
+    answer_key_version = models.PositiveIntegerField(default=0, editable=False)
     
     def __str__(self):
         return f"{self.title} - {self.quiz_type}"
+    
+    def save(self, *args, **kwargs):
+        save_without_counters(self, ('answer_key_version',), args, kwargs)
 
 class QuizQuestion(models.Model):
     QUESTION_TYPE_CHOICES = [
@@ -411,23 +501,13 @@ class QuizSubmission(models.Model):
         return f"{self.user.username} - {self.quiz.title} ({self.score}%)"
     
     def calculate_score(self):
-        """Calculate score based on answers"""
-        correct_answers = 0
-        total_points = 0
-        
-        for question_id, user_answer in self.answers.items():
-            try:
-                question = QuizQuestion.objects.get(id=question_id)
-                total_points += question.points
-                
-                if question.validate_answer(user_answer):
-                    correct_answers += question.points
-            except QuizQuestion.DoesNotExist:
-                continue
+        """Calculate score based on answers (one cached answer key instead of a query per answer)"""
+        from .quiz_scoring import get_answer_key, grade
         
-        if total_points > 0:
-            self.score = (correct_answers / total_points) * 100
-            self.total_points = total_points
+        result = grade(get_answer_key(self.quiz), self.answers)
+        if result['total_points'] > 0:
+            self.score = result['score']
+            self.total_points = result['total_points']
             self.save()
             return self.score
         return 0
@@ -541,6 +621,124 @@ class Comment(models.Model):
     def __str__(self):
         return f"Comment by {self.author.username} on {self.post.title}"
 
+class Job(models.Model):
+    """Database-backed background job, claimed and run by the run_jobs worker (see api.jobs)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=100, help_text="Registered task name")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    priority = models.SmallIntegerField(default=0, help_text="Higher priorities run first")
+    
+    # Retry bookkeeping
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    
+    # Worker lease
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after'], name='job_claim_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+class ContentCache(models.Model):
+    """Content-addressed cache of expensive derived results (see api.content_cache)"""
+    KIND_CHOICES = [
+        ('extraction', 'Text Extraction'),
+        ('summary', 'AI Summary'),
+        ('completion', 'AI Completion'),
+    ]
+    
+    key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the namespaced cache key")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    value = models.JSONField()
+    size = models.PositiveIntegerField(default=0, help_text="Approximate size of value in bytes")
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'last_accessed_at'], name='contentcache_lru_idx'),
+            models.Index(fields=['expires_at'], name='contentcache_expiry_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind}:{self.key[:12]} ({self.hits} hits)"
+
+class CacheGeneration(models.Model):
+    """Shared generation number of a cache namespace; bumping it retires every entry (see api.generations)"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+class LLMRateBucket(models.Model):
+    """Token bucket shared by every worker for OpenAI requests or tokens per minute (see api.llm_gateway)"""
+    name = models.CharField(max_length=20, unique=True)
+    tokens = models.FloatField(help_text="Budget left as of updated_at")
+    updated_at = models.DateTimeField(default=timezone.now)
+    version = models.PositiveIntegerField(default=0, help_text="Bumped by every write; takes are conditional on it")
+    
+    def __str__(self):
+        return f"{self.name}: {self.tokens:.0f}"
+
+class LLMUsage(models.Model):
+    """One user's OpenAI calls and spend for a day and model (see api.llm_gateway)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='llm_usage')
+    day = models.DateField()
+    model = models.CharField(max_length=50)
+    requests = models.PositiveIntegerField(default=0)
+    cached_requests = models.PositiveIntegerField(default=0, help_text="Answered from the response cache, free")
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    cost = models.DecimalField(max_digits=10, decimal_places=6, default=0, help_text="Estimated USD")
+    
+    class Meta:
+        unique_together = ['user', 'day', 'model']
+        ordering = ['-day']
+    
+    def __str__(self):
+        return f"{self.user.username} {self.day} {self.model}: ${self.cost}"
+
+class PortfolioSnapshot(models.Model):
+    """Precomputed preview/full content of a portfolio, rebuilt in the background (see api.snapshots)"""
+    ACCESS_LEVEL_CHOICES = [
+        ('preview', 'Preview'),
+        ('full', 'Full Access'),
+    ]
+    
+    portfolio = models.ForeignKey(ClassPortfolio, on_delete=models.CASCADE, related_name='snapshots')
+    access_level = models.CharField(max_length=10, choices=ACCESS_LEVEL_CHOICES)
+    content = models.JSONField(default=dict)
+    version = models.PositiveIntegerField(default=0, help_text="ClassPortfolio.snapshot_version this was built from")
+    built_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['portfolio', 'access_level']
+    
+    def __str__(self):
+        return f"{self.portfolio} {self.access_level} snapshot v{self.version}"
+
 class ProcessedFile(models.Model):
     """Store processed files and their AI-generated summaries"""
     FILE_TYPE_CHOICES = [
@@ -588,6 +786,7 @@ class ProcessedFile(models.Model):
     # Relationships
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='processed_files')
     portfolio = models.ForeignKey(ClassPortfolio, on_delete=models.CASCADE, related_name='processed_files', null=True, blank=True)
+    processing_job = models.ForeignKey(Job, on_delete=models.SET_NULL, related_name='processed_files', null=True, blank=True)
     
     # Timestamps
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -752,6 +951,56 @@ def validate_safe_url(value):
     return value
 
 
+# URL fragment -> link type, first match wins
+LINK_TYPES = [
+    (('youtube.com', 'youtu.be'), 'YouTube'),
+    (('vimeo.com',), 'Vimeo'),
+    (('coursera.org',), 'Coursera'),
+    (('udemy.com',), 'Udemy'),
+    (('khanacademy.org',), 'Khan Academy'),
+    (('edx.org',), 'edX'),
+    (('medium.com',), 'Medium'),
+    (('github.com',), 'GitHub'),
+    (('stackoverflow.com',), 'Stack Overflow'),
+    (('wikipedia.org',), 'Wikipedia'),
+    (('mit.edu', 'stanford.edu', '.edu'), 'Educational'),
+]
+DEFAULT_LINK_TYPE = 'Web Resource'
+
+# The id ends at the next path segment and is capped at YouTubeVideo.video_id's max_length
+YOUTUBE_ID_PATTERNS = [
+    re.compile(r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#/]{1,64})'),
+    re.compile(r'youtube\.com\/v\/([^&\n?#/]{1,64})'),
+]
+
+
+def detect_link_type(url):
+    """Detect the type of learning resource from URL"""
+    url_lower = url.lower()
+    for fragments, link_type in LINK_TYPES:
+        if any(fragment in url_lower for fragment in fragments):
+            return link_type
+    return DEFAULT_LINK_TYPE
+
+
+def extract_video_id(url):
+    """Extract YouTube video ID from URL, or None for other links"""
+    if 'youtube.com' not in url.lower() and 'youtu.be' not in url.lower():
+        return None
+    for pattern in YOUTUBE_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def normalize_domain(value):
+    """Host of a URL (or a bare host) in lower case, without www."""
+    value = (value or '').strip().lower()
+    host = urlsplit(value if '//' in value else f'//{value}').hostname or ''
+    return (host[4:] if host.startswith('www.') else host)[:255]
+
+
 class YouTubeVideo(models.Model):
     """Model to store learning resource URLs associated with users.
     Note: Despite the name, this model now accepts any safe educational URL, not just YouTube.
@@ -765,6 +1014,10 @@ class YouTubeVideo(models.Model):
     )
     title = models.CharField(max_length=255, blank=True, help_text="Resource title (optional)")
     description = models.TextField(blank=True, help_text="Resource description (optional)")
+    # Derived from url on save so listings can filter and render without re-parsing it
+    link_type = models.CharField(max_length=30, blank=True, editable=False, help_text="Detected resource type")
+    domain = models.CharField(max_length=255, blank=True, editable=False, help_text="Host without www.")
+    video_id = models.CharField(max_length=64, null=True, blank=True, editable=False, help_text="YouTube video ID")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -772,56 +1025,26 @@ class YouTubeVideo(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Learning Link'
         verbose_name_plural = 'Learning Links'
+        indexes = [
+            models.Index(fields=['link_type', '-created_at'], name='learninglink_type_idx'),
+            models.Index(fields=['domain', '-created_at'], name='learninglink_domain_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title or self.link_type} - {self.user.username}"
     
-    @property
-    def link_type(self):
-        """Detect the type of learning resource from URL"""
-        url_lower = self.url.lower()
-        
-        if 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-            return 'YouTube'
-        elif 'vimeo.com' in url_lower:
-            return 'Vimeo'
-        elif 'coursera.org' in url_lower:
-            return 'Coursera'
-        elif 'udemy.com' in url_lower:
-            return 'Udemy'
-        elif 'khanacademy.org' in url_lower:
-            return 'Khan Academy'
-        elif 'edx.org' in url_lower:
-            return 'edX'
-        elif 'medium.com' in url_lower:
-            return 'Medium'
-        elif 'github.com' in url_lower:
-            return 'GitHub'
-        elif 'stackoverflow.com' in url_lower:
-            return 'Stack Overflow'
-        elif 'wikipedia.org' in url_lower:
-            return 'Wikipedia'
-        elif 'mit.edu' in url_lower or 'stanford.edu' in url_lower or '.edu' in url_lower:
-            return 'Educational'
-        else:
-            return 'Web Resource'
+    def save(self, *args, **kwargs):
+        self.refresh_link_details()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'url' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'link_type', 'domain', 'video_id'}
+        super().save(*args, **kwargs)
     
-    @property
-    def video_id(self):
-        """Extract YouTube video ID from URL (for backward compatibility)"""
-        if 'youtube.com' not in self.url.lower() and 'youtu.be' not in self.url.lower():
-            return None
-            
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)',
-            r'youtube\.com\/v\/([^&\n?#]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, self.url)
-            if match:
-                return match.group(1)
-        return None
+    def refresh_link_details(self):
+        """Recompute link_type, domain and video_id from url"""
+        self.link_type = detect_link_type(self.url)
+        self.domain = normalize_domain(self.url)
+        self.video_id = extract_video_id(self.url)
     
     @property
     def thumbnail_url(self):
@@ -952,6 +1175,7 @@ class CalendarEvent(models.Model):
         indexes = [
             models.Index(fields=['user', 'due_date']),
             models.Index(fields=['event_type', 'due_date']),
+            models.Index(fields=['user', 'updated_at'], name='calendarevent_changed_idx'),
         ]
     
     def __str__(self):
@@ -990,4 +1214,39 @@ class CalendarEvent(models.Model):
     
     def remove_learning_resource(self, resource):
         """Remove a learning resource from this event"""
-        self.linked_resources.remove(resource)
\ No newline at end of file
+        self.linked_resources.remove(resource)
+
+class SearchDocument(models.Model):
+    """Denormalized full-text search entry; the engine-specific index lives in api.search"""
+    KIND_CHOICES = [
+        ('portfolio', 'Portfolio'),
+        ('syllabus', 'Syllabus'),
+        ('syllabus_extraction', 'Syllabus Extraction'),
+        ('processed_file', 'Processed File'),
+    ]
+    
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    portfolio = models.ForeignKey(
+        ClassPortfolio,
+        on_delete=models.CASCADE,
+        related_name='search_documents',
+        null=True,
+        blank=True
+    )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='search_documents',
+        null=True,
+        blank=True
+    )
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['kind', 'object_id']
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}: {self.title}"
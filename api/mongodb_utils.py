@@ -1,101 +1,204 @@
 """
 MongoDB utilities for additional data storage
+
+One MongoClient is shared by the whole process. MongoClient is thread-safe and
+keeps its own connection pool, so creating it once (lazily, on first use)
+means each operation costs a round trip instead of a new TCP/TLS handshake and
+server selection. Clients must not be shared across fork(), so a child process
+(gunicorn worker, job worker) builds its own on first use.
 """
+import logging
 import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
 from pymongo import MongoClient
 from pymongo.server_api import ServerApi
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+# After a failed client creation, don't retry on every call
+RETRY_AFTER_SECONDS = 30
+INSERT_BATCH_SIZE = 1000
+CURSOR_BATCH_SIZE = 500
+
+_client: Optional[MongoClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+_last_failure = 0.0
+
+
+def _create_client(uri: str, timeout: int) -> MongoClient:
+    pool_options = {
+        'maxPoolSize': getattr(settings, 'MONGODB_MAX_POOL_SIZE', 50),
+        'serverSelectionTimeoutMS': timeout,
+        'connectTimeoutMS': timeout,
+    }
+
+    # Use local MongoDB for development, Atlas for production
+    if 'localhost' in uri or '127.0.0.1' in uri:
+        # Local MongoDB - no SSL needed
+        return MongoClient(uri, **pool_options)
+    if 'atlas-sql' in uri:
+        # Atlas SQL endpoint - no Server API needed
+        return MongoClient(uri, tlsAllowInvalidCertificates=True, **pool_options)
+    # MongoDB Atlas - with SSL handling
+    return MongoClient(
+        uri,
+        server_api=ServerApi('1'),
+        tlsAllowInvalidCertificates=True,
+        retryWrites=True,
+        w='majority',
+        **pool_options
+    )
+
+
+def _reset_after_fork() -> None:
+    # The parent's sockets and monitor threads are unusable here; drop them without closing
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def get_mongodb_client():
-    """Get MongoDB client connection"""
-    try:
-        uri = getattr(settings, 'MONGODB_URI', None)
-        enabled = getattr(settings, 'MONGODB_ENABLED', False)
+    """Shared MongoDB client for this process, or None when MongoDB is disabled or unreachable"""
+    global _client, _client_pid, _last_failure
+
+    uri = getattr(settings, 'MONGODB_URI', None)
+    enabled = getattr(settings, 'MONGODB_ENABLED', False)
+    if not uri or not enabled:
+        return None
+
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            return _client
+        if _client_pid != os.getpid():
+            # Inherited from a parent without register_at_fork support
+            _client = None
+        if time.monotonic() - _last_failure < RETRY_AFTER_SECONDS:
+            return None
+
         timeout = getattr(settings, 'MONGODB_TIMEOUT', 10) * 1000  # Convert to milliseconds
-        
-        if not uri or not enabled:
+        try:
+            # Connects in the background; the first operation waits for server selection
+            _client = _create_client(uri, timeout)
+            _client_pid = os.getpid()
+        except Exception as e:
+            _last_failure = time.monotonic()
+            logger.error(f"MongoDB connection error: {e}")
             return None
-        
-        # Use local MongoDB for development, Atlas for production
-        if 'localhost' in uri or '127.0.0.1' in uri:
-            # Local MongoDB - no SSL needed
-            client = MongoClient(
-                uri, 
-                serverSelectionTimeoutMS=timeout,
-                connectTimeoutMS=timeout
-            )
-        elif 'atlas-sql' in uri:
-            # Atlas SQL endpoint - no Server API needed
-            client = MongoClient(
-                uri,
-                tlsAllowInvalidCertificates=True,
-                serverSelectionTimeoutMS=timeout,
-                connectTimeoutMS=timeout
-            )
-        else:
-            # MongoDB Atlas - with SSL handling
-            client = MongoClient(
-                uri, 
-                server_api=ServerApi('1'),
-                tlsAllowInvalidCertificates=True,
-                serverSelectionTimeoutMS=timeout,
-                connectTimeoutMS=timeout,
-                retryWrites=True,
-                w='majority'
-            )
-        
-        # Test connection
-        client.admin.command('ping')
-        return client
-    except Exception as e:
-        print(f"MongoDB connection error: {e}")
-        return None
+    return _client
+
+
+def close_mongodb_client() -> None:
+    """Close the shared client (e.g. at shutdown or in tests)"""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
 
 def get_mongodb_database():
     """Get MongoDB database"""
     client = get_mongodb_client()
     if client is None:
         return None
-    
+
     db_name = getattr(settings, 'MONGODB_DATABASE', 'hackwesttx_db')
     return client[db_name]
 
+
 def store_additional_data(collection_name, data):
     """Store additional data in MongoDB"""
     if not getattr(settings, 'MONGODB_ENABLED', False):
         return None
-    
+
     try:
         db = get_mongodb_database()
         if db is None:
             return None
-        
+
         collection = db[collection_name]
         result = collection.insert_one(data)
         return result.inserted_id
     except Exception as e:
-        print(f"Error storing data in MongoDB: {e}")
+        logger.error(f"Error storing data in MongoDB: {e}")
         return None
 
-def get_additional_data(collection_name, query=None):
-    """Retrieve additional data from MongoDB"""
+
+def store_many_additional_data(collection_name: str, documents: Iterable[Dict[str, Any]],
+                               batch_size: int = INSERT_BATCH_SIZE, ordered: bool = False) -> List[Any]:
+    """
+    Insert documents with insert_many, batch_size at a time
+
+    Unordered inserts let the server keep going past a bad document. Returns
+    the ids that were inserted (empty when MongoDB is unavailable).
+    """
     if not getattr(settings, 'MONGODB_ENABLED', False):
         return []
-    
+
+    inserted_ids: List[Any] = []
     try:
         db = get_mongodb_database()
         if db is None:
             return []
-        
+
         collection = db[collection_name]
-        if query:
-            return list(collection.find(query))
-        else:
-            return list(collection.find())
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                inserted_ids.extend(collection.insert_many(batch, ordered=ordered).inserted_ids)
+                batch = []
+        if batch:
+            inserted_ids.extend(collection.insert_many(batch, ordered=ordered).inserted_ids)
     except Exception as e:
-        print(f"Error retrieving data from MongoDB: {e}")
+        logger.error(f"Error storing data in MongoDB: {e}")
+    return inserted_ids
+
+
+def iter_additional_data(collection_name: str, query: Optional[Dict[str, Any]] = None,
+                         projection: Optional[Dict[str, Any]] = None, sort=None, limit: int = 0,
+                         batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Stream matching documents from a cursor, batch_size per round trip"""
+    if not getattr(settings, 'MONGODB_ENABLED', False):
+        return
+
+    db = get_mongodb_database()
+    if db is None:
+        return
+
+    cursor = db[collection_name].find(query or {}, projection, limit=limit, batch_size=batch_size)
+    if sort:
+        cursor = cursor.sort(sort)
+    try:
+        for document in cursor:
+            yield document
+    finally:
+        cursor.close()
+
+
+def get_additional_data(collection_name, query=None, projection=None, limit=0):
+    """Retrieve additional data from MongoDB (use iter_additional_data for large collections)"""
+    try:
+        return list(iter_additional_data(collection_name, query, projection=projection, limit=limit))
+    except Exception as e:
+        logger.error(f"Error retrieving data from MongoDB: {e}")
         return []
 
+
 def test_mongodb_connection():
     """Test MongoDB connection and return status"""
     try:
@@ -131,4 +234,4 @@ def test_mongodb_connection():
             'status': 'failed',
             'error': str(e),
             'enabled': getattr(settings, 'MONGODB_ENABLED', False)
-        }
\ No newline at end of file
+        }
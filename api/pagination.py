@@ -0,0 +1,192 @@
+"""
+Keyset pagination for HackWestTX Class Portfolio
+List endpoints page by seeking past the last row of the previous page on
+their ordering, e.g. (-created_at, -id), instead of using OFFSET, so a deep
+page costs the same as the first. Cursors are opaque and only valid for the
+ordering they were issued under. Totals are skipped unless a client asks for
+them with ?total=exact or ?total=estimate.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Q
+
+PAGE_SIZE = getattr(settings, 'KEYSET_PAGE_SIZE', 20)
+MAX_PAGE_SIZE = 100
+# ?total=estimate counts exactly up to this many rows and reports "at least" beyond it
+ESTIMATE_CAP = getattr(settings, 'KEYSET_ESTIMATE_CAP', 1000)
+TOTAL_MODES = ('exact', 'estimate')
+
+
+def clamp_limit(limit: Any, default: int = PAGE_SIZE) -> int:
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_ordering(queryset) -> Tuple[str, ...]:
+    """
+    The queryset's ordering as field or annotation names, ending in the primary key
+
+    The primary key is appended as a tie-breaker when missing. Ordering
+    values must be non-null; coalesce nullable annotations before ordering.
+
+    Raises:
+        TypeError: if the queryset is ordered by an expression or a related field
+    """
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+    for term in ordering:
+        if not isinstance(term, str) or term == '?' or '__' in term:
+            raise TypeError(f"Keyset pagination needs field or annotation orderings, got {term!r}")
+    pk_names = {'pk', queryset.model._meta.pk.attname}
+    if not ordering or ordering[-1].lstrip('-') not in pk_names:
+        ordering.append('-pk' if ordering and ordering[-1].startswith('-') else 'pk')
+    return tuple(ordering)
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return ['datetime', value.isoformat()]
+    if isinstance(value, date):
+        return ['date', value.isoformat()]
+    if isinstance(value, Decimal):
+        return ['decimal', str(value)]
+    return value
+
+
+def _load(value):
+    if not isinstance(value, list):
+        return value
+    kind, raw = value
+    if kind == 'datetime':
+        return datetime.fromisoformat(raw)
+    if kind == 'date':
+        return date.fromisoformat(raw)
+    if kind == 'decimal':
+        return Decimal(raw)
+    raise ValueError(kind)
+
+
+def encode_cursor(ordering: Sequence[str], obj) -> str:
+    """Opaque cursor pointing just past obj in ordering"""
+    values = [_dump(getattr(obj, term.lstrip('-'))) for term in ordering]
+    raw = json.dumps({'o': list(ordering), 'v': values}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, ordering: Sequence[str]) -> List[Any]:
+    """
+    Ordering values stored in a cursor
+
+    Raises:
+        ValueError: if the cursor is malformed or was issued for another ordering
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        if payload['o'] != list(ordering):
+            raise ValueError('ordering changed')
+        values = [_load(value) for value in payload['v']]
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if len(values) != len(ordering) or any(value is None for value in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def seek(queryset, ordering: Sequence[str], values: Sequence[Any]):
+    """Rows strictly after values in ordering, as a row-value comparison spelled out with Q"""
+    after, equal = Q(), Q()
+    for term, value in zip(ordering, values):
+        field = term.lstrip('-')
+        op = 'lt' if term.startswith('-') else 'gt'
+        after |= equal & Q(**{f'{field}__{op}': value})
+        equal &= Q(**{field: value})
+    return queryset.filter(after)
+
+
+def split_rows(rows: List[Any], limit: int, ordering: Sequence[str]) -> Tuple[List[Any], Optional[str]]:
+    """Trim a fetched limit+1 rows to a page and the cursor of the following page"""
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(ordering, rows[limit - 1])
+    return rows, None
+
+
+def estimate_count(queryset) -> Tuple[int, bool]:
+    """
+    (count, is_estimate) without scanning more than ESTIMATE_CAP rows
+
+    PostgreSQL's planner estimate is used for large results; elsewhere the
+    count stops at ESTIMATE_CAP and is reported as an estimate past it.
+    """
+    queryset = queryset.order_by()
+    if connections[queryset.db].vendor == 'postgresql':
+        try:
+            plan = json.loads(queryset.explain(format='json'))
+            planned = int(plan[0]['Plan']['Plan Rows'])
+        except (DatabaseError, ValueError, KeyError, IndexError, TypeError):
+            planned = None
+        if planned is not None and planned > ESTIMATE_CAP:
+            return planned, True
+    counted = queryset[:ESTIMATE_CAP + 1].count()
+    if counted > ESTIMATE_CAP:
+        return ESTIMATE_CAP, True
+    return counted, False
+
+
+def keyset_page(queryset, cursor: Optional[str] = None, limit: int = PAGE_SIZE,
+                total: Optional[str] = None) -> Dict[str, Any]:
+    """
+    One page of queryset in its own ordering
+
+    Returns:
+        dict with 'rows', 'next_cursor' and, when total is 'exact' or
+        'estimate', 'count' and 'count_is_estimate'
+
+    Raises:
+        ValueError: with a client-facing message for a bad cursor or total mode
+    """
+    if total and total not in TOTAL_MODES:
+        raise ValueError(f"total must be one of: {', '.join(TOTAL_MODES)}")
+    ordering = keyset_ordering(queryset)
+    ordered = queryset.order_by(*ordering)
+    if cursor:
+        ordered = seek(ordered, ordering, decode_cursor(cursor, ordering))
+
+    # One extra row tells us whether there is another page without a COUNT
+    rows, next_cursor = split_rows(list(ordered[:limit + 1]), limit, ordering)
+    page = {'rows': rows, 'next_cursor': next_cursor}
+    if total == 'exact':
+        page['count'], page['count_is_estimate'] = queryset.count(), False
+    elif total == 'estimate':
+        page['count'], page['count_is_estimate'] = estimate_count(queryset)
+    return page
+
+
+def request_page(request, queryset, default_limit: int = PAGE_SIZE) -> Dict[str, Any]:
+    """keyset_page() driven by the request's ?cursor=, ?limit= and ?total= parameters"""
+    params = request.query_params
+    return keyset_page(
+        queryset,
+        cursor=params.get('cursor'),
+        limit=clamp_limit(params.get('limit'), default_limit),
+        total=params.get('total') or None
+    )
+
+
+def page_payload(page: Dict[str, Any], results: Any) -> Dict[str, Any]:
+    """Response body for a page: results, next_cursor and any requested count"""
+    payload = {}
+    if 'count' in page:
+        payload['count'] = page['count']
+        payload['count_is_estimate'] = page['count_is_estimate']
+    payload['results'] = results
+    payload['next_cursor'] = page['next_cursor']
+    return payload
@@ -0,0 +1,124 @@
+"""
+Streaming PDF text extraction for HackWestTX Class Portfolio
+Yields page texts one at a time and can fan page ranges out to a process pool.
+This module deliberately avoids Django imports so pool workers start cheaply
+under any multiprocessing start method.
+"""
+
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+# Pages handed to a pool worker per task; small enough to keep results flowing in order
+PAGES_PER_TASK = 16
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+
+
+def _open_reader(source: Tuple[str, object]) -> PyPDF2.PdfReader:
+    kind, value = source
+    if kind == 'path':
+        return PyPDF2.PdfReader(value)
+    return PyPDF2.PdfReader(io.BytesIO(value))
+
+
+def extract_page_range(source: Tuple[str, object], start: int, stop: int) -> List[Tuple[int, str]]:
+    """Extract pages [start, stop) from a ('path', str) or ('bytes', bytes) source"""
+    reader = _open_reader(source)
+    pages = []
+    for page_num in range(start, min(stop, len(reader.pages))):
+        try:
+            pages.append((page_num, reader.pages[page_num].extract_text() or ''))
+        except Exception as e:
+            logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
+            pages.append((page_num, ''))
+    return pages
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_size
+    if _pool is None or _pool_size != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_size = workers
+    return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def iter_page_texts(reader: PyPDF2.PdfReader, source: Optional[Tuple[str, object]] = None,
+                    max_pages: Optional[int] = None, workers: int = 1,
+                    parallel_min_pages: int = 40) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) in page order
+
+    Args:
+        reader: Open reader, used for sequential extraction
+        source: ('path', str) or ('bytes', bytes) so pool workers can reopen the PDF
+        max_pages: Stop after this many pages
+        workers: Process pool size; 1 keeps everything in-process
+        parallel_min_pages: Documents shorter than this aren't worth the pool overhead
+    """
+    page_count = len(reader.pages)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+
+    next_page = 0
+    use_pool = source is not None and workers > 1 and page_count >= parallel_min_pages
+    if use_pool:
+        ranges = [(start, min(start + PAGES_PER_TASK, page_count)) for start in range(0, page_count, PAGES_PER_TASK)]
+        try:
+            pool = _get_pool(workers)
+            # map() preserves order and yields each range as soon as it (and its predecessors) finish
+            results = pool.map(
+                extract_page_range,
+                [source] * len(ranges),
+                [start for start, _ in ranges],
+                [stop for _, stop in ranges]
+            )
+            for page_range in results:
+                for page_num, text in page_range:
+                    yield page_num, text
+                    next_page = page_num + 1
+            return
+        except BrokenProcessPool:
+            logger.warning("PDF process pool broke; finishing extraction sequentially")
+            _reset_pool()
+
+    for page_num in range(next_page, page_count):
+        try:
+            yield page_num, reader.pages[page_num].extract_text() or ''
+        except Exception as e:
+            logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
+            continue
+
+
+def pdf_source(uploaded_file) -> Tuple[str, object]:
+    """How a pool worker can reopen this file: a filesystem path when there is one, else its bytes"""
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        return 'path', uploaded_file.temporary_file_path()
+    try:
+        path = uploaded_file.path
+        if path and os.path.exists(path):
+            return 'path', path
+    except (AttributeError, NotImplementedError, ValueError):
+        pass
+
+    uploaded_file.seek(0)
+    data = uploaded_file.read()
+    uploaded_file.seek(0)
+    return 'bytes', data
@@ -0,0 +1,93 @@
+"""
+Portfolio detail collections for HackWestTX Class Portfolio
+The portfolio detail endpoint embeds only the first page of each nested
+collection (dates, materials, quizzes, ...), fetched with sliced prefetches,
+plus a count and an opaque keyset cursor for the next page. Further pages come
+from collection_page(), which seeks past the cursor with api.pagination
+instead of using OFFSET, so deep pages cost the same as the first.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from . import pagination
+from .prefetching import planned_queryset
+
+PAGE_SIZE = getattr(settings, 'PORTFOLIO_DETAIL_PAGE_SIZE', 20)
+
+# Collection -> ordering field; a leading '-' means newest first. The primary key breaks ties.
+COLLECTIONS = {
+    'important_dates': 'due_date',
+    'materials': 'uploaded_at',
+    'quizzes': 'created_at',
+    'reviews': '-created_at',
+    'study_groups': 'created_at',
+    'recommendations': '-created_at',
+}
+
+
+def _ordering(name: str) -> Tuple[str, ...]:
+    ordering = COLLECTIONS[name]
+    return (ordering, '-pk' if ordering.startswith('-') else 'pk')
+
+
+def order_collection(name: str, queryset):
+    return queryset.order_by(*_ordering(name))
+
+
+def clamp_limit(limit: Any) -> int:
+    return pagination.clamp_limit(limit, PAGE_SIZE)
+
+
+def split_page(name: str, rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim a fetched limit+1 rows to a page and the cursor of the following page"""
+    return pagination.split_rows(rows, limit, _ordering(name))
+
+
+def _count_subquery(relation):
+    remote_field = relation.field.name
+    counts = relation.related_model._default_manager.filter(
+        **{remote_field: OuterRef('pk')}
+    ).order_by().values(remote_field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def detail_queryset(queryset, serializer_class, limit: int = PAGE_SIZE):
+    """
+    Portfolios ready for serializer_class with every nested relation loaded
+
+    Each collection is prefetched as its first limit+1 rows (the extra row
+    says whether there is a next page) and counted with an annotation, so
+    the query count doesn't grow with the portfolio.
+    """
+    shapers = {
+        name: (lambda qs, name=name: order_collection(name, qs)[:limit + 1])
+        for name in COLLECTIONS
+    }
+    model = queryset.model
+    counts = {
+        f'{name}_count': _count_subquery(model._meta.get_field(name))
+        for name in COLLECTIONS
+    }
+    return planned_queryset(queryset, serializer_class, shapers=shapers).annotate(**counts)
+
+
+def collection_page(portfolio, name: str, serializer_class, cursor: Optional[str] = None,
+                    limit: int = PAGE_SIZE) -> Dict[str, Any]:
+    """
+    One page of a portfolio collection
+
+    Raises:
+        ValueError: if the cursor can't be decoded
+    """
+    relation = portfolio._meta.get_field(name)
+    queryset = relation.related_model._default_manager.filter(**{relation.field.name: portfolio})
+    queryset = order_collection(name, planned_queryset(queryset, serializer_class))
+    page = pagination.keyset_page(queryset, cursor=cursor, limit=limit)
+    return {
+        'results': serializer_class(page['rows'], many=True).data,
+        'next_cursor': page['next_cursor'],
+    }
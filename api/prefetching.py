@@ -0,0 +1,123 @@
+"""
+Serializer-driven query planning for HackWestTX Class Portfolio
+Walks a serializer's nested fields and turns them into select_related and
+Prefetch lookups, so a queryset fetches everything the serializer will touch
+in a fixed number of queries instead of one per related object.
+
+Nested single objects along forward foreign keys and one-to-one relations are
+joined in; nested lists get a Prefetch whose queryset is planned the same way.
+Relations read by SerializerMethodFields can't be discovered, so a serializer
+may list them on its Meta as `select_related` / `prefetch_related`.
+
+A relation whose queryset is sliced (e.g. "first 20 dates") can't be cached
+as the relation itself, so it is prefetched into a `<relation>_page` list
+instead; see page_attr().
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+# Relation path -> function applied to that relation's planned queryset (ordering, slicing)
+Shapers = Dict[str, Callable]
+
+
+def page_attr(relation_name: str) -> str:
+    """Attribute holding the rows of a sliced prefetch"""
+    return f'{relation_name}_page'
+
+
+def _nested_fields(serializer):
+    for field in serializer.fields.values():
+        if getattr(field, 'write_only', False):
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            yield field, field.child, True
+        elif isinstance(field, serializers.BaseSerializer):
+            yield field, field, False
+
+
+def _relation(model, source: str):
+    if not source or '.' in source or source == '*':
+        return None
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    return field if field.is_relation else None
+
+
+@lru_cache(maxsize=None)
+def _class_plan(serializer_class) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, str, Any], ...]]:
+    # Building the serializer's fields is the expensive part, and it only depends on the class
+    serializer = serializer_class()
+    model = serializer.Meta.model
+    meta = serializer.Meta
+
+    select = list(getattr(meta, 'select_related', ()))
+    prefetch = [(path, path.rsplit('__', 1)[-1], None) for path in getattr(meta, 'prefetch_related', ())]
+
+    for field, child, many in _nested_fields(serializer):
+        relation = _relation(model, field.source)
+        if relation is None:
+            continue
+
+        if many or relation.many_to_many or relation.one_to_many:
+            queryset = planned_queryset(relation.related_model._default_manager.all(), child.__class__)
+            prefetch.append((field.source, field.source, queryset))
+        else:
+            # Single related object: join it and keep planning through the join
+            select.append(field.source)
+            child_select, child_prefetch = _class_plan(child.__class__)
+            select.extend(f'{field.source}__{path}' for path in child_select)
+            prefetch.extend(
+                (f'{field.source}__{path}', source, queryset)
+                for path, source, queryset in child_prefetch
+            )
+
+    return tuple(select), tuple(prefetch)
+
+
+def plan(serializer_class, prefix: str = '', shapers: Optional[Shapers] = None) -> Tuple[List[str], List[Prefetch]]:
+    """
+    Lookups needed to serialize instances of serializer_class's model
+
+    Args:
+        serializer_class: ModelSerializer class to plan for
+        prefix: relation path of these instances from the root queryset
+        shapers: optional queryset tweaks keyed by relation path from the root
+
+    Returns:
+        (select_related paths, Prefetch objects), all relative to the root
+    """
+    shapers = shapers or {}
+    class_select, class_prefetch = _class_plan(serializer_class)
+
+    select = [prefix + path for path in class_select]
+    prefetch = []
+    for path, source, queryset in class_prefetch:
+        path = prefix + path
+        if queryset is None:
+            prefetch.append(Prefetch(path))
+            continue
+        queryset = queryset.all()
+        if path in shapers:
+            queryset = shapers[path](queryset)
+        if queryset.query.is_sliced:
+            prefetch.append(Prefetch(path, queryset=queryset, to_attr=page_attr(source)))
+        else:
+            prefetch.append(Prefetch(path, queryset=queryset))
+    return select, prefetch
+
+
+def planned_queryset(queryset, serializer_class, shapers: Optional[Shapers] = None):
+    """Apply the plan for serializer_class to a queryset of its model"""
+    select, prefetch = plan(serializer_class, shapers=shapers)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
@@ -0,0 +1,147 @@
+"""
+Quiz scoring for HackWestTX Class Portfolio
+Grades submissions in memory against a quiz's answer key. The key is loaded
+with one query and cached per (quiz, answer_key_version); saving or deleting a
+QuizQuestion bumps the version (see signals), so an edited quiz is never
+graded against a stale key, whichever worker cached it. The bump also queues
+a background regrade of the quiz's existing submissions.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .jobs import enqueue
+from .models import Job, Quiz, QuizQuestion, QuizSubmission
+
+logger = logging.getLogger(__name__)
+
+ANSWER_KEY_TIMEOUT = getattr(settings, 'QUIZ_ANSWER_KEY_TIMEOUT', 3600)
+# Editing a quiz usually touches several questions in a row; one regrade covers them
+REGRADE_DELAY_SECONDS = getattr(settings, 'QUIZ_REGRADE_DELAY_SECONDS', 30)
+REGRADE_TASK = 'regrade_quiz'
+
+
+def _cache_key(quiz_id: int, version: int) -> str:
+    return f"quiz:answer_key:{quiz_id}:{version}"
+
+
+def build_answer_key(quiz_id: int) -> List[Dict[str, Any]]:
+    """Every question of a quiz with its correct answer, in question order"""
+    return [
+        {
+            'id': question.id,
+            'question_text': question.question_text,
+            'question_type': question.question_type,
+            'correct_answer': question.get_correct_answer(),
+            'is_true': question.is_true,
+            'points': question.points,
+            'explanation': question.explanation,
+        }
+        for question in QuizQuestion.objects.filter(quiz_id=quiz_id).order_by('id')
+    ]
+
+
+def get_answer_key(quiz) -> Dict[str, Dict[str, Any]]:
+    """Answer key keyed by question id as a string (the format of submission answers)"""
+    key = _cache_key(quiz.pk, quiz.answer_key_version)
+    entries = cache.get(key)
+    if entries is None:
+        entries = build_answer_key(quiz.pk)
+        cache.set(key, entries, ANSWER_KEY_TIMEOUT)
+    return {str(entry['id']): entry for entry in entries}
+
+
+def is_correct(entry: Dict[str, Any], user_answer: Any) -> bool:
+    """Same rules as QuizQuestion.validate_answer, without the question row"""
+    if entry['question_type'] == 'multiple_choice':
+        return user_answer == entry['correct_answer']
+    if entry['question_type'] == 'true_false':
+        if not isinstance(user_answer, str) or user_answer.lower() not in ('true', 'false'):
+            return False
+        return (user_answer.lower() == 'true') == bool(entry['is_true'])
+    return False
+
+
+def grade(answer_key: Dict[str, Dict[str, Any]], answers: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Score a submission's answers
+
+    Only answered questions count towards total_points, as before; answers
+    to unknown question ids are ignored.
+
+    Returns:
+        Dict with score (percentage, None when nothing gradable was answered),
+        earned_points and total_points
+    """
+    earned = total = 0
+    for question_id, user_answer in answers.items():
+        entry = answer_key.get(str(question_id))
+        if entry is None:
+            continue
+        total += entry['points']
+        if is_correct(entry, user_answer):
+            earned += entry['points']
+
+    score = round(earned / total * 100, 2) if total > 0 else None
+    return {'score': score, 'earned_points': earned, 'total_points': total}
+
+
+def question_results(answer_key: Dict[str, Dict[str, Any]], answers: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-question breakdown for quiz_results"""
+    results = []
+    for question_id, entry in answer_key.items():
+        user_answer = answers.get(question_id, '')
+        results.append({
+            'question_id': entry['id'],
+            'question_text': entry['question_text'],
+            'question_type': entry['question_type'],
+            'user_answer': user_answer,
+            'correct_answer': entry['correct_answer'],
+            'is_correct': is_correct(entry, user_answer),
+            'points': entry['points'],
+            'explanation': entry['explanation'],
+        })
+    return results
+
+
+def grade_submissions(quiz, submissions: Iterable[QuizSubmission]) -> int:
+    """Re-grade submissions of one quiz against its current key with a single bulk UPDATE"""
+    answer_key = get_answer_key(quiz)
+    graded = []
+    for submission in submissions:
+        result = grade(answer_key, submission.answers)
+        # Same values submit_quiz stores, including no score when nothing answered is gradable any more
+        submission.score = Decimal(str(result['score'])) if result['score'] is not None else None
+        submission.total_points = result['total_points']
+        graded.append(submission)
+
+    if graded:
+        QuizSubmission.objects.bulk_update(graded, ['score', 'total_points'], batch_size=500)
+    logger.info(f"Graded {len(graded)} submissions for quiz {quiz.pk}")
+    return len(graded)
+
+
+def regrade_quiz(quiz_id: int) -> int:
+    """Re-grade every submission of a quiz against its current answer key"""
+    quiz = Quiz.objects.get(pk=quiz_id)
+    submissions = QuizSubmission.objects.filter(quiz_id=quiz_id).only('id', 'answers', 'score', 'total_points')
+    return grade_submissions(quiz, submissions)
+
+
+def _enqueue_regrade(quiz_id: int) -> None:
+    if not QuizSubmission.objects.filter(quiz_id=quiz_id).exists():
+        return
+    pending = Job.objects.filter(name=REGRADE_TASK, status='queued', payload__quiz_id=quiz_id)
+    if pending.exists():
+        return
+    enqueue(REGRADE_TASK, {'quiz_id': quiz_id}, delay=REGRADE_DELAY_SECONDS)
+
+
+def schedule_regrade(quiz_id: int) -> None:
+    """Queue one regrade of the quiz's submissions once the current transaction commits"""
+    transaction.on_commit(lambda: _enqueue_regrade(quiz_id))
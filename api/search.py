@@ -0,0 +1,415 @@
+"""
+Full-text search for HackWestTX Class Portfolio
+Indexes portfolios, syllabi, syllabus extractions and processed files into
+SearchDocument rows and queries them through an engine-specific backend:
+Postgres tsvector/GIN, SQLite FTS5, or a LIKE fallback
+"""
+
+import html
+import logging
+import re
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .access import accessible_portfolios
+from .models import ClassPortfolio, ProcessedFile, SearchDocument, Syllabus, SyllabusExtraction
+
+logger = logging.getLogger(__name__)
+
+# Postgres caps a tsvector at 1MB, and nobody needs hits from page 400 of a textbook
+MAX_BODY_CHARS = getattr(settings, 'SEARCH_MAX_BODY_CHARS', 200000)
+DEFAULT_HIT_LIMIT = getattr(settings, 'SEARCH_HIT_LIMIT', 20)
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+# The engines delimit matches with these private-use characters; the snippet is
+# HTML-escaped before they are swapped for the tags, so indexed markup stays text
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+SNIPPET_WORDS = 24
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_TERMS = 12
+
+
+# ---------------------------------------------------------------------------
+# Document building
+# ---------------------------------------------------------------------------
+
+def _join(*parts) -> str:
+    return ' '.join(str(part) for part in parts if part)
+
+
+def _portfolio_document(portfolio: ClassPortfolio) -> Dict[str, Any]:
+    return {
+        'portfolio_id': portfolio.pk,
+        'owner_id': portfolio.created_by_id,
+        'title': ' - '.join(part for part in [portfolio.course, portfolio.professor] if part),
+        'body': _join(portfolio.course, portfolio.professor, portfolio.semester, portfolio.year, *(portfolio.tags or [])),
+    }
+
+
+def _syllabus_document(syllabus: Syllabus) -> Dict[str, Any]:
+    return {
+        'portfolio_id': syllabus.portfolio_id,
+        'owner_id': None,
+        'title': f"Syllabus: {syllabus.portfolio}",
+        'body': syllabus.extracted_text,
+    }
+
+
+def _extraction_document(extraction: SyllabusExtraction) -> Dict[str, Any]:
+    return {
+        'portfolio_id': extraction.syllabus.portfolio_id,
+        'owner_id': None,
+        'title': extraction.course_title or extraction.course_code,
+        'body': _join(
+            extraction.course_title,
+            extraction.course_code,
+            extraction.professor_name,
+            extraction.semester,
+            extraction.course_description,
+        ),
+    }
+
+
+def _processed_file_document(processed_file: ProcessedFile) -> Dict[str, Any]:
+    # Processed files are private to their uploader, so they match on owner_id only;
+    # tying them to the portfolio would show their text to everyone who can see it
+    return {
+        'portfolio_id': None,
+        'owner_id': processed_file.uploaded_by_id,
+        'title': processed_file.file_name,
+        'body': _join(processed_file.ai_summary, processed_file.extracted_text),
+    }
+
+
+DOCUMENT_BUILDERS = {
+    ClassPortfolio: ('portfolio', _portfolio_document),
+    Syllabus: ('syllabus', _syllabus_document),
+    SyllabusExtraction: ('syllabus_extraction', _extraction_document),
+    ProcessedFile: ('processed_file', _processed_file_document),
+}
+
+
+def index_instance(instance) -> None:
+    """Create or refresh the SearchDocument for a model instance"""
+    kind, builder = DOCUMENT_BUILDERS[type(instance)]
+    fields = builder(instance)
+    fields['title'] = (fields['title'] or '')[:255]
+    # Markers already in the text would open highlights the engine didn't make
+    fields['body'] = (fields['body'] or '')[:MAX_BODY_CHARS].replace(MATCH_START, '').replace(MATCH_END, '')
+
+    document = SearchDocument.objects.filter(kind=kind, object_id=instance.pk).first()
+    if document is None:
+        SearchDocument.objects.create(kind=kind, object_id=instance.pk, **fields)
+        return
+
+    changed = [name for name, value in fields.items() if getattr(document, name) != value]
+    if not changed:
+        # Unchanged rows are skipped so re-saves don't rewrite the text index
+        return
+    for name in changed:
+        setattr(document, name, fields[name])
+    document.save(update_fields=changed + ['updated_at'])
+
+
+def remove_instance(instance) -> None:
+    """Drop the SearchDocument for a deleted model instance"""
+    kind, _ = DOCUMENT_BUILDERS[type(instance)]
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    """Re-index every searchable object, returning the number of documents"""
+    total = 0
+    querysets = [
+        ClassPortfolio.objects.all(),
+        Syllabus.objects.select_related('portfolio'),
+        SyllabusExtraction.objects.select_related('syllabus'),
+        ProcessedFile.objects.all(),
+    ]
+    for queryset in querysets:
+        for instance in queryset.iterator(chunk_size=batch_size):
+            index_instance(instance)
+            total += 1
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+def _query_terms(query: str) -> List[str]:
+    return _TOKEN_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+
+
+def _visibility_sql(portfolio_ids, owner) -> Tuple[str, list]:
+    """SQL restricting documents to accessible portfolios or the owner's own files"""
+    if portfolio_ids is None and owner is None:
+        return '1 = 1', []
+
+    clauses, params = [], []
+    if portfolio_ids is not None:
+        subquery, subquery_params = portfolio_ids.query.get_compiler(connection=connection).as_sql()
+        clauses.append(f"d.portfolio_id IN ({subquery})")
+        params.extend(subquery_params)
+    if owner is not None:
+        clauses.append("d.owner_id = %s")
+        params.append(owner.pk)
+    return '(' + ' OR '.join(clauses) + ')', params
+
+
+def highlight(snippet: str) -> str:
+    """Safe HTML for an engine snippet: the text escaped, its match markers turned into <mark> tags"""
+    escaped = html.escape(snippet or '', quote=False)
+    return escaped.replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_END, HIGHLIGHT_END)
+
+
+def _hit(row) -> Dict[str, Any]:
+    doc_id, kind, object_id, portfolio_id, title, rank, snippet = row
+    return {
+        'id': doc_id,
+        'kind': kind,
+        'object_id': object_id,
+        'portfolio_id': portfolio_id,
+        'title': title,
+        'rank': float(rank or 0),
+        'snippet': highlight(snippet),
+    }
+
+
+class BaseSearchBackend:
+    """Interface shared by the search engines"""
+    name = 'base'
+
+    def search(self, query: str, portfolio_ids=None, owner=None, limit: int = DEFAULT_HIT_LIMIT) -> List[Dict[str, Any]]:
+        """Return ranked hits with highlighted snippets, best first"""
+        raise NotImplementedError
+
+    def matching_portfolios(self, query: str):
+        """Expression usable as `pk__in=` selecting portfolios with any matching document"""
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """tsvector/GIN search ranked with ts_rank_cd and highlighted with ts_headline"""
+    name = 'postgres'
+    HEADLINE_OPTIONS = (
+        f'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxWords={SNIPPET_WORDS}, MinWords=8, MaxFragments=2'
+    )
+
+    def search(self, query, portfolio_ids=None, owner=None, limit=DEFAULT_HIT_LIMIT):
+        if not _query_terms(query):
+            return []
+
+        visibility, visibility_params = _visibility_sql(portfolio_ids, owner)
+        # ts_headline re-parses the body, so only run it on the final page of hits
+        sql = f"""
+            WITH q AS (SELECT websearch_to_tsquery('english', %s) AS query)
+            SELECT ranked.id, ranked.kind, ranked.object_id, ranked.portfolio_id, ranked.title, ranked.rank,
+                   ts_headline('english', left(d.body, 20000), q.query, %s)
+            FROM (
+                SELECT d.id, d.kind, d.object_id, d.portfolio_id, d.title,
+                       ts_rank_cd(d.search_vector, q.query) AS rank
+                FROM api_searchdocument d, q
+                WHERE d.search_vector @@ q.query AND {visibility}
+                ORDER BY rank DESC
+                LIMIT %s
+            ) ranked
+            JOIN api_searchdocument d ON d.id = ranked.id
+            CROSS JOIN q
+            ORDER BY ranked.rank DESC
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [query, self.HEADLINE_OPTIONS] + visibility_params + [limit])
+            return [_hit(row) for row in cursor.fetchall()]
+
+    def matching_portfolios(self, query):
+        return RawSQL(
+            "SELECT portfolio_id FROM api_searchdocument "
+            "WHERE portfolio_id IS NOT NULL AND search_vector @@ websearch_to_tsquery('english', %s)",
+            [query]
+        )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """FTS5 search ranked with bm25 and highlighted with snippet()"""
+    name = 'sqlite'
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        """Quote every term so user input can't inject FTS5 syntax; the last term matches as a prefix"""
+        terms = _query_terms(query)
+        if not terms:
+            return ''
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+
+    def search(self, query, portfolio_ids=None, owner=None, limit=DEFAULT_HIT_LIMIT):
+        match = self.match_expression(query)
+        if not match:
+            return []
+
+        visibility, visibility_params = _visibility_sql(portfolio_ids, owner)
+        # Title matches weigh 10x body matches; bm25 is lower-is-better so it is negated
+        sql = f"""
+            SELECT d.id, d.kind, d.object_id, d.portfolio_id, d.title,
+                   -bm25(api_searchdocument_fts, 10.0, 1.0) AS rank,
+                   snippet(api_searchdocument_fts, -1, %s, %s, '...', {SNIPPET_WORDS})
+            FROM api_searchdocument_fts
+            JOIN api_searchdocument d ON d.id = api_searchdocument_fts.rowid
+            WHERE api_searchdocument_fts MATCH %s AND {visibility}
+            ORDER BY rank DESC
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [MATCH_START, MATCH_END, match] + visibility_params + [limit])
+            return [_hit(row) for row in cursor.fetchall()]
+
+    def matching_portfolios(self, query):
+        match = self.match_expression(query)
+        return RawSQL(
+            "SELECT d.portfolio_id FROM api_searchdocument_fts "
+            "JOIN api_searchdocument d ON d.id = api_searchdocument_fts.rowid "
+            "WHERE api_searchdocument_fts MATCH %s AND d.portfolio_id IS NOT NULL",
+            [match or '""']
+        )
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """LIKE matching for databases without a text index; correct but unindexed"""
+    name = 'basic'
+
+    def _filter(self, query):
+        condition = Q()
+        for term in _query_terms(query):
+            condition &= Q(title__icontains=term) | Q(body__icontains=term)
+        return condition
+
+    def search(self, query, portfolio_ids=None, owner=None, limit=DEFAULT_HIT_LIMIT):
+        terms = _query_terms(query)
+        if not terms:
+            return []
+
+        documents = SearchDocument.objects.filter(self._filter(query))
+        visible = []
+        if portfolio_ids is not None:
+            visible.append(Q(portfolio_id__in=portfolio_ids))
+        if owner is not None:
+            visible.append(Q(owner=owner))
+        if visible:
+            condition = visible[0]
+            for clause in visible[1:]:
+                condition |= clause
+            documents = documents.filter(condition)
+
+        hits = []
+        for document in documents.order_by('-updated_at')[:limit]:
+            title_matches = sum(term in document.title.lower() for term in terms)
+            hits.append({
+                'id': document.pk,
+                'kind': document.kind,
+                'object_id': document.object_id,
+                'portfolio_id': document.portfolio_id,
+                'title': document.title,
+                'rank': float(title_matches * 10 + 1),
+                'snippet': self._snippet(document.body, terms),
+            })
+        hits.sort(key=lambda hit: hit['rank'], reverse=True)
+        return hits
+
+    @staticmethod
+    def _snippet(body: str, terms: List[str]) -> str:
+        lowered = body.lower()
+        positions = [lowered.find(term) for term in terms if term in lowered]
+        if not positions:
+            return highlight(' '.join(body.split()[:SNIPPET_WORDS]))
+
+        start = max(min(positions) - 80, 0)
+        fragment = body[start:start + 240]
+        for term in terms:
+            fragment = re.sub(
+                f'({re.escape(term)})',
+                f'{MATCH_START}\\1{MATCH_END}',
+                fragment,
+                flags=re.IGNORECASE
+            )
+        return highlight(('...' if start else '') + fragment + '...')
+
+    def matching_portfolios(self, query):
+        return SearchDocument.objects.filter(
+            self._filter(query),
+            portfolio__isnull=False
+        ).values('portfolio_id')
+
+
+BACKENDS = {
+    'postgres': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+    'basic': BasicSearchBackend,
+}
+
+_backend_cache: Dict[str, BaseSearchBackend] = {}
+
+
+def _detect_backend_name() -> str:
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'sqlite':
+        # The FTS5 table is only created when SQLite was compiled with it
+        if 'api_searchdocument_fts' in connection.introspection.table_names():
+            return 'sqlite'
+    return 'basic'
+
+
+def get_search_backend() -> BaseSearchBackend:
+    """Search backend for the current database, overridable with settings.SEARCH_BACKEND"""
+    cache_key = f"{connection.alias}:{connection.settings_dict.get('NAME')}"
+    backend = _backend_cache.get(cache_key)
+    if backend is None:
+        name = getattr(settings, 'SEARCH_BACKEND', '') or _detect_backend_name()
+        backend = BACKENDS[name]()
+        _backend_cache[cache_key] = backend
+        logger.info(f"Using '{backend.name}' search backend")
+    return backend
+
+
+# ---------------------------------------------------------------------------
+# Query helpers used by the views
+# ---------------------------------------------------------------------------
+
+def search_documents(query: str, user=None, limit: int = DEFAULT_HIT_LIMIT) -> List[Dict[str, Any]]:
+    """Ranked hits the user may see: accessible portfolios plus their own files"""
+    owner = user if user is not None and user.is_authenticated else None
+    portfolio_ids = accessible_portfolios(owner).values('pk')
+    return get_search_backend().search(query, portfolio_ids=portfolio_ids, owner=owner, limit=limit)
+
+
+def filter_portfolios_by_text(queryset, query: str):
+    """Restrict a ClassPortfolio queryset to portfolios with any document matching the query"""
+    if not _query_terms(query):
+        return queryset
+    return queryset.filter(pk__in=get_search_backend().matching_portfolios(query))
+
+
+def order_by_hits(queryset, hits: List[Dict[str, Any]]):
+    """Order portfolios by their best-ranked hit; unranked matches follow, newest first"""
+    positions = {}
+    for hit in hits:
+        if hit['portfolio_id'] is not None:
+            positions.setdefault(hit['portfolio_id'], len(positions))
+    if not positions:
+        return queryset.order_by('-created_at')
+
+    relevance = Case(
+        *[When(pk=pk, then=Value(position)) for pk, position in positions.items()],
+        default=Value(len(positions)),
+        output_field=IntegerField()
+    )
+    return queryset.annotate(relevance=relevance).order_by('relevance', '-created_at')
@@ -7,6 +7,9 @@ from .models import (
     ClassReview, StudyGroup, Notification, ResourceRecommendation,
     Post, Like, Comment, ProcessedFile, Document, DocumentQuiz, YouTubeVideo, CalendarEvent
 )
+from .feeds import COMMENTS_PER_POST, encode_comment_cursor
+from .portfolio_detail import COLLECTIONS, PAGE_SIZE as COLLECTION_PAGE_SIZE, order_collection, split_page
+from .prefetching import page_attr
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -94,7 +97,7 @@ class ClassPortfolioSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ClassPortfolio
-        fields = ['id', 'professor', 'course', 'semester', 'year', 'price', 'created_by', 'created_at', 'is_public', 'color']
+        fields = ['id', 'professor', 'course', 'semester', 'year', 'price', 'created_by', 'created_at', 'is_public', 'color', 'tags']
         read_only_fields = ['id', 'created_at', 'created_by']
     
     def create(self, validated_data):
@@ -147,6 +150,8 @@ class SyllabusSerializer(serializers.ModelSerializer):
         model = Syllabus
         fields = ['id', 'file', 'uploaded_at', 'extracted_text', 'extraction_status', 
                  'extraction_error', 'extraction']
+        # Read by get_extraction; see api.prefetching
+        select_related = ['extraction']
     
     def get_extraction(self, obj):
         if hasattr(obj, 'extraction'):
@@ -267,13 +272,55 @@ class PortfolioDetailSerializer(serializers.ModelSerializer):
     study_groups = StudyGroupSerializer(many=True, read_only=True)
     recommendations = ResourceRecommendationSerializer(many=True, read_only=True)
     
+    collections = serializers.SerializerMethodField()
+    
     class Meta:
         model = ClassPortfolio
         fields = ['id', 'professor', 'course', 'semester', 'year', 'price', 'created_by', 
                  'created_at', 'is_public', 'color', 'syllabus', 'important_dates', 
-                 'materials', 'quizzes', 'reviews', 'study_groups', 'recommendations']
+                 'materials', 'quizzes', 'reviews', 'study_groups', 'recommendations',
+                 'collections']
         read_only_fields = ['id', 'created_at', 'created_by']
     
+    def _collection_limit(self):
+        return self.context.get('collection_limit', COLLECTION_PAGE_SIZE)
+    
+    def _collection_rows(self, obj, name):
+        # detail_queryset() prefetches the first limit+1 rows in page order; otherwise fetch them here
+        pages = obj.__dict__.setdefault('_collection_pages', {})
+        if name not in pages:
+            rows = getattr(obj, page_attr(name), None)
+            if rows is None:
+                rows = list(order_collection(name, getattr(obj, name).all())[:self._collection_limit() + 1])
+            pages[name] = split_page(name, rows, self._collection_limit())
+        return pages[name]
+    
+    def get_collections(self, obj):
+        """Count and next-page cursor of each nested collection"""
+        collections = {}
+        for name in COLLECTIONS:
+            rows, next_cursor = self._collection_rows(obj, name)
+            count = getattr(obj, f'{name}_count', None)
+            collections[name] = {
+                'count': count if count is not None else getattr(obj, name).count(),
+                'next_cursor': next_cursor
+            }
+        return collections
+    
+    @property
+    def _readable_fields(self):
+        # Collections are serialized from their first page below, never from the whole relation
+        for field in super()._readable_fields:
+            if field.field_name not in COLLECTIONS:
+                yield field
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for name in COLLECTIONS:
+            rows, _ = self._collection_rows(instance, name)
+            data[name] = self.fields[name].to_representation(rows)
+        return {name: data[name] for name in self.fields if name in data}
+    
     def validate_color(self, value):
         """Validate hex color format"""
         if value and not value.startswith('#'):
@@ -299,8 +346,16 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'author', 'content', 'created_at', 'updated_at']
 
 class PostSerializer(serializers.ModelSerializer):
+    """
+    Post with its first few comments
+
+    Counts and like state come from feed_queryset() annotations when present;
+    plain Post instances fall back to per-object queries.
+    """
     author = UserSerializer(read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
+    comments_count = serializers.SerializerMethodField()
+    next_comments_cursor = serializers.SerializerMethodField()
     likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     
@@ -308,12 +363,38 @@ class PostSerializer(serializers.ModelSerializer):
         model = Post
         fields = ['id', 'title', 'content', 'author', 'tags', 'image_url', 
                  'is_published', 'views', 'created_at', 'updated_at', 
-                 'comments', 'likes_count', 'is_liked']
+                 'comments', 'comments_count', 'next_comments_cursor',
+                 'likes_count', 'is_liked']
+    
+    def _preview_comments(self, obj):
+        if not hasattr(obj, 'preview_comments'):
+            obj.preview_comments = list(
+                obj.comments.select_related('author').order_by('created_at', 'id')[:COMMENTS_PER_POST]
+            )
+        return obj.preview_comments
+    
+    def get_comments(self, obj):
+        return CommentSerializer(self._preview_comments(obj), many=True, context=self.context).data
+    
+    def get_comments_count(self, obj):
+        if not hasattr(obj, 'comments_count'):
+            obj.comments_count = obj.comments.count()
+        return obj.comments_count
+    
+    def get_next_comments_cursor(self, obj):
+        preview = self._preview_comments(obj)
+        if preview and self.get_comments_count(obj) > len(preview):
+            return encode_comment_cursor(preview[-1])
+        return None
     
     def get_likes_count(self, obj):
+        if hasattr(obj, 'likes_count'):
+            return obj.likes_count
         return obj.likes.count()
     
     def get_is_liked(self, obj):
+        if hasattr(obj, 'is_liked'):
+            return obj.is_liked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
@@ -592,3 +673,27 @@ class CalendarEventCreateSerializer(serializers.ModelSerializer):
             event.linked_resources.set(resources)
         
         return event
+
+
+class LinkedResourceRefSerializer(serializers.ModelSerializer):
+    """Just enough of a learning link to render it inside a calendar event"""
+    link_type = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = YouTubeVideo
+        fields = ['id', 'title', 'url', 'link_type']
+
+
+class CalendarEventCompactSerializer(serializers.ModelSerializer):
+    """Calendar event with its portfolio as an id; see api.calendar_feed for the matching query"""
+    class_portfolio = serializers.IntegerField(source='class_portfolio_id', read_only=True)
+    linked_resources = LinkedResourceRefSerializer(many=True, read_only=True)
+    is_overdue = serializers.ReadOnlyField()
+    is_due_soon = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = CalendarEvent
+        fields = [
+            'id', 'class_portfolio', 'title', 'event_type', 'due_date', 'status', 'priority',
+            'points', 'location', 'completed_at', 'linked_resources', 'is_overdue', 'is_due_soon'
+        ]
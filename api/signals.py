@@ -0,0 +1,128 @@
+"""
+Model signal handlers for HackWestTX Class Portfolio
+Keeps derived data (search index, tag rows, cached facets, quiz answer keys,
+portfolio snapshots, the learning-link directory) in step with model saves
+"""
+
+import logging
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .facets import invalidate_facets
+from .link_directory import invalidate_directory
+from .models import (
+    ClassPortfolio, ClassReview, Flashcard, ImportantDate, LectureMaterial, PortfolioPurchase,
+    ProcessedFile, Quiz, QuizQuestion, Syllabus, SyllabusExtraction, YouTubeVideo
+)
+from .quiz_scoring import schedule_regrade
+from .search import index_instance, remove_instance
+from .snapshots import invalidate_snapshots
+from .tags import adjust_tag_counts, sync_portfolio_tags
+
+logger = logging.getLogger(__name__)
+
+SEARCHABLE_MODELS = (ClassPortfolio, Syllabus, SyllabusExtraction, ProcessedFile)
+
+
+@receiver(post_save)
+def update_search_document(sender, instance, raw=False, **kwargs):
+    """Re-index searchable objects whenever they are saved"""
+    if raw or sender not in SEARCHABLE_MODELS:
+        return
+    try:
+        index_instance(instance)
+    except Exception as e:
+        # A stale search entry must never fail the save itself; rebuild_search_index repairs it
+        logger.exception(f"Failed to index {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_delete)
+def delete_search_document(sender, instance, **kwargs):
+    """Drop search entries for deleted objects"""
+    if sender not in SEARCHABLE_MODELS:
+        return
+    remove_instance(instance)
+
+
+@receiver(post_init, sender=ClassPortfolio)
+def remember_loaded_professor(sender, instance, **kwargs):
+    """Stash the professor as loaded so a rename can be counted on save"""
+    # __dict__ lookup so deferred fields aren't fetched just for this
+    instance._loaded_professor = instance.__dict__.get('professor')
+
+
+@receiver(post_save, sender=ClassPortfolio)
+def sync_tags_on_save(sender, instance, created, raw=False, **kwargs):
+    """Mirror ClassPortfolio.tags into PortfolioTag rows and keep TagCount current"""
+    if raw:
+        return
+    sync_portfolio_tags(instance)
+
+    previous = None if created else getattr(instance, '_loaded_professor', None)
+    if instance.professor != previous:
+        adjust_tag_counts(
+            'professor',
+            added=[instance.professor],
+            removed=[previous] if previous else []
+        )
+    instance._loaded_professor = instance.professor
+
+
+@receiver(post_delete, sender=ClassPortfolio)
+def release_tag_counts(sender, instance, **kwargs):
+    """Deleted portfolios no longer count towards their tags or professor"""
+    adjust_tag_counts('tag', removed=instance.tags or [])
+    adjust_tag_counts('professor', removed=[instance.professor])
+
+
+@receiver(post_save, sender=ClassPortfolio)
+@receiver(post_delete, sender=ClassPortfolio)
+@receiver(post_save, sender=PortfolioPurchase)
+@receiver(post_delete, sender=PortfolioPurchase)
+def invalidate_cached_facets(sender, **kwargs):
+    """Catalog and access changes make every cached facet set stale"""
+    invalidate_facets()
+
+
+@receiver(post_save, sender=YouTubeVideo)
+@receiver(post_delete, sender=YouTubeVideo)
+def invalidate_link_directory(sender, **kwargs):
+    """Any added, edited or removed link can move every cached directory page"""
+    invalidate_directory()
+
+
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+def bump_answer_key_version(sender, instance, raw=False, **kwargs):
+    """A changed question retires the quiz's cached answer key and regrades its submissions"""
+    if raw:
+        return
+    if Quiz.objects.filter(pk=instance.quiz_id).update(answer_key_version=F('answer_key_version') + 1):
+        schedule_regrade(instance.quiz_id)
+
+
+# Models whose rows feed a portfolio snapshot, and how to find that portfolio
+SNAPSHOT_SOURCES = {
+    ImportantDate: lambda instance: instance.portfolio_id,
+    LectureMaterial: lambda instance: instance.portfolio_id,
+    Quiz: lambda instance: instance.portfolio_id,
+    ClassReview: lambda instance: instance.portfolio_id,
+    ProcessedFile: lambda instance: instance.portfolio_id,
+    Flashcard: lambda instance: LectureMaterial.objects.filter(
+        pk=instance.material_id
+    ).values_list('portfolio_id', flat=True).first(),
+    QuizQuestion: lambda instance: Quiz.objects.filter(
+        pk=instance.quiz_id
+    ).values_list('portfolio_id', flat=True).first(),
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_content_snapshots(sender, instance, raw=False, **kwargs):
+    """Content added, edited or removed makes the portfolio's snapshots stale"""
+    if raw or sender not in SNAPSHOT_SOURCES:
+        return
+    invalidate_snapshots(SNAPSHOT_SOURCES[sender](instance))
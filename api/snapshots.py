@@ -0,0 +1,355 @@
+"""
+Portfolio preview snapshots for HackWestTX Class Portfolio
+The preview and full-access content of a portfolio is built once, stored in a
+PortfolioSnapshot row and served from the cache, so a preview request costs
+the same few queries however large the portfolio is. Saving or deleting
+anything the content is built from bumps ClassPortfolio.snapshot_version and
+queues a background rebuild; until it finishes, the previous snapshot is served.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Avg, Count, F, Prefetch
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import (
+    ClassPortfolio, ClassReview, Flashcard, ImportantDate, Job, LectureMaterial,
+    PortfolioSnapshot, ProcessedFile, Quiz, QuizQuestion
+)
+from .serializers import (
+    ClassReviewSerializer, FlashcardSerializer, ImportantDateSerializer, QuizQuestionSerializer
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_TIMEOUT = getattr(settings, 'SNAPSHOT_CACHE_TIMEOUT', 3600)
+# Saves usually come in bursts (a generated quiz, a syllabus import); one rebuild covers them
+REBUILD_DELAY_SECONDS = getattr(settings, 'SNAPSHOT_REBUILD_DELAY', 5)
+REBUILD_TASK = 'rebuild_portfolio_snapshots'
+
+ACCESS_LEVELS = ('preview', 'full')
+
+PREVIEW_FLASHCARDS = 5
+PREVIEW_QUESTIONS = 3
+PREVIEW_SUMMARIES = 3
+SUMMARY_PREVIEW_CHARS = 200
+
+
+def _cache_key(portfolio_id: int, access_level: str, version: int) -> str:
+    return f"portfolio:snapshot:{portfolio_id}:{access_level}:{version}"
+
+
+def _jsonable(content: Dict[str, Any]) -> Dict[str, Any]:
+    # Datetimes and Decimals as the API would render them, so cached and rebuilt content look the same
+    return json.loads(json.dumps(content, cls=DjangoJSONEncoder))
+
+
+def portfolio_visibility(portfolio: ClassPortfolio) -> str:
+    """'paid', 'public' or 'private', matching the visibility search parameter"""
+    if portfolio.price > 0:
+        return 'paid'
+    return 'public' if portfolio.is_public else 'private'
+
+
+def snapshot_level(portfolio: ClassPortfolio, user) -> Optional[str]:
+    """
+    Which snapshot a user may see
+
+    Users with access (see api.access) get the full content; anyone else gets
+    the preview of a portfolio that is for sale. None means no access at all.
+    """
+    if portfolio.can_user_access(user):
+        return 'full'
+    if portfolio.price > 0:
+        return 'preview'
+    return None
+
+
+def _summary_files(portfolio: ClassPortfolio):
+    return ProcessedFile.objects.filter(
+        portfolio=portfolio,
+        processing_status='completed'
+    ).exclude(ai_summary='').order_by('uploaded_at').only(
+        'id', 'file_name', 'ai_summary', 'metadata', 'processed_at'
+    )
+
+
+def _review_averages(portfolio: ClassPortfolio) -> Dict[str, Any]:
+    stats = ClassReview.objects.filter(portfolio=portfolio).aggregate(
+        total=Count('id'),
+        difficulty=Avg('difficulty_rating'),
+        teaching_quality=Avg('teaching_quality_rating'),
+        workload=Avg('workload_rating'),
+    )
+    if not stats['total']:
+        return {'total': 0, 'averages': None}
+
+    averages = {
+        name: round(stats[name], 1)
+        for name in ('difficulty', 'teaching_quality', 'workload')
+    }
+    averages['overall'] = round(
+        (stats['difficulty'] + stats['teaching_quality'] + stats['workload']) / 3, 1
+    )
+    return {'total': stats['total'], 'averages': averages}
+
+
+def build_preview_content(portfolio: ClassPortfolio) -> Dict[str, Any]:
+    """Content shown to visitors and prospective buyers"""
+    content = {}
+
+    # Syllabus/Calendar: Show 20% of items (rounded up) and next upcoming item
+    important_dates = ImportantDate.objects.filter(portfolio=portfolio).order_by('due_date')
+    total_dates = important_dates.count()
+    if total_dates > 0:
+        preview_count = max(1, (total_dates + 4) // 5)
+        preview_dates = list(important_dates[:preview_count])
+        upcoming = important_dates.filter(due_date__gte=timezone.now()).first()
+        if upcoming and upcoming not in preview_dates:
+            preview_dates.append(upcoming)
+
+        content['syllabus'] = {
+            'important_dates': ImportantDateSerializer(preview_dates, many=True).data,
+            'total_dates': total_dates,
+            'preview_count': len(preview_dates),
+            'preview_note': f"Showing {len(preview_dates)} of {total_dates} important dates"
+        }
+    else:
+        content['syllabus'] = {
+            'important_dates': [],
+            'total_dates': 0,
+            'preview_count': 0,
+            'preview_note': "No important dates available"
+        }
+
+    flashcards = Flashcard.objects.filter(material__portfolio=portfolio).order_by('created_at')
+    preview_flashcards = list(flashcards[:PREVIEW_FLASHCARDS])
+    content['flashcards'] = {
+        'items': FlashcardSerializer(preview_flashcards, many=True).data,
+        'total_count': flashcards.count(),
+        'preview_note': f"Showing first {len(preview_flashcards)} flashcards"
+    }
+
+    # First quiz only, with its first few questions
+    quizzes = Quiz.objects.filter(portfolio=portfolio).order_by('created_at')
+    quiz_preview = []
+    first_quiz = quizzes.annotate(question_count=Count('questions')).first()
+    if first_quiz is not None:
+        questions = list(QuizQuestion.objects.filter(quiz=first_quiz).order_by('id')[:PREVIEW_QUESTIONS])
+        quiz_preview.append({
+            'quiz_id': first_quiz.id,
+            'title': first_quiz.title,
+            'questions': QuizQuestionSerializer(questions, many=True).data,
+            'total_questions': first_quiz.question_count,
+            'preview_note': f"Showing first {len(questions)} questions"
+        })
+    content['quizzes'] = {
+        'items': quiz_preview,
+        'total_count': quizzes.count(),
+        'preview_note': "Showing preview of first quiz"
+    }
+
+    # AI Summaries: Show first paragraph only
+    summaries = []
+    for processed_file in _summary_files(portfolio)[:PREVIEW_SUMMARIES]:
+        summary_text = processed_file.ai_summary
+        first_paragraph = summary_text.split('\n')[0] if '\n' in summary_text else summary_text[:SUMMARY_PREVIEW_CHARS] + "..."
+        summaries.append({
+            'file_id': processed_file.id,
+            'title': processed_file.file_name,
+            'summary_preview': first_paragraph,
+            'full_summary_length': len(summary_text),
+            'preview_note': "First paragraph preview"
+        })
+    content['summaries'] = {
+        'items': summaries,
+        'total_count': _summary_files(portfolio).count(),
+        'preview_note': f"Showing preview of {len(summaries)} summaries"
+    }
+
+    content['materials'] = {
+        'count': LectureMaterial.objects.filter(portfolio=portfolio).count(),
+        'preview_note': "Materials available with full access"
+    }
+
+    content['performance'] = {
+        'current_grade': None,
+        'grade_breakdown': None,
+        'category_averages': None,
+        'preview_note': "Grade information hidden in preview mode",
+        'feature_available': True,
+        'screenshot_url': "/static/images/grade-tracker-preview.png"
+    }
+
+    # Reviews: Show averages and up to 1 full review
+    reviews = _review_averages(portfolio)
+    if reviews['total']:
+        sample_review = ClassReview.objects.filter(portfolio=portfolio).order_by('-created_at').first()
+        content['reviews'] = {
+            'averages': reviews['averages'],
+            'sample_review': {
+                'difficulty_rating': sample_review.difficulty_rating,
+                'teaching_quality_rating': sample_review.teaching_quality_rating,
+                'workload_rating': sample_review.workload_rating,
+                'comment': sample_review.comments,
+                'created_at': sample_review.created_at
+            },
+            'total_reviews': reviews['total'],
+            'preview_note': f"Showing averages and 1 of {reviews['total']} reviews"
+        }
+    else:
+        content['reviews'] = {
+            'averages': None,
+            'sample_review': None,
+            'total_reviews': 0,
+            'preview_note': "No reviews available"
+        }
+
+    return content
+
+
+def build_full_content(portfolio: ClassPortfolio) -> Dict[str, Any]:
+    """Everything in the portfolio, for owners and buyers"""
+    content = {}
+
+    important_dates = list(ImportantDate.objects.filter(portfolio=portfolio).order_by('due_date'))
+    content['syllabus'] = {
+        'important_dates': ImportantDateSerializer(important_dates, many=True).data,
+        'total_dates': len(important_dates)
+    }
+
+    flashcards = list(Flashcard.objects.filter(material__portfolio=portfolio).order_by('created_at'))
+    content['flashcards'] = {
+        'items': FlashcardSerializer(flashcards, many=True).data,
+        'total_count': len(flashcards)
+    }
+
+    quizzes = list(Quiz.objects.filter(portfolio=portfolio).order_by('created_at').prefetch_related(
+        Prefetch('questions', queryset=QuizQuestion.objects.order_by('id'))
+    ))
+    quiz_data = []
+    for quiz in quizzes:
+        questions = quiz.questions.all()
+        quiz_data.append({
+            'quiz_id': quiz.id,
+            'title': quiz.title,
+            'questions': QuizQuestionSerializer(questions, many=True).data,
+            'total_questions': len(questions)
+        })
+    content['quizzes'] = {
+        'items': quiz_data,
+        'total_count': len(quizzes)
+    }
+
+    summaries = [
+        {
+            'file_id': processed_file.id,
+            'title': processed_file.file_name,
+            'summary': processed_file.ai_summary,
+            'generated_at': processed_file.processed_at
+        }
+        for processed_file in _summary_files(portfolio)
+    ]
+    content['summaries'] = {
+        'items': summaries,
+        'total_count': len(summaries)
+    }
+
+    content['materials'] = {
+        'count': LectureMaterial.objects.filter(portfolio=portfolio).count()
+    }
+
+    reviews = list(ClassReview.objects.filter(portfolio=portfolio).select_related('reviewer').order_by('-created_at'))
+    content['reviews'] = {
+        'items': ClassReviewSerializer(reviews, many=True).data,
+        'averages': _review_averages(portfolio)['averages'],
+        'total_count': len(reviews)
+    }
+
+    return content
+
+
+BUILDERS = {
+    'preview': build_preview_content,
+    'full': build_full_content,
+}
+
+
+def build_snapshot(portfolio: ClassPortfolio, access_level: str) -> PortfolioSnapshot:
+    """Build and store one snapshot from the portfolio's current content"""
+    # Read the version first: a change that lands mid-build bumps it again and queues another rebuild
+    version = ClassPortfolio.objects.filter(pk=portfolio.pk).values_list('snapshot_version', flat=True).first()
+    if version is None:
+        raise ClassPortfolio.DoesNotExist(f"ClassPortfolio {portfolio.pk} no longer exists")
+
+    content = _jsonable(BUILDERS[access_level](portfolio))
+    snapshot, _ = PortfolioSnapshot.objects.update_or_create(
+        portfolio=portfolio,
+        access_level=access_level,
+        defaults={'content': content, 'version': version}
+    )
+    cache.set(_cache_key(portfolio.pk, access_level, version), content, SNAPSHOT_CACHE_TIMEOUT)
+    return snapshot
+
+
+def rebuild_snapshots(portfolio_id: int) -> Dict[str, int]:
+    """Rebuild every access level of a portfolio; returns the version built per level"""
+    portfolio = ClassPortfolio.objects.get(pk=portfolio_id)
+    return {
+        access_level: build_snapshot(portfolio, access_level).version
+        for access_level in ACCESS_LEVELS
+    }
+
+
+def get_snapshot_content(portfolio: ClassPortfolio, access_level: str) -> Dict[str, Any]:
+    """
+    Snapshot content for a portfolio loaded by the caller
+
+    Served from the cache when current; otherwise from the stored row (stale
+    rows are fine to serve, a rebuild is already queued) and only built inline
+    when the portfolio has never been snapshotted.
+    """
+    version = portfolio.snapshot_version
+    key = _cache_key(portfolio.pk, access_level, version)
+    content = cache.get(key)
+    if content is not None:
+        return content
+
+    snapshot = PortfolioSnapshot.objects.filter(portfolio=portfolio, access_level=access_level).first()
+    if snapshot is None:
+        return build_snapshot(portfolio, access_level).content
+
+    if snapshot.version == version:
+        cache.set(key, snapshot.content, SNAPSHOT_CACHE_TIMEOUT)
+    else:
+        schedule_rebuild(portfolio.pk)
+    return snapshot.content
+
+
+def _enqueue_rebuild(portfolio_id: int) -> None:
+    pending = Job.objects.filter(name=REBUILD_TASK, status='queued', payload__portfolio_id=portfolio_id)
+    if pending.exists():
+        return
+    enqueue(REBUILD_TASK, {'portfolio_id': portfolio_id}, delay=REBUILD_DELAY_SECONDS)
+
+
+def schedule_rebuild(portfolio_id: int) -> None:
+    """Queue one rebuild for the portfolio once the current transaction commits"""
+    transaction.on_commit(lambda: _enqueue_rebuild(portfolio_id))
+
+
+def invalidate_snapshots(portfolio_id: Optional[int]) -> None:
+    """Mark a portfolio's snapshots stale and queue their rebuild"""
+    if portfolio_id is None:
+        return
+    updated = ClassPortfolio.objects.filter(pk=portfolio_id).update(snapshot_version=F('snapshot_version') + 1)
+    if updated:
+        schedule_rebuild(portfolio_id)
+
@@ -0,0 +1,224 @@
+"""
+Chunked summarization for HackWestTX Class Portfolio
+Long documents are split on the page/slide markers the extractors emit, each
+chunk is condensed into notes by a bounded thread pool, and the notes are
+condensed again until they fit in a single prompt (map-reduce). Chunk notes
+are cached by content, so re-summarizing an edited document only pays for the
+chunks that changed. Each chunk call is admitted by the shared OpenAI rate
+limits (api.llm_gateway) before it is handed to the pool.
+"""
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import openai
+from django.conf import settings
+
+from . import content_cache, llm_gateway
+
+logger = logging.getLogger(__name__)
+
+# Bump when the chunk prompt changes so stale cached notes aren't reused
+CHUNK_PROMPT_VERSION = 1
+
+CHUNK_CHARS = getattr(settings, 'SUMMARY_CHUNK_CHARS', 12000)
+WORKERS = getattr(settings, 'SUMMARY_WORKERS', 4)
+CHUNK_MAX_TOKENS = 500
+# Each level shrinks the text several times over; this only guards against runaway loops
+MAX_LEVELS = 4
+
+# Extractors start every page/slide with "--- Page N ---" / "--- Slide N ---"
+SECTION_MARKER = re.compile(r'^(?=--- (?:Page|Slide) \d+ ---$)', re.MULTILINE)
+
+
+def get_openai_client() -> Optional[openai.OpenAI]:
+    api_key = getattr(settings, 'OPENAI_API_KEY', None)
+    if not api_key:
+        return None
+    return openai.OpenAI(api_key=api_key)
+
+
+def split_sections(text: str) -> List[str]:
+    """Pages/slides when the text has markers, otherwise paragraphs"""
+    sections = [section.strip() for section in SECTION_MARKER.split(text)]
+    if len(sections) <= 1:
+        sections = [section.strip() for section in text.split('\n\n')]
+    return [section for section in sections if section]
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """Cut a single section longer than max_chars at whitespace"""
+    pieces = []
+    while len(section) > max_chars:
+        cut = section.rfind(' ', 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(section[:cut].strip())
+        section = section[cut:].strip()
+    if section:
+        pieces.append(section)
+    return pieces
+
+
+def _is_boundary(section: str) -> bool:
+    # Roughly one section in four ends a chunk once it is half full
+    return int(content_cache.sha256_text(section)[:2], 16) % 4 == 0
+
+
+def split_into_chunks(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """
+    Pack sections into chunks of at most max_chars
+
+    Chunks close at content-defined boundaries rather than purely by size, so
+    an edit to one page changes that chunk (and maybe its neighbour) instead
+    of shifting every chunk after it and invalidating their cached notes.
+    """
+    chunks = []
+    current: List[str] = []
+    current_len = 0
+    for section in split_sections(text):
+        for piece in _split_oversized(section, max_chars):
+            if current and current_len + len(piece) + 2 > max_chars:
+                chunks.append('\n\n'.join(current))
+                current, current_len = [], 0
+            current.append(piece)
+            current_len += len(piece) + (2 if current_len else 0)
+            if current_len >= max_chars // 2 and _is_boundary(piece):
+                chunks.append('\n\n'.join(current))
+                current, current_len = [], 0
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def chunk_params(chunk: str, context: str, model: str) -> Dict[str, Any]:
+    return llm_gateway.chat_params(
+        model,
+        [
+            {"role": "system", "content": "You are an expert academic assistant that helps students understand and summarize educational content."},
+            {"role": "user", "content": f"""
+The following is one section of a longer {context}. Write concise study notes for this section only:
+the topics covered, key concepts and definitions, and any specific facts, dates, deadlines or tasks.
+
+Section:
+{chunk}
+"""}
+        ],
+        CHUNK_MAX_TOKENS,
+        0.3
+    )
+
+
+def summarize_chunks(client: openai.OpenAI, chunks: List[str], context: str, model: str,
+                     workers: int = WORKERS, use_cache: bool = True, user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Notes for every chunk, in order
+
+    Cache lookups and writes, rate-limit reservations and usage accounting stay
+    on the calling thread (and its database connection); only the API calls
+    run in the pool. A chunk is submitted as soon as its budget is reserved.
+    """
+    notes: List[Optional[str]] = [None] * len(chunks)
+    keys: List[Optional[str]] = [None] * len(chunks)
+    if use_cache:
+        for index, chunk in enumerate(chunks):
+            try:
+                keys[index] = content_cache.make_key(
+                    'summary', 'chunk', CHUNK_PROMPT_VERSION, content_cache.sha256_text(chunk), context, model
+                )
+                cached = content_cache.lookup('summary', keys[index])
+                if cached is not None:
+                    notes[index] = cached['notes']
+            except Exception as e:
+                logger.warning(f"Summary cache unavailable: {str(e)}")
+                keys[index] = None
+
+    pending = [index for index, value in enumerate(notes) if value is None]
+    error: Optional[Exception] = None
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as pool:
+            calls = []
+            for index in pending:
+                params = chunk_params(chunks[index], context, model)
+                try:
+                    reserved = llm_gateway.reserve(params)
+                except llm_gateway.RateLimited as e:
+                    error = e
+                    break
+                calls.append((index, params, reserved, pool.submit(client.chat.completions.create, **params)))
+            for index, params, reserved, future in calls:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    llm_gateway.release(reserved)
+                    error = error or e
+                    continue
+                # Chunk notes have their own cache above, so the completion isn't cached twice
+                notes[index] = llm_gateway.settle(params, response, reserved, user_id=user_id, use_cache=False).content
+
+    for index in pending:
+        if keys[index] and notes[index] is not None:
+            try:
+                content_cache.store('summary', keys[index], {'notes': notes[index]})
+            except Exception as e:
+                logger.warning(f"Could not cache chunk summary: {str(e)}")
+    if error is not None:
+        raise error
+
+    return {
+        'notes': notes,
+        'cached_chunks': len(chunks) - len(pending),
+    }
+
+
+def condense(client: openai.OpenAI, text: str, context: str, model: str, max_chars: int = CHUNK_CHARS,
+             chunk_chars: int = CHUNK_CHARS, workers: int = WORKERS, use_cache: bool = True,
+             user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Reduce text to notes of at most max_chars by repeated chunk summarization
+
+    Returns:
+        Dict with text, chunk_count (first level), cached_chunks and levels
+    """
+    chunk_count = cached_chunks = 0
+    levels = 0
+    while len(text) > max_chars and levels < MAX_LEVELS:
+        chunks = split_into_chunks(text, chunk_chars)
+        result = summarize_chunks(
+            client, chunks, context, model, workers=workers, use_cache=use_cache, user_id=user_id
+        )
+        if levels == 0:
+            chunk_count = len(chunks)
+        cached_chunks += result['cached_chunks']
+        levels += 1
+        logger.info(f"Summarization level {levels}: {len(chunks)} chunks ({result['cached_chunks']} cached)")
+
+        condensed = '\n\n'.join(note.strip() for note in result['notes'] if note.strip())
+        if len(condensed) >= len(text):
+            break
+        text = condensed
+
+    if len(text) > max_chars:
+        text = text[:max_chars] + "\n\n[Text truncated due to length]"
+    return {
+        'text': text,
+        'chunk_count': chunk_count,
+        'cached_chunks': cached_chunks,
+        'levels': levels,
+    }
+
+
+def condense_for_prompt(text: str, max_chars: int, context: str = "lecture material",
+                        model: str = "gpt-3.5-turbo", user_id: Optional[int] = None) -> str:
+    """Fit text into a prompt budget, falling back to truncation when the API is unavailable"""
+    if len(text) <= max_chars:
+        return text
+    client = get_openai_client()
+    if client is not None:
+        try:
+            return condense(client, text, context, model, max_chars=max_chars, user_id=user_id)['text']
+        except Exception as e:
+            logger.warning(f"Chunked condensing failed, truncating instead: {str(e)}")
+    return text[:max_chars] + "..."
@@ -0,0 +1,226 @@
+"""
+Batch syllabus re-extraction for HackWestTX Class Portfolio
+Re-runs text extraction and SyllabusExtractor over every syllabus, e.g. after
+the extractor improves. Syllabi are read in id-keyed batches (seeking past
+the last id rather than holding one cursor open across the writes), parsed
+on a process pool while the previous batch is written back with one
+upserting bulk_create for the SyllabusExtraction rows and bulk_updates for
+the Syllabus status columns. After each batch commits its last syllabus id
+goes to a checkpoint file, so an interrupted run resumes after it.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .extractors import extract_plain_text
+from .models import Syllabus, SyllabusExtraction
+from .search import index_instance
+from .syllabus_extractor import SyllabusExtractor
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+# Upserted columns: everything the extractor produces, plus the auto_now timestamp
+UPDATE_FIELDS = [
+    field.name for field in SyllabusExtraction._meta.concrete_fields
+    if not field.primary_key and field.name not in ('syllabus', 'extracted_at')
+]
+# Extractor output can outgrow these columns, which would fail the whole batch
+MAX_LENGTHS = {
+    field.name: field.max_length for field in SyllabusExtraction._meta.concrete_fields
+    if getattr(field, 'max_length', None) and field.name in UPDATE_FIELDS
+}
+
+# (syllabus id, file name, stored text or '' to parse the file)
+Task = Tuple[int, str, str]
+
+
+def init_worker() -> None:
+    """Pool initializer: spawned workers start without Django configured"""
+    import django
+    django.setup()
+
+
+def extract_one(task: Task) -> Dict[str, Any]:
+    """
+    Extract one syllabus; runs in a worker process and never raises
+
+    Returns:
+        {'id', 'data'} on success or {'id', 'error'}, plus 'text' when the
+        file was parsed
+    """
+    syllabus_id, file_name, text = task
+    result: Dict[str, Any] = {'id': syllabus_id}
+    try:
+        if not text:
+            storage = Syllabus._meta.get_field('file').storage
+            with storage.open(file_name, 'rb') as file:
+                text = extract_plain_text(file)
+            result['text'] = text
+        data = SyllabusExtractor().extract_from_text(text)
+        if 'extraction_error' in data:
+            result['error'] = data['extraction_error']
+        else:
+            result['data'] = data
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def next_batch(after_id: int, batch_size: int = BATCH_SIZE, reparse: bool = False,
+               missing_only: bool = False) -> List[Task]:
+    """The next batch_size syllabi after after_id, in id order"""
+    syllabi = Syllabus.objects.filter(pk__gt=after_id).order_by('pk')
+    if missing_only:
+        syllabi = syllabi.filter(extraction__isnull=True)
+    if reparse:
+        return [(pk, file_name, '') for pk, file_name in syllabi.values_list('pk', 'file')[:batch_size]]
+    return list(syllabi.values_list('pk', 'file', 'extracted_text')[:batch_size])
+
+
+def read_checkpoint(path: Optional[str]) -> int:
+    """Last syllabus id committed by an earlier run, 0 to start over"""
+    if not path:
+        return 0
+    try:
+        with open(path) as file:
+            return int(json.load(file)['last_id'])
+    except FileNotFoundError:
+        return 0
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"Ignoring unreadable checkpoint {path}")
+        return 0
+
+
+def write_checkpoint(path: Optional[str], last_id: int, stats: Dict[str, Any]) -> None:
+    if not path:
+        return
+    # Written aside and renamed so a crash never leaves a truncated checkpoint
+    partial = f"{path}.tmp"
+    with open(partial, 'w') as file:
+        json.dump({'last_id': last_id, **stats}, file)
+    os.replace(partial, path)
+
+
+def _extraction(result: Dict[str, Any]) -> SyllabusExtraction:
+    data = dict(result['data'])
+    for name, max_length in MAX_LENGTHS.items():
+        if isinstance(data.get(name), str):
+            data[name] = data[name][:max_length]
+    if data.get('final_exam_date') and timezone.is_naive(data['final_exam_date']):
+        data['final_exam_date'] = timezone.make_aware(data['final_exam_date'])
+    return SyllabusExtraction(syllabus_id=result['id'], **data)
+
+
+def write_batch(results: List[Dict[str, Any]], reindex: bool = True) -> int:
+    """Store one batch of worker results; returns how many extractions succeeded"""
+    extractions = [_extraction(result) for result in results if 'data' in result]
+    status_rows, text_rows = [], []
+    for result in results:
+        syllabus = Syllabus(
+            pk=result['id'],
+            extraction_status='completed' if 'data' in result else 'failed',
+            extraction_error=result.get('error', ''),
+        )
+        if 'text' in result:
+            syllabus.extracted_text = result['text']
+            text_rows.append(syllabus)
+        else:
+            status_rows.append(syllabus)
+
+    with transaction.atomic():
+        SyllabusExtraction.objects.bulk_create(
+            extractions,
+            update_conflicts=True,
+            unique_fields=['syllabus'],
+            update_fields=UPDATE_FIELDS,
+        )
+        Syllabus.objects.bulk_update(status_rows, ['extraction_status', 'extraction_error'])
+        Syllabus.objects.bulk_update(text_rows, ['extraction_status', 'extraction_error', 'extracted_text'])
+
+    if reindex:
+        # Bulk writes skip the post_save signal that keeps search documents current
+        ids = [result['id'] for result in results]
+        for extraction in SyllabusExtraction.objects.filter(syllabus_id__in=ids).select_related('syllabus'):
+            index_instance(extraction)
+        for syllabus in Syllabus.objects.filter(pk__in=[row.pk for row in text_rows]).select_related('portfolio'):
+            index_instance(syllabus)
+    return len(extractions)
+
+
+def reextract_syllabi(workers: int = 1, batch_size: int = BATCH_SIZE, checkpoint: Optional[str] = None,
+                      reparse: bool = False, missing_only: bool = False, reindex: bool = True,
+                      progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Re-extract syllabi, resuming after the checkpoint's last id
+
+    Args:
+        workers: worker processes; 1 runs everything in this process
+        checkpoint: file recording progress; removed once the run finishes
+        reparse: extract text from the files again instead of using extracted_text
+        missing_only: skip syllabi that already have an extraction
+        reindex: refresh their search documents after each batch
+        progress: called with the running totals after every batch
+
+    Returns:
+        {'processed', 'succeeded', 'failed', 'seconds', 'per_second', 'last_id'}
+    """
+    last_id = read_checkpoint(checkpoint)
+    stats = {'processed': 0, 'succeeded': 0, 'failed': 0, 'seconds': 0.0, 'per_second': 0.0, 'last_id': last_id}
+    started = time.perf_counter()
+
+    pool = None
+    if workers > 1:
+        # spawn, not fork: children must not share this process's open database connection
+        pool = multiprocessing.get_context('spawn').Pool(workers, initializer=init_worker)
+
+    def submit(batch):
+        """Start extracting a batch; returns a callable waiting for its results"""
+        if pool:
+            return pool.map_async(extract_one, batch, chunksize=max(1, len(batch) // (workers * 4))).get
+        results = [extract_one(task) for task in batch]
+        return lambda: results
+
+    def finish(batch, wait):
+        results = wait()
+        succeeded = write_batch(results, reindex=reindex)
+        stats['processed'] += len(results)
+        stats['succeeded'] += succeeded
+        stats['failed'] += len(results) - succeeded
+        stats['last_id'] = batch[-1][0]
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        stats['per_second'] = round(stats['processed'] / stats['seconds'], 2) if stats['seconds'] else 0.0
+        write_checkpoint(checkpoint, stats['last_id'], stats)
+        if progress:
+            progress(dict(stats))
+
+    try:
+        after_id, pending = last_id, None
+        while True:
+            batch = next_batch(after_id, batch_size, reparse=reparse, missing_only=missing_only)
+            queued = None
+            if batch:
+                after_id = batch[-1][0]
+                # Workers start on this batch while the previous one is written
+                queued = (batch, submit(batch))
+            if pending:
+                finish(*pending)
+            if queued is None:
+                break
+            pending = queued
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return stats
@@ -0,0 +1,219 @@
+"""
+Syllabus date normalization for HackWestTX Class Portfolio
+An extraction keeps dates as written ("10/15/2025", "Oct 15", "Week 5
+Friday"). Importing resolves them into timezone-aware datetimes, filling in
+missing years and week numbers from the syllabus semester, merges the
+duplicates one schedule line produces, and writes the result with a single
+upserting bulk_create keyed on ImportantDate.source_key, so importing the
+same syllabus again updates the dates it created instead of adding copies.
+The key leaves out the day, so a rescheduled item moves its row, and dates a
+re-import no longer finds are deleted.
+"""
+
+import hashlib
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ImportantDate
+from .snapshots import invalidate_snapshots
+from .syllabus_extractor import MONTH_NAME, WEEKDAY_NAME
+
+# Approximate first day of each term, (month, day); week numbers count from its week
+SEMESTER_STARTS = getattr(settings, 'SYLLABUS_SEMESTER_STARTS', {
+    'spring': (1, 15),
+    'summer': (6, 1),
+    'fall': (8, 25),
+    'winter': (12, 15),
+})
+IMPORT_DESCRIPTION = 'Auto-extracted from syllabus'
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+SEMESTER_RE = re.compile(r'\b(spring|summer|fall|autumn|winter)\b', re.IGNORECASE)
+YEAR_RE = re.compile(r'\b((?:19|20)\d{2})\b')
+NUMERIC_RE = re.compile(r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?$')
+MONTH_FIRST_RE = re.compile(
+    r'(?:' + WEEKDAY_NAME + r',?\s+)?(' + MONTH_NAME + r')\s+(\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(\d{4}))?$',
+    re.IGNORECASE
+)
+DAY_FIRST_RE = re.compile(
+    r'(\d{1,2})(?:st|nd|rd|th)?\s+(' + MONTH_NAME + r')(?:,?\s+(\d{4}))?$',
+    re.IGNORECASE
+)
+WEEK_RE = re.compile(r'week\s+(\d{1,2})(?:[\s,(-]+(' + WEEKDAY_NAME + r'))?', re.IGNORECASE)
+
+# ImportantDate.date_type for each extracted type
+DATE_TYPES = {
+    'exam': 'exam',
+    'homework': 'assignment',
+    'project': 'project',
+    'quiz': 'quiz',
+    'midterm': 'midterm',
+    'final': 'final',
+}
+# Keywords that name a more specific type than their group ("Final" in exam_dates)
+KEYWORD_TYPES = {'final': 'final', 'midterm': 'midterm', 'mid-term': 'midterm'}
+# When one schedule line yields several types, the earliest here wins
+TYPE_PRIORITY = ['final', 'midterm', 'exam', 'quiz', 'project', 'assignment', 'other']
+
+
+class Semester(NamedTuple):
+    season: Optional[str]
+    year: int
+    start: Optional[date]
+
+
+def parse_semester(value: Optional[str], default_year: int) -> Semester:
+    """Season, year and approximate first day of a semester string like "Fall 2025" """
+    value = value or ''
+    season_match = SEMESTER_RE.search(value)
+    year_match = YEAR_RE.search(value)
+    season = season_match.group(1).lower() if season_match else None
+    if season == 'autumn':
+        season = 'fall'
+    year = int(year_match.group(1)) if year_match else default_year
+    start = date(year, *SEMESTER_STARTS[season]) if season in SEMESTER_STARTS else None
+    return Semester(season, year, start)
+
+
+def _full_year(value: str) -> int:
+    return 2000 + int(value) if len(value) == 2 else int(value)
+
+
+def _infer_year(month: int, semester: Semester) -> int:
+    """Year of a date written without one"""
+    # Fall and winter terms run into January
+    if semester.season in ('fall', 'winter') and month < 6:
+        return semester.year + 1
+    return semester.year
+
+
+def _make_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def parse_day(raw: str, semester: Semester) -> Optional[date]:
+    """The calendar day of one extracted date string, or None"""
+    match = NUMERIC_RE.match(raw)
+    if match:
+        month, day, year = int(match.group(1)), int(match.group(2)), match.group(3)
+        return _make_date(_full_year(year) if year else _infer_year(month, semester), month, day)
+
+    for pattern, month_group, day_group in ((MONTH_FIRST_RE, 1, 2), (DAY_FIRST_RE, 2, 1)):
+        match = pattern.match(raw)
+        if match:
+            month = MONTHS.index(match.group(month_group)[:3].lower()) + 1
+            year = match.group(3)
+            return _make_date(int(year) if year else _infer_year(month, semester), month, int(match.group(day_group)))
+
+    match = WEEK_RE.match(raw)
+    if match and semester.start:
+        # Week 1 is the week the semester starts in; a bare "Week n" means its Monday
+        monday = semester.start - timedelta(days=semester.start.weekday())
+        weekday = WEEKDAYS.index(match.group(2)[:3].lower()) if match.group(2) else 0
+        return monday + timedelta(weeks=int(match.group(1)) - 1, days=weekday)
+    return None
+
+
+def parse_schedule_date(raw: Any, semester: Semester) -> Optional[datetime]:
+    """A timezone-aware datetime for an extracted date, or None when it can't be resolved"""
+    raw = str(raw or '').strip()
+    try:
+        # ISO dates, and final_exam_date which all_important_dates stores as isoformat()
+        parsed = datetime.fromisoformat(raw)
+    except ValueError:
+        day = parse_day(raw, semester)
+        if day is None:
+            return None
+        parsed = datetime.combine(day, time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def source_key(syllabus_id: int, title: str, date_type: str, occurrence: int) -> str:
+    """
+    Stable identity of an imported date: its syllabus, title, type and which
+    occurrence of that title it is ("Lab due" every week), but not its day
+
+    The syllabus id is kept readable so a re-import can find the rest of its rows.
+    """
+    digest = hashlib.sha1(f"{title.lower()}|{date_type}|{occurrence}".encode('utf-8')).hexdigest()
+    return f"{syllabus_id}:{digest[:24]}"
+
+
+def key_prefix(syllabus_id: int) -> str:
+    return f"{syllabus_id}:"
+
+
+def normalize_dates(extraction, default_year: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    The extraction's dates as ImportantDate values, one per schedule line and day
+
+    Returns:
+        list of {'title', 'date_type', 'due_date', 'source_key'} in date
+        order; dates that can't be resolved are left out
+    """
+    semester = parse_semester(extraction.semester, default_year or timezone.now().year)
+    items: Dict[tuple, Dict[str, Any]] = {}
+    for entry in extraction.all_important_dates:
+        due_date = parse_schedule_date(entry.get('date'), semester)
+        if due_date is None:
+            continue
+        # "label" is the schedule line ("Homework 1 due"); older extractions only have the keyword
+        title = (entry.get('label') or entry.get('title') or 'Important date').strip()[:200]
+        date_type = (
+            KEYWORD_TYPES.get(str(entry.get('title', '')).lower())
+            or DATE_TYPES.get(entry.get('type'), 'other')
+        )
+        line = (title.lower(), timezone.localtime(due_date).date())
+        current = items.get(line)
+        if current is None or TYPE_PRIORITY.index(date_type) < TYPE_PRIORITY.index(current['date_type']):
+            items[line] = {'title': title, 'date_type': date_type, 'due_date': due_date}
+
+    ordered = sorted(items.values(), key=lambda item: (item['due_date'], item['title']))
+    occurrences: Dict[tuple, int] = {}
+    for item in ordered:
+        label = (item['title'].lower(), item['date_type'])
+        occurrences[label] = occurrences.get(label, 0) + 1
+        item['source_key'] = source_key(extraction.syllabus_id, item['title'], item['date_type'], occurrences[label])
+    return ordered
+
+
+def import_important_dates(syllabus) -> List[ImportantDate]:
+    """
+    Upsert a syllabus extraction's dates into its portfolio in one statement
+
+    Rows are matched on (portfolio, source_key): a re-import refreshes the
+    title, type and time of dates it created before, deletes the ones the
+    syllabus no longer lists and leaves dates added by hand untouched.
+    """
+    items = normalize_dates(syllabus.extraction, syllabus.uploaded_at.year if syllabus.uploaded_at else None)
+    dates: List[ImportantDate] = []
+    with transaction.atomic():
+        removed, _ = ImportantDate.objects.filter(
+            portfolio_id=syllabus.portfolio_id, source_key__startswith=key_prefix(syllabus.pk)
+        ).exclude(source_key__in=[item['source_key'] for item in items]).delete()
+        if items:
+            dates = ImportantDate.objects.bulk_create(
+                [
+                    ImportantDate(portfolio_id=syllabus.portfolio_id, description=IMPORT_DESCRIPTION, **item)
+                    for item in items
+                ],
+                update_conflicts=True,
+                unique_fields=['portfolio', 'source_key'],
+                update_fields=['title', 'date_type', 'due_date', 'description', 'updated_at'],
+            )
+    if items or removed:
+        # bulk_create sends no post_save, so the snapshot invalidation signal is replaced here
+        invalidate_snapshots(syllabus.portfolio_id)
+    return dates
@@ -1,539 +1,445 @@
 import re
-import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Every pattern is compiled once per process; extraction never hands a string pattern to re
+DATE_PATTERNS = [
+    re.compile(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}\b'),
+    re.compile(r'\b\d{1,2}(?:st|nd|rd|th)?\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b'),
+    re.compile(r'\b\d{1,2}/\d{1,2}/\d{2,4}\b'),
+    re.compile(r'\b\d{4}-\d{2}-\d{2}\b'),
+    re.compile(r'\b(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday),?\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}\b'),
+]
+
+TIME_PATTERNS = [
+    re.compile(r'\b\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)\b'),
+    re.compile(r'\b\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)\b'),
+    re.compile(r'\b\d{1,2}:\d{2}\s*to\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)\b'),
+]
+
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_RE = re.compile(r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b')
+URL_RE = re.compile(r'https?://[^\s]+')
+NUMERIC_DATE_RE = re.compile(r'(\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2})')
+SLASH_DATE_RE = re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}')
+# Dates on schedule lines: numeric, month-name, or relative to the semester ("Week 5 Friday")
+MONTH_NAME = (
+    r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?'
+    r'|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?'
+)
+WEEKDAY_NAME = (
+    r'(?:Mon(?:day)?|Tue(?:s(?:day)?)?|Wed(?:nesday)?|Thu(?:r(?:s(?:day)?)?)?'
+    r'|Fri(?:day)?|Sat(?:urday)?|Sun(?:day)?)\.?'
+)
+SCHEDULE_DATE_RE = re.compile(
+    r'\b(?:'
+    r'\d{4}-\d{2}-\d{2}'
+    r'|\d{1,2}/\d{1,2}(?:/\d{2,4})?'
+    r'|(?:' + WEEKDAY_NAME + r',?\s+)?' + MONTH_NAME + r'\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?'
+    r'|\d{1,2}(?:st|nd|rd|th)?\s+' + MONTH_NAME + r'(?:,?\s+\d{4})?'
+    r'|week\s+\d{1,2}(?:[\s,(-]+' + WEEKDAY_NAME + r')?'
+    r')(?![\w/])',
+    re.IGNORECASE
+)
+CLASS_TIME_RE = re.compile(r'\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)')
+
+# "Label:" with up to four words before the colon; every trailing run of words is indexed as a label
+LABEL_RE = re.compile(r'\b([A-Za-z][A-Za-z-]*(?:[ \t]+[A-Za-z][A-Za-z-]*){0,3})[ \t]*:')
+# Each line up to its last colon
+COLON_LINE_RE = re.compile(r'^[^\n]*:', re.MULTILINE)
+
+# Value read from just after a label's colon
+LINE_VALUE_RE = re.compile(r'\s*([^\n]+)')
+PARAGRAPH_VALUE_RE = re.compile(r'\s*([^\n]+(?:\n(?!\n)[^\n]+)*)')
+NUMBER_VALUE_RE = re.compile(r'\s*(\d+)')
+COURSE_CODE_VALUE_RE = re.compile(r'\s*([A-Z]{2,4}\s*\d{3,4})', re.IGNORECASE)
+
+# Fallbacks when no label is present
+TITLE_LINE_RE = re.compile(r'^([A-Z][^:\n]{10,100})$', re.IGNORECASE | re.MULTILINE)
+COURSE_CODE_RE = re.compile(r'\b([A-Z]{2,4}\s*\d{3,4})\b', re.IGNORECASE)
+CREDITS_RE = re.compile(r'(\d+)\s*credits?', re.IGNORECASE)
+DR_NAME_RE = re.compile(r'Dr\.\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', re.IGNORECASE)
+PROFESSOR_NAME_RE = re.compile(r'Professor\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', re.IGNORECASE)
+CLASS_DAYS_RE = re.compile(r'\b(?:MWF|TTh|MTWThF|MW|TThF)\b', re.IGNORECASE)
+SEMESTER_RE = re.compile(r'(?:Fall|Spring|Summer|Winter)\s+\d{4}', re.IGNORECASE)
+FINAL_EXAM_RE = re.compile(r'final\s+exam[^:\n]*:\s*([^\n]+)', re.IGNORECASE)
+GRADE_BREAKDOWN_RE = re.compile(r'\b(\w+)\s*([:=])\s*(\d+)%')
+
+# Dated-item keywords by extraction field; a keyword also matches longer words it starts ("quizzes", "reports")
+DATE_KEYWORDS = {
+    'exam_dates': ('exam', ['exam', 'test', 'midterm', 'final']),
+    'homework_dates': ('homework', ['homework', 'assignment', 'hw', 'due']),
+    'project_dates': ('project', ['project', 'presentation', 'report']),
+    'quiz_dates': ('quiz', ['quiz', 'quizzes']),
+    'midterm_dates': ('midterm', ['midterm', 'mid-term']),
+}
+ALL_DATE_KEYWORDS = sorted({keyword for _, keywords in DATE_KEYWORDS.values() for keyword in keywords})
+DATE_KEYWORD_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(keyword) for keyword in ALL_DATE_KEYWORDS) + r')\w*',
+    re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=1024)
+def keywords_starting(word: str) -> Tuple[str, ...]:
+    """Dated-item keywords that a lower-cased word starts with"""
+    return tuple(keyword for keyword in ALL_DATE_KEYWORDS if word.startswith(keyword))
+
+
+CONFIDENCE_ELEMENTS = [
+    'course', 'instructor', 'professor', 'syllabus', 'schedule',
+    'grading', 'exam', 'homework', 'assignment', 'textbook'
+]
+CONFIDENCE_LABELS = ['course', 'instructor', 'grading', 'schedule']
+
+
+class SyllabusDocument:
+    """
+    A syllabus scanned once into sections
+
+    labels maps every lower-cased "Label:" (and each trailing part of a
+    multi-word label, so "Office Hours:" also counts as "Hours:") to the
+    offsets just after its colons. keyword_hits maps each dated-item keyword
+    to (label, value) for every line where it precedes a colon: the text
+    before that colon and the text after it. Field
+    extractors read values from these offsets instead of rescanning the text.
+    """
+
+    __slots__ = ('text', 'labels', 'keyword_hits', '_lower')
+
+    def __init__(self, text: str):
+        self.text = text
+        self._lower = None
+        self.labels: Dict[str, List[int]] = {}
+        self.keyword_hits: Dict[str, List[Tuple[str, str]]] = {}
+        self._index_labels()
+        self._index_keywords()
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    def _index_labels(self):
+        labels = self.labels
+        for match in LABEL_RE.finditer(self.text):
+            words = match.group(1).lower().split()
+            for start in range(len(words)):
+                labels.setdefault(' '.join(words[start:]), []).append(match.end())
+
+    def _index_keywords(self):
+        text = self.text
+        hits = self.keyword_hits
+        for line in COLON_LINE_RE.finditer(text):
+            seen = set()
+            # Only words before the line's last colon can label a value
+            for match in DATE_KEYWORD_RE.finditer(text, line.start(), line.end()):
+                for keyword in keywords_starting(match.group(0).lower()):
+                    # One hit per keyword per line, from its first occurrence
+                    if keyword not in seen:
+                        seen.add(keyword)
+                        colon = text.find(':', match.end())
+                        value = LINE_VALUE_RE.match(text, colon + 1)
+                        if value:
+                            label = text[line.start():colon].strip()
+                            hits.setdefault(keyword, []).append((label, value.group(1)))
+
+    def positions(self, *labels: str) -> List[int]:
+        """Offsets after the colons of any of the labels, in document order"""
+        if len(labels) == 1:
+            return self.labels.get(labels[0], [])
+        return sorted(offset for label in labels for offset in self.labels.get(label, []))
+
+    def value(self, labels, pattern=LINE_VALUE_RE) -> Optional[str]:
+        """
+        First value of the first label that has one
+
+        labels is tried in order, like a list of alternative patterns;
+        pattern reads the value starting right after the colon.
+        """
+        for label in labels:
+            for offset in self.labels.get(label, ()):
+                match = pattern.match(self.text, offset)
+                if match:
+                    return match.group(1).strip()
+        return None
+
+
 class SyllabusExtractor:
     """
     AI-powered syllabus extraction service
     Extracts structured data from syllabus text using pattern matching and NLP techniques
     """
-    
+
     def __init__(self):
-        self.date_patterns = [
-            r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}\b',
-            r'\b\d{1,2}(?:st|nd|rd|th)?\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b',
-            r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',
-            r'\b\d{4}-\d{2}-\d{2}\b',
-            r'\b(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday),?\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}\b'
-        ]
-        
-        self.time_patterns = [
-            r'\b\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)\b',
-            r'\b\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)\b',
-            r'\b\d{1,2}:\d{2}\s*to\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)\b'
-        ]
-        
-        self.email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        self.phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b'
-        
+        self.date_patterns = DATE_PATTERNS
+        self.time_patterns = TIME_PATTERNS
+        self.email_pattern = EMAIL_RE
+        self.phone_pattern = PHONE_RE
+
     def extract_from_text(self, text: str) -> Dict[str, Any]:
         """
         Extract structured data from syllabus text
         """
         try:
+            doc = SyllabusDocument(text)
             extraction_data = {
-                'course_title': self._extract_course_title(text),
-                'course_code': self._extract_course_code(text),
-                'course_description': self._extract_course_description(text),
-                'credits': self._extract_credits(text),
-                'prerequisites': self._extract_prerequisites(text),
-                
-                'professor_name': self._extract_professor_name(text),
-                'professor_email': self._extract_professor_email(text),
-                'professor_office': self._extract_professor_office(text),
-                'professor_office_hours': self._extract_office_hours(text),
-                'professor_phone': self._extract_professor_phone(text),
-                
-                'class_days': self._extract_class_days(text),
-                'class_time': self._extract_class_time(text),
-                'class_location': self._extract_class_location(text),
-                'semester': self._extract_semester(text),
-                
-                'exam_dates': self._extract_exam_dates(text),
-                'homework_dates': self._extract_homework_dates(text),
-                'project_dates': self._extract_project_dates(text),
-                'quiz_dates': self._extract_quiz_dates(text),
-                'final_exam_date': self._extract_final_exam_date(text),
-                'midterm_dates': self._extract_midterm_dates(text),
-                
-                'grading_scale': self._extract_grading_scale(text),
-                'grade_breakdown': self._extract_grade_breakdown(text),
-                'late_policy': self._extract_late_policy(text),
-                'attendance_policy': self._extract_attendance_policy(text),
-                
-                'academic_integrity': self._extract_academic_integrity(text),
-                'disability_accommodations': self._extract_disability_accommodations(text),
-                'course_objectives': self._extract_course_objectives(text),
-                
-                'textbook_required': self._extract_required_textbooks(text),
-                'textbook_recommended': self._extract_recommended_textbooks(text),
-                'course_website': self._extract_course_website(text),
-                'additional_resources': self._extract_additional_resources(text),
-                
-                'extraction_confidence': self._calculate_confidence(text),
+                'course_title': self._extract_course_title(doc),
+                'course_code': self._extract_course_code(doc),
+                'course_description': self._extract_course_description(doc),
+                'credits': self._extract_credits(doc),
+                'prerequisites': self._extract_prerequisites(doc),
+
+                'professor_name': self._extract_professor_name(doc),
+                'professor_email': self._extract_professor_email(doc),
+                'professor_office': self._extract_professor_office(doc),
+                'professor_office_hours': self._extract_office_hours(doc),
+                'professor_phone': self._extract_professor_phone(doc),
+
+                'class_days': self._extract_class_days(doc),
+                'class_time': self._extract_class_time(doc),
+                'class_location': self._extract_class_location(doc),
+                'semester': self._extract_semester(doc),
+
+                **self._extract_keyword_dates(doc),
+                'final_exam_date': self._extract_final_exam_date(doc),
+
+                'grading_scale': self._extract_grading_scale(doc),
+                'grade_breakdown': self._extract_grade_breakdown(doc),
+                'late_policy': self._extract_late_policy(doc),
+                'attendance_policy': self._extract_attendance_policy(doc),
+
+                'academic_integrity': self._extract_academic_integrity(doc),
+                'disability_accommodations': self._extract_disability_accommodations(doc),
+                'course_objectives': self._extract_course_objectives(doc),
+
+                'textbook_required': self._extract_required_textbooks(doc),
+                'textbook_recommended': self._extract_recommended_textbooks(doc),
+                'course_website': self._extract_course_website(doc),
+                'additional_resources': self._extract_additional_resources(doc),
+
+                'extraction_confidence': self._calculate_confidence(doc),
                 'extraction_method': 'ai_extraction'
             }
-            
+
             return extraction_data
-            
+
         except Exception as e:
             logger.error(f"Syllabus extraction failed: {str(e)}")
             return {'extraction_error': str(e), 'extraction_confidence': 0.0}
-    
-    def _extract_course_title(self, text: str) -> str:
+
+    def _extract_course_title(self, doc: SyllabusDocument) -> str:
         """Extract course title"""
-        patterns = [
-            r'Course Title:\s*([^\n]+)',
-            r'Title:\s*([^\n]+)',
-            r'^([A-Z][^:\n]{10,100})$',  # Lines that look like titles
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_course_code(self, text: str) -> str:
+        title = doc.value(['course title', 'title'])
+        if title is not None:
+            return title
+        # Lines that look like titles
+        match = TITLE_LINE_RE.search(doc.text)
+        return match.group(1).strip() if match else ""
+
+    def _extract_course_code(self, doc: SyllabusDocument) -> str:
         """Extract course code (e.g., CS101, MATH 201)"""
-        patterns = [
-            r'Course Code:\s*([A-Z]{2,4}\s*\d{3,4})',
-            r'Course Number:\s*([A-Z]{2,4}\s*\d{3,4})',
-            r'\b([A-Z]{2,4}\s*\d{3,4})\b',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_course_description(self, text: str) -> str:
+        code = doc.value(['course code', 'course number'], COURSE_CODE_VALUE_RE)
+        if code is not None:
+            return code
+        match = COURSE_CODE_RE.search(doc.text)
+        return match.group(1).strip() if match else ""
+
+    def _extract_course_description(self, doc: SyllabusDocument) -> str:
         """Extract course description"""
-        patterns = [
-            r'Course Description:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Description:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Overview:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_credits(self, text: str) -> Optional[int]:
+        return doc.value(['course description', 'description', 'overview'], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_credits(self, doc: SyllabusDocument) -> Optional[int]:
         """Extract credit hours"""
-        patterns = [
-            r'Credits?:\s*(\d+)',
-            r'Credit Hours?:\s*(\d+)',
-            r'(\d+)\s*credits?',
-            r'(\d+)\s*credit hours?',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        return None
-    
-    def _extract_prerequisites(self, text: str) -> str:
+        credits = doc.value(['credits', 'credit', 'credit hours', 'credit hour'], NUMBER_VALUE_RE)
+        if credits is not None:
+            return int(credits)
+        match = CREDITS_RE.search(doc.text)
+        return int(match.group(1)) if match else None
+
+    def _extract_prerequisites(self, doc: SyllabusDocument) -> str:
         """Extract prerequisites"""
-        patterns = [
-            r'Prerequisites?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Prereq:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_professor_name(self, text: str) -> str:
+        return doc.value(['prerequisites', 'prerequisite', 'prereq'], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_professor_name(self, doc: SyllabusDocument) -> str:
         """Extract professor name"""
-        patterns = [
-            r'Instructor:\s*([^\n]+)',
-            r'Professor:\s*([^\n]+)',
-            r'Faculty:\s*([^\n]+)',
-            r'Dr\.\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            r'Professor\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        name = doc.value(['instructor', 'professor', 'faculty'])
+        if name is not None:
+            return name
+        for pattern in (DR_NAME_RE, PROFESSOR_NAME_RE):
+            match = pattern.search(doc.text)
             if match:
                 return match.group(1).strip()
         return ""
-    
-    def _extract_professor_email(self, text: str) -> str:
+
+    def _extract_professor_email(self, doc: SyllabusDocument) -> str:
         """Extract professor email"""
-        emails = re.findall(self.email_pattern, text)
-        # Look for emails near instructor/professor sections
-        instructor_section = re.search(r'(?:Instructor|Professor|Faculty):[^@]*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})', text, re.IGNORECASE)
-        if instructor_section:
-            return instructor_section.group(1)
-        return emails[0] if emails else ""
-    
-    def _extract_professor_office(self, text: str) -> str:
+        # Prefer the first email after an instructor/professor label, before any other address
+        for offset in doc.positions('instructor', 'professor', 'faculty'):
+            at = doc.text.find('@', offset)
+            if at == -1:
+                break
+            for match in EMAIL_RE.finditer(doc.text, offset):
+                if match.end() > at:
+                    if match.start() <= at:
+                        return match.group(0)
+                    break
+        match = EMAIL_RE.search(doc.text)
+        return match.group(0) if match else ""
+
+    def _extract_professor_office(self, doc: SyllabusDocument) -> str:
         """Extract professor office location"""
-        patterns = [
-            r'Office:\s*([^\n]+)',
-            r'Office Location:\s*([^\n]+)',
-            r'Room:\s*([^\n]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_office_hours(self, text: str) -> str:
+        return doc.value(['office', 'office location', 'room']) or ""
+
+    def _extract_office_hours(self, doc: SyllabusDocument) -> str:
         """Extract office hours"""
-        patterns = [
-            r'Office Hours?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Hours?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_professor_phone(self, text: str) -> str:
+        return doc.value(['office hours', 'office hour', 'hours', 'hour'], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_professor_phone(self, doc: SyllabusDocument) -> str:
         """Extract professor phone number"""
-        phones = re.findall(self.phone_pattern, text)
-        return phones[0] if phones else ""
-    
-    def _extract_class_days(self, text: str) -> str:
+        match = PHONE_RE.search(doc.text)
+        return match.group(0) if match else ""
+
+    def _extract_class_days(self, doc: SyllabusDocument) -> str:
         """Extract class meeting days"""
-        patterns = [
-            r'Days?:\s*([^\n]+)',
-            r'Meeting Days?:\s*([^\n]+)',
-            r'(?:MWF|TTh|MTWThF|MW|TThF)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_class_time(self, text: str) -> str:
+        days = doc.value(['days', 'day', 'meeting days', 'meeting day'])
+        if days is not None:
+            return days
+        match = CLASS_DAYS_RE.search(doc.text)
+        return match.group(0) if match else ""
+
+    def _extract_class_time(self, doc: SyllabusDocument) -> str:
         """Extract class meeting time"""
-        times = re.findall(r'\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)', text)
-        return times[0] if times else ""
-    
-    def _extract_class_location(self, text: str) -> str:
+        match = CLASS_TIME_RE.search(doc.text)
+        return match.group(0) if match else ""
+
+    def _extract_class_location(self, doc: SyllabusDocument) -> str:
         """Extract class location"""
-        patterns = [
-            r'Location:\s*([^\n]+)',
-            r'Room:\s*([^\n]+)',
-            r'Building:\s*([^\n]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_semester(self, text: str) -> str:
+        return doc.value(['location', 'room', 'building']) or ""
+
+    def _extract_semester(self, doc: SyllabusDocument) -> str:
         """Extract semester information"""
-        patterns = [
-            r'Semester:\s*([^\n]+)',
-            r'Term:\s*([^\n]+)',
-            r'(?:Fall|Spring|Summer|Winter)\s+\d{4}',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_exam_dates(self, text: str) -> List[Dict]:
-        """Extract exam dates"""
-        exam_keywords = ['exam', 'test', 'midterm', 'final']
-        dates = []
-        
-        for keyword in exam_keywords:
-            pattern = rf'\b{keyword}[^:\n]*:\s*([^\n]+)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2})', match)
-                if date_match:
-                    dates.append({
-                        'title': f"{keyword.title()}",
-                        'date': date_match.group(1),
-                        'type': 'exam'
-                    })
-        
-        return dates
-    
-    def _extract_homework_dates(self, text: str) -> List[Dict]:
-        """Extract homework due dates"""
-        homework_keywords = ['homework', 'assignment', 'hw', 'due']
-        dates = []
-        
-        for keyword in homework_keywords:
-            pattern = rf'\b{keyword}[^:\n]*:\s*([^\n]+)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2})', match)
-                if date_match:
-                    dates.append({
-                        'title': f"{keyword.title()}",
-                        'date': date_match.group(1),
-                        'type': 'homework'
-                    })
-        
-        return dates
-    
-    def _extract_project_dates(self, text: str) -> List[Dict]:
-        """Extract project due dates"""
-        project_keywords = ['project', 'presentation', 'report']
-        dates = []
-        
-        for keyword in project_keywords:
-            pattern = rf'\b{keyword}[^:\n]*:\s*([^\n]+)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2})', match)
-                if date_match:
-                    dates.append({
-                        'title': f"{keyword.title()}",
-                        'date': date_match.group(1),
-                        'type': 'project'
-                    })
-        
-        return dates
-    
-    def _extract_quiz_dates(self, text: str) -> List[Dict]:
-        """Extract quiz dates"""
-        quiz_keywords = ['quiz', 'quizzes']
-        dates = []
-        
-        for keyword in quiz_keywords:
-            pattern = rf'\b{keyword}[^:\n]*:\s*([^\n]+)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2})', match)
-                if date_match:
-                    dates.append({
-                        'title': f"{keyword.title()}",
-                        'date': date_match.group(1),
-                        'type': 'quiz'
-                    })
-        
-        return dates
-    
-    def _extract_final_exam_date(self, text: str) -> Optional[datetime]:
+        semester = doc.value(['semester', 'term'])
+        if semester is not None:
+            return semester
+        match = SEMESTER_RE.search(doc.text)
+        return match.group(0) if match else ""
+
+    def _extract_keyword_dates(self, doc: SyllabusDocument) -> Dict[str, List[Dict]]:
+        """
+        Exam, homework, project, quiz and midterm dates from the lines that name them
+
+        Dates are kept as written ("10/15/2025", "Oct 15", "Week 5 Friday");
+        syllabus_dates resolves them against the semester when they are imported.
+        """
+        extracted = {}
+        for field, (date_type, keywords) in DATE_KEYWORDS.items():
+            dates = []
+            for keyword in keywords:
+                for label, value in doc.keyword_hits.get(keyword, ()):
+                    date_match = SCHEDULE_DATE_RE.search(value)
+                    if date_match:
+                        dates.append({
+                            'title': keyword.title(),
+                            'label': label,
+                            'date': date_match.group(0),
+                            'type': date_type
+                        })
+            extracted[field] = dates
+        return extracted
+
+    def _extract_final_exam_date(self, doc: SyllabusDocument) -> Optional[datetime]:
         """Extract final exam date"""
-        pattern = r'final\s+exam[^:\n]*:\s*([^\n]+)'
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = FINAL_EXAM_RE.search(doc.text)
         if match:
-            date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2})', match.group(1))
+            date_match = NUMERIC_DATE_RE.search(match.group(1))
             if date_match:
-                try:
-                    return datetime.strptime(date_match.group(1), '%m/%d/%Y')
-                except ValueError:
+                for date_format in ('%m/%d/%Y', '%Y-%m-%d'):
                     try:
-                        return datetime.strptime(date_match.group(1), '%Y-%m-%d')
+                        return datetime.strptime(date_match.group(1), date_format)
                     except ValueError:
                         pass
         return None
-    
-    def _extract_midterm_dates(self, text: str) -> List[Dict]:
-        """Extract midterm dates"""
-        midterm_keywords = ['midterm', 'mid-term']
-        dates = []
-        
-        for keyword in midterm_keywords:
-            pattern = rf'\b{keyword}[^:\n]*:\s*([^\n]+)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2})', match)
-                if date_match:
-                    dates.append({
-                        'title': f"{keyword.title()}",
-                        'date': date_match.group(1),
-                        'type': 'midterm'
-                    })
-        
-        return dates
-    
-    def _extract_grading_scale(self, text: str) -> str:
+
+    def _extract_grading_scale(self, doc: SyllabusDocument) -> str:
         """Extract grading scale"""
-        patterns = [
-            r'Grading Scale:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Grade Scale:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_grade_breakdown(self, text: str) -> Dict[str, int]:
+        return doc.value(['grading scale', 'grade scale'], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_grade_breakdown(self, doc: SyllabusDocument) -> Dict[str, int]:
         """Extract grade breakdown percentages"""
-        breakdown = {}
-        patterns = [
-            r'(\w+)\s*:\s*(\d+)%',
-            r'(\w+)\s*=\s*(\d+)%',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                breakdown[match[0].lower()] = int(match[1])
-        
-        return breakdown
-    
-    def _extract_late_policy(self, text: str) -> str:
+        colon_items, equals_items = [], []
+        for name, separator, percent in GRADE_BREAKDOWN_RE.findall(doc.text):
+            (colon_items if separator == ':' else equals_items).append((name.lower(), int(percent)))
+        # "Name: n%" entries first, then "Name = n%", so the later form wins on duplicates
+        return dict(colon_items + equals_items)
+
+    def _extract_late_policy(self, doc: SyllabusDocument) -> str:
         """Extract late submission policy"""
-        patterns = [
-            r'Late Policy:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Late Work:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_attendance_policy(self, text: str) -> str:
+        return doc.value(['late policy', 'late work'], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_attendance_policy(self, doc: SyllabusDocument) -> str:
         """Extract attendance policy"""
-        patterns = [
-            r'Attendance Policy:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Attendance:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_academic_integrity(self, text: str) -> str:
+        return doc.value(['attendance policy', 'attendance'], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_academic_integrity(self, doc: SyllabusDocument) -> str:
         """Extract academic integrity policy"""
-        patterns = [
-            r'Academic Integrity:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Honor Code:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_disability_accommodations(self, text: str) -> str:
+        return doc.value(['academic integrity', 'honor code'], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_disability_accommodations(self, doc: SyllabusDocument) -> str:
         """Extract disability accommodations policy"""
-        patterns = [
-            r'Disability Accommodations?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Accommodations?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_course_objectives(self, text: str) -> str:
+        return doc.value([
+            'disability accommodations', 'disability accommodation', 'accommodations', 'accommodation'
+        ], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_course_objectives(self, doc: SyllabusDocument) -> str:
         """Extract course objectives"""
-        patterns = [
-            r'Course Objectives?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Learning Objectives?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Objectives?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_required_textbooks(self, text: str) -> str:
+        return doc.value([
+            'course objectives', 'course objective', 'learning objectives', 'learning objective',
+            'objectives', 'objective'
+        ], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_required_textbooks(self, doc: SyllabusDocument) -> str:
         """Extract required textbooks"""
-        patterns = [
-            r'Required Textbooks?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Textbooks?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_recommended_textbooks(self, text: str) -> str:
+        return doc.value(['required textbooks', 'required textbook', 'textbooks', 'textbook'], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_recommended_textbooks(self, doc: SyllabusDocument) -> str:
         """Extract recommended textbooks"""
-        patterns = [
-            r'Recommended Textbooks?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Optional Textbooks?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _extract_course_website(self, text: str) -> str:
+        return doc.value([
+            'recommended textbooks', 'recommended textbook', 'optional textbooks', 'optional textbook'
+        ], PARAGRAPH_VALUE_RE) or ""
+
+    def _extract_course_website(self, doc: SyllabusDocument) -> str:
         """Extract course website URL"""
-        url_pattern = r'https?://[^\s]+'
-        urls = re.findall(url_pattern, text)
-        return urls[0] if urls else ""
-    
-    def _extract_additional_resources(self, text: str) -> str:
+        match = URL_RE.search(doc.text)
+        return match.group(0) if match else ""
+
+    def _extract_additional_resources(self, doc: SyllabusDocument) -> str:
         """Extract additional resources"""
-        patterns = [
-            r'Additional Resources?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-            r'Resources?:\s*([^\n]+(?:\n(?!\n)[^\n]+)*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return ""
-    
-    def _calculate_confidence(self, text: str) -> float:
+        return doc.value([
+            'additional resources', 'additional resource', 'resources', 'resource'
+        ], PARAGRAPH_VALUE_RE) or ""
+
+    def _calculate_confidence(self, doc: SyllabusDocument) -> float:
         """Calculate extraction confidence based on found patterns"""
         confidence = 0.0
-        total_patterns = 20  # Number of extraction methods
-        
+
         # Check for key syllabus elements
-        key_elements = [
-            'course', 'instructor', 'professor', 'syllabus', 'schedule',
-            'grading', 'exam', 'homework', 'assignment', 'textbook'
-        ]
-        
-        found_elements = sum(1 for element in key_elements if element.lower() in text.lower())
-        confidence += (found_elements / len(key_elements)) * 0.5
-        
+        lower = doc.lower
+        found_elements = sum(1 for element in CONFIDENCE_ELEMENTS if element in lower)
+        confidence += (found_elements / len(CONFIDENCE_ELEMENTS)) * 0.5
+
         # Check for structured formatting
-        if re.search(r'Course\s*:', text, re.IGNORECASE):
-            confidence += 0.1
-        if re.search(r'Instructor\s*:', text, re.IGNORECASE):
-            confidence += 0.1
-        if re.search(r'Grading\s*:', text, re.IGNORECASE):
-            confidence += 0.1
-        if re.search(r'Schedule\s*:', text, re.IGNORECASE):
-            confidence += 0.1
-        
+        for label in CONFIDENCE_LABELS:
+            if label in doc.labels:
+                confidence += 0.1
+
         # Check for dates
-        if re.search(r'\d{1,2}/\d{1,2}/\d{2,4}', text):
+        if SLASH_DATE_RE.search(doc.text):
             confidence += 0.1
-        
+
         return min(confidence, 1.0)
@@ -0,0 +1,152 @@
+"""
+Portfolio tag helpers for HackWestTX Class Portfolio
+Normalizes free-form tags, mirrors them into PortfolioTag rows and keeps the
+TagCount popularity/trending table up to date
+"""
+
+import math
+import re
+from datetime import datetime, timezone as dt_timezone
+from typing import Iterable, List, Set, Tuple, Union
+
+from django.conf import settings
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from .models import ClassPortfolio, PortfolioTag, TagCount
+
+MAX_TAG_LENGTH = 50
+MAX_TAGS_PER_PORTFOLIO = 20
+
+# Trending scores halve every TRENDING_HALF_LIFE_DAYS
+TRENDING_HALF_LIFE_DAYS = getattr(settings, 'TRENDING_HALF_LIFE_DAYS', 7)
+_TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+_SEPARATOR_RE = re.compile(r'[\s_]+')
+
+
+def normalize_tag(tag) -> str:
+    """'Exam Prep ' -> 'exam-prep'"""
+    return _SEPARATOR_RE.sub('-', str(tag).strip().lower())[:MAX_TAG_LENGTH].strip('-')
+
+
+def normalize_tags(tags: Union[str, Iterable, None]) -> List[str]:
+    """Normalize, de-duplicate and cap a tag list (a comma-separated string is accepted too)"""
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+
+    normalized = []
+    for tag in tags:
+        tag = normalize_tag(tag)
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized[:MAX_TAGS_PER_PORTFOLIO]
+
+
+def sync_portfolio_tags(portfolio) -> Tuple[Set[str], Set[str]]:
+    """
+    Bring the PortfolioTag rows in line with portfolio.tags
+
+    Returns:
+        (added, removed) tag name sets
+    """
+    wanted = set(normalize_tags(portfolio.tags))
+    existing = set(PortfolioTag.objects.filter(portfolio=portfolio).values_list('name', flat=True))
+
+    added = wanted - existing
+    removed = existing - wanted
+    if removed:
+        PortfolioTag.objects.filter(portfolio=portfolio, name__in=removed).delete()
+    if added:
+        PortfolioTag.objects.bulk_create(
+            [PortfolioTag(portfolio=portfolio, name=name) for name in added],
+            ignore_conflicts=True
+        )
+    adjust_tag_counts('tag', added, removed)
+    return added, removed
+
+
+# ---------------------------------------------------------------------------
+# TagCount maintenance
+# ---------------------------------------------------------------------------
+#
+# Each addition of a tag contributes exp(rate * (t - epoch)) to its trending
+# score, which is stored as a logarithm so it never overflows. Decaying every
+# row by the same factor doesn't change their order, so "top trending now" is
+# a plain ORDER BY on the stored value and no periodic decay job is needed.
+
+def _decay_rate() -> float:
+    return math.log(2) / (TRENDING_HALF_LIFE_DAYS * 86400)
+
+
+def trending_value(when=None) -> float:
+    """Log-space weight of one addition at `when` (defaults to now)"""
+    when = when or timezone.now()
+    return (when - _TRENDING_EPOCH).total_seconds() * _decay_rate()
+
+
+def current_trending_score(log_score) -> float:
+    """Decayed number of recent additions, as of now"""
+    if log_score is None:
+        return 0.0
+    return math.exp(log_score - trending_value())
+
+
+def adjust_tag_counts(kind: str, added: Iterable[str] = (), removed: Iterable[str] = (), when=None) -> None:
+    """Increment counts for added names and decrement them for removed names"""
+    added = [name[:100] for name in added if name]
+    removed = [name[:100] for name in removed if name]
+
+    if added:
+        TagCount.objects.bulk_create(
+            [TagCount(kind=kind, name=name) for name in added],
+            ignore_conflicts=True
+        )
+        value = Value(trending_value(when))
+        # log(exp(a) + exp(b)) = max(a, b) + log(1 + exp(-|a - b|)), computed in the UPDATE itself
+        log_add = Greatest(F('trending_score'), value) + Ln(
+            Value(1.0) + Exp(-Abs(F('trending_score') - value))
+        )
+        TagCount.objects.filter(kind=kind, name__in=added).update(
+            portfolio_count=F('portfolio_count') + 1,
+            trending_score=Case(
+                When(trending_score__isnull=True, then=value),
+                default=log_add,
+                output_field=FloatField()
+            ),
+            updated_at=timezone.now()
+        )
+
+    if removed:
+        TagCount.objects.filter(kind=kind, name__in=removed, portfolio_count__gt=0).update(
+            portfolio_count=F('portfolio_count') - 1,
+            updated_at=timezone.now()
+        )
+
+
+def rebuild_tag_counts() -> int:
+    """Recompute TagCount from scratch, returning the number of rows written"""
+    TagCount.objects.all().delete()
+    counts = {}
+    rows = ClassPortfolio.objects.values_list('professor', 'tags', 'created_at').iterator(chunk_size=1000)
+    for professor, tags, created_at in rows:
+        value = trending_value(created_at)
+        names = [('professor', professor)] + [('tag', tag) for tag in normalize_tags(tags)]
+        for kind, name in names:
+            if not name:
+                continue
+            count, score = counts.get((kind, name[:100]), (0, None))
+            score = value if score is None else max(score, value) + math.log1p(math.exp(-abs(score - value)))
+            counts[(kind, name[:100])] = (count + 1, score)
+
+    TagCount.objects.bulk_create(
+        [
+            TagCount(kind=kind, name=name, portfolio_count=count, trending_score=score)
+            for (kind, name), (count, score) in counts.items()
+        ],
+        batch_size=1000
+    )
+    return len(counts)
@@ -0,0 +1,77 @@
+"""
+Background tasks for HackWestTX Class Portfolio
+Handlers registered with the job queue (see api.jobs); payloads are plain JSON
+"""
+
+import logging
+
+from django.utils import timezone
+
+from .file_processor import FileProcessor
+from .jobs import PermanentJobError, task
+from .models import ClassPortfolio, ProcessedFile, Quiz
+from .quiz_scoring import REGRADE_TASK, regrade_quiz
+from .snapshots import REBUILD_TASK, rebuild_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+def _mark_file_failed(error, file_id, **kwargs):
+    ProcessedFile.objects.filter(id=file_id).update(
+        processing_status='failed',
+        processing_error=error,
+        processed_at=timezone.now()
+    )
+
+
+@task('process_file', on_failure=_mark_file_failed)
+def process_file(file_id, **kwargs):
+    """Extract text from an uploaded file and summarize it"""
+    try:
+        processed_file = ProcessedFile.objects.get(id=file_id)
+    except ProcessedFile.DoesNotExist:
+        raise PermanentJobError(f"ProcessedFile {file_id} no longer exists")
+
+    processed_file.processing_status = 'processing'
+    processed_file.save(update_fields=['processing_status'])
+
+    processor = FileProcessor(user_id=processed_file.uploaded_by_id)
+    result = processor.process_file_with_summary(processed_file.original_file, processed_file.context)
+
+    if not result['success']:
+        # Extraction errors are deterministic (corrupt or unsupported file), so don't retry
+        raise PermanentJobError(result.get('error', 'Unknown error'))
+
+    processed_file.extracted_text = result['extraction']['text']
+    processed_file.ai_summary = result['summary']['summary']
+    processed_file.processing_status = 'completed'
+    processed_file.processing_error = ''
+    processed_file.metadata = result['extraction']['metadata']
+    processed_file.word_count = result['extraction']['word_count']
+    processed_file.char_count = result['extraction']['char_count']
+    processed_file.processed_at = timezone.now()
+    processed_file.save()
+
+    return {
+        'file_id': processed_file.id,
+        'word_count': processed_file.word_count,
+        'summary_success': result['summary'].get('success', False),
+    }
+
+
+@task(REBUILD_TASK)
+def rebuild_portfolio_snapshots(portfolio_id, **kwargs):
+    """Rebuild a portfolio's preview and full-access snapshots"""
+    try:
+        return rebuild_snapshots(portfolio_id)
+    except ClassPortfolio.DoesNotExist:
+        raise PermanentJobError(f"ClassPortfolio {portfolio_id} no longer exists")
+
+
+@task(REGRADE_TASK)
+def regrade_quiz_submissions(quiz_id, **kwargs):
+    """Re-grade a quiz's submissions after its answer key changed"""
+    try:
+        return {'graded': regrade_quiz(quiz_id)}
+    except Quiz.DoesNotExist:
+        raise PermanentJobError(f"Quiz {quiz_id} no longer exists")
@@ -1,3 +1,1139 @@
-from django.test import TestCase
+"""
+API performance budget tests for HackWestTX Class Portfolio
+Seeds a realistic dataset, requests every GET route in api/urls.py through
+the DRF test client and checks each one against the query-count and p95
+latency budgets in api/perf_baseline.json.
 
-# Create your tests here.
+    python manage.py test api
+
+After an intended change (new route, deliberate extra query), refresh the
+baseline and commit it with the change:
+
+    PERF_UPDATE_BASELINE=1 python manage.py test api.tests.EndpointBudgetTests
+
+PERF_ITERATIONS, PERF_LATENCY_FACTOR and PERF_LATENCY_SLACK_MS tune the
+latency check for slower machines; query budgets are always exact.
+"""
+
+import asyncio
+import gc
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import facets, jobs, learning_content, link_directory, llm_gateway, quiz_scoring, search
+from . import urls as api_urls
+from .access import accessible_portfolios, can_access_portfolio
+from .syllabus_batch import write_checkpoint
+from .syllabus_extractor import SyllabusExtractor
+from .models import (
+    User, Department, Professor, ClassPortfolio, MarketplaceListing, PortfolioPurchase,
+    Syllabus, SyllabusExtraction, ImportantDate, LectureMaterial, Flashcard, Quiz,
+    QuizQuestion, QuizSubmission, ClassReview, StudyGroup, Notification,
+    ResourceRecommendation, Post, Like, Comment, ProcessedFile, Document, DocumentQuiz,
+    YouTubeVideo, CalendarEvent, CalendarFeedToken, CacheGeneration, Job, LLMUsage
+)
+
+BASELINE_PATH = Path(__file__).with_name('perf_baseline.json')
+ITERATIONS = int(os.environ.get('PERF_ITERATIONS', 20))
+LATENCY_FACTOR = float(os.environ.get('PERF_LATENCY_FACTOR', 3.0))
+LATENCY_SLACK_MS = float(os.environ.get('PERF_LATENCY_SLACK_MS', 25.0))
+UPDATE_BASELINE = os.environ.get('PERF_UPDATE_BASELINE') == '1'
+
+# Routes that are never requested, with the reason
+SKIPPED_ROUTES = {
+    'verify-connections': 'Opens its own MongoDB client when MONGODB_* environment variables are set',
+}
+
+# Query parameters for routes that reject requests without them, built when the test runs
+ROUTE_QUERY_PARAMS = {
+    'calendar-events-range': lambda: {
+        'start': timezone.now().date().isoformat(),
+        'end': (timezone.now() + timedelta(days=31)).date().isoformat(),
+    },
+}
+
+
+def get_routes():
+    """(name, pattern) for every reachable api route that accepts GET"""
+    routes = []
+    seen = set()
+    for pattern in api_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        route = str(pattern.pattern)
+        if route in seen:
+            # Shadowed by an earlier pattern for the same path; never reached
+            continue
+        seen.add(route)
+        view_class = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+        if view_class is not None and not hasattr(view_class, 'get'):
+            continue
+        if pattern.name in SKIPPED_ROUTES:
+            continue
+        routes.append((pattern.name, pattern))
+    return routes
+
+
+def p95(samples):
+    """Nearest-rank 95th percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def load_baseline():
+    if not BASELINE_PATH.exists():
+        return {}
+    with open(BASELINE_PATH) as baseline_file:
+        return json.load(baseline_file).get('endpoints', {})
+
+
+def write_baseline(results):
+    payload = {
+        'note': 'Generated by PERF_UPDATE_BASELINE=1 python manage.py test api.tests.EndpointBudgetTests',
+        'iterations': ITERATIONS,
+        'endpoints': {name: results[name] for name in sorted(results)},
+    }
+    with open(BASELINE_PATH, 'w') as baseline_file:
+        json.dump(payload, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def seed_dataset():
+    """A few hundred rows spread over every model the API reads; returns the ids routes need"""
+    now = timezone.now()
+    owner = User.objects.create_user(
+        username='owner', email='owner@example.edu', password='password123',
+        role='admin', university='Texas Tech University', major='Computer Science'
+    )
+    students = [
+        User.objects.create_user(
+            username=f'student{index}', email=f'student{index}@example.edu', password='password123',
+            university=['Texas Tech University', 'UT Austin', 'Texas A&M'][index % 3]
+        )
+        for index in range(12)
+    ]
+
+    departments = [
+        Department.objects.create(name=name, code=code)
+        for name, code in [('Computer Science', 'CS'), ('Mathematics', 'MATH'), ('Physics', 'PHYS')]
+    ]
+    professors = [
+        Professor.objects.create(name=f'Professor {index}', department=departments[index % 3])
+        for index in range(6)
+    ]
+
+    tag_pool = ['algorithms', 'calculus', 'mechanics', 'data structures', 'exam prep', 'labs']
+    portfolios = []
+    for index in range(24):
+        portfolios.append(ClassPortfolio.objects.create(
+            professor=professors[index % 6].name,
+            course=f'{departments[index % 3].code} {1300 + index}',
+            semester=['Fall', 'Spring', 'Summer'][index % 3],
+            year=2022 + index // 6,
+            price=Decimal(index % 4 * 15),
+            created_by=owner if index < 8 else students[index % 12],
+            is_public=index % 5 != 0,
+            tags=[tag_pool[index % 6], tag_pool[(index + 2) % 6]],
+        ))
+    portfolio = portfolios[0]
+
+    listings = [
+        MarketplaceListing.objects.create(portfolio=item, price=item.price or Decimal('10.00'))
+        for item in portfolios[:6]
+    ]
+    for listing in listings:
+        for buyer in students[:4]:
+            PortfolioPurchase.objects.create(listing=listing, buyer=buyer, purchase_price=listing.price)
+
+    syllabus = Syllabus.objects.create(
+        portfolio=portfolio, file='syllabi/cs1300.pdf',
+        extracted_text='CS 1300 Introduction to Computing. Midterm exam October 10.',
+        extraction_status='completed'
+    )
+    SyllabusExtraction.objects.create(
+        syllabus=syllabus, course_title='Introduction to Computing', course_code='CS 1300',
+        professor_name=professors[0].name, grade_breakdown={'exams': 50, 'homework': 50}
+    )
+
+    for item in portfolios[:8]:
+        ImportantDate.objects.bulk_create([
+            ImportantDate(
+                portfolio=item, title=f'Deadline {index}',
+                date_type=['exam', 'quiz', 'assignment', 'project'][index % 4],
+                due_date=now + timedelta(days=index * 3 - 6)
+            )
+            for index in range(8)
+        ])
+
+    materials = []
+    for item in portfolios[:4]:
+        for index in range(3):
+            materials.append(LectureMaterial.objects.create(
+                portfolio=item, title=f'Lecture {index}', material_type='notes',
+                file=f'materials/lecture{index}.pdf', uploaded_by=owner
+            ))
+    Flashcard.objects.bulk_create([
+        Flashcard(material=material, front=f'Term {index}', back=f'Definition {index}')
+        for material in materials for index in range(5)
+    ])
+
+    quiz = Quiz.objects.create(portfolio=portfolio, title='Week 1 Quiz', created_by=owner)
+    questions = QuizQuestion.objects.bulk_create([
+        QuizQuestion(
+            quiz=quiz, question_text=f'Question {index}?', question_type='multiple_choice',
+            options=['A', 'B', 'C', 'D'], correct_option_index=index % 4
+        )
+        for index in range(10)
+    ])
+    for student in students[:6]:
+        QuizSubmission.objects.create(quiz=quiz, user=student, score=Decimal('80.00'), total_points=10)
+    submission = QuizSubmission.objects.create(quiz=quiz, user=owner, score=Decimal('90.00'), total_points=10)
+
+    for item in portfolios[:6]:
+        for reviewer in students[:5]:
+            ClassReview.objects.create(
+                portfolio=item, reviewer=reviewer, final_grade='A',
+                difficulty_rating=3, teaching_quality_rating=4, workload_rating=3,
+                comments='Solid course'
+            )
+    review = ClassReview.objects.filter(portfolio=portfolio).first()
+
+    group = StudyGroup.objects.create(portfolio=portfolio, name='Exam study group', created_by=owner)
+    group.members.add(owner, *students[:5])
+
+    Notification.objects.bulk_create([
+        Notification(
+            user=owner, title=f'Notification {index}', message='Upcoming deadline',
+            notification_type=['deadline', 'grade', 'study', 'group'][index % 4]
+        )
+        for index in range(10)
+    ])
+    notification = Notification.objects.filter(user=owner).first()
+
+    recommendation = ResourceRecommendation.objects.create(
+        portfolio=portfolio, title='Visualgo', url='https://visualgo.net',
+        resource_type='website', recommended_by=owner
+    )
+
+    posts = []
+    for index in range(25):
+        post = Post.objects.create(
+            title=f'Post {index}', content='Study tips and notes', author=students[index % 12],
+            tags='study,tips'
+        )
+        posts.append(post)
+        Comment.objects.bulk_create([
+            Comment(post=post, author=students[(index + offset) % 12], content=f'Comment {offset}')
+            for offset in range(index % 6)
+        ])
+        Like.objects.bulk_create([Like(post=post, user=student) for student in students[:index % 5]])
+
+    processed_file = ProcessedFile.objects.create(
+        original_file='processed_files/lecture.pdf', file_name='lecture.pdf', file_type='pdf',
+        file_size=2048, extracted_text='Binary search trees and hashing', uploaded_by=owner,
+        portfolio=portfolio, processing_status='completed'
+    )
+
+    document = Document.objects.create(
+        file_id='doc-1', filename='notes.pdf', download_url='https://example.com/notes.pdf',
+        bucket='documents', folder='notes', uploaded_by=owner, portfolio=portfolio
+    )
+    DocumentQuiz.objects.create(
+        user=owner, document=document, filename='notes.pdf', topic='Trees',
+        total_questions=5, text_length=1200, word_count=200
+    )
+
+    videos = [
+        YouTubeVideo.objects.create(user=owner, url=f'https://www.youtube.com/watch?v=video{index}', title=f'Video {index}')
+        for index in range(5)
+    ]
+    events = [
+        CalendarEvent.objects.create(
+            user=owner, class_portfolio=portfolio, title=f'Homework {index}',
+            event_type='homework', due_date=now + timedelta(days=index)
+        )
+        for index in range(10)
+    ]
+    events[0].linked_resources.add(*videos[:2])
+    feed_token = CalendarFeedToken.objects.create(user=owner, token='seed-calendar-feed-token')
+
+    return {
+        'owner': owner,
+        'ids': {
+            'portfolio_id': portfolio.pk,
+            'file_id': processed_file.pk,
+            'user_id': students[0].pk,
+            'listing_id': listings[0].pk,
+            'syllabus_id': syllabus.pk,
+            'quiz_id': quiz.pk,
+            'group_id': group.pk,
+            'notification_id': notification.pk,
+            'post_id': posts[5].pk,
+            'document_id': document.pk,
+            'event_id': events[0].pk,
+            'resource_id': videos[0].pk,
+            'collection': 'important_dates',
+            'token': feed_token.token,
+        },
+        'pks': {
+            'department-detail': departments[0].pk,
+            'professor-detail': professors[0].pk,
+            'portfolio-detail': portfolio.pk,
+            'portfolio-collection': portfolio.pk,
+            'marketplace-detail': listings[0].pk,
+            'syllabus-detail': syllabus.pk,
+            'important-date-detail': ImportantDate.objects.filter(portfolio=portfolio).first().pk,
+            'material-detail': materials[0].pk,
+            'flashcard-detail': Flashcard.objects.first().pk,
+            'quiz-detail': quiz.pk,
+            'quiz-question-detail': questions[0].pk,
+            'quiz-submission-detail': submission.pk,
+            'review-detail': review.pk,
+            'study-group-detail': group.pk,
+            'recommendation-detail': recommendation.pk,
+            'user-profile': students[0].pk,
+            'post-detail': posts[5].pk,
+            'processed-file-detail': processed_file.pk,
+            'document-detail': document.pk,
+            'youtube-video-detail': videos[0].pk,
+            'calendar-event-detail': events[0].pk,
+        },
+    }
+
+
+@override_settings(MONGODB_ENABLED=False, OPENAI_API_KEY='', JOBS_RUN_EAGERLY=False)
+class EndpointBudgetTests(TestCase):
+    """Every GET endpoint stays within its checked-in query and latency budget"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_dataset()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(raise_request_exception=False)
+        self.client.force_authenticate(user=self.seed['owner'])
+
+    def url_for(self, name, pattern):
+        kwargs = {}
+        for param in pattern.pattern.converters:
+            if param == 'pk':
+                kwargs[param] = self.seed['pks'][name]
+            else:
+                kwargs[param] = self.seed['ids'][param]
+        url = reverse(name, kwargs=kwargs)
+        if name in ROUTE_QUERY_PARAMS:
+            url = f"{url}?{urlencode(ROUTE_QUERY_PARAMS[name]())}"
+        return url
+
+    def measure(self, url):
+        """Status, worst query count and p95 latency (ms) over ITERATIONS warm requests"""
+        # The first request fills per-process caches (content types, facets) and isn't counted
+        response = self.client.get(url)
+        gc.collect()
+        query_counts, timings = [], []
+        for _ in range(ITERATIONS):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = self.client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(queries))
+        return {
+            'url': url,
+            'status': response.status_code,
+            'queries': max(query_counts),
+            'p95_ms': round(p95(timings), 2),
+        }
+
+    def allowed_ms(self, budget):
+        return max(budget['p95_ms'] * LATENCY_FACTOR, budget['p95_ms'] + LATENCY_SLACK_MS)
+
+    def test_routes_have_seed_data(self):
+        for name, pattern in get_routes():
+            with self.subTest(route=name):
+                self.url_for(name, pattern)
+
+    def test_endpoint_budgets(self):
+        baseline = load_baseline()
+        results = {}
+        # Broken endpoints answer 500 and Django logs each one; the status is what we compare
+        request_logger = logging.getLogger('django.request')
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            for name, pattern in get_routes():
+                url = self.url_for(name, pattern)
+                results[name] = self.measure(url)
+                budget = baseline.get(name)
+                if budget and not UPDATE_BASELINE and results[name]['p95_ms'] > self.allowed_ms(budget):
+                    # One noisy run (GC, a busy CI neighbour) shouldn't fail the build; a real slowdown repeats
+                    retry = self.measure(url)
+                    if retry['p95_ms'] < results[name]['p95_ms']:
+                        results[name] = retry
+        finally:
+            request_logger.setLevel(previous_level)
+
+        if UPDATE_BASELINE:
+            write_baseline(results)
+            return
+
+        failures, slower = [], []
+        for name, result in results.items():
+            budget = baseline.get(name)
+            if budget is None:
+                failures.append(f"{name}: no budget in {BASELINE_PATH.name} (re-run with PERF_UPDATE_BASELINE=1)")
+                continue
+            if result['status'] != budget['status']:
+                # Fixing a broken endpoint is fine; breaking a working one is not
+                if result['status'] >= 500:
+                    failures.append(f"{name}: status {budget['status']} -> {result['status']}")
+                else:
+                    sys.stderr.write(f"{name}: status {budget['status']} -> {result['status']}\n")
+            if result['queries'] > budget['queries']:
+                failures.append(f"{name}: {result['queries']} queries, budget {budget['queries']}")
+            allowed_ms = self.allowed_ms(budget)
+            if result['p95_ms'] > allowed_ms:
+                failures.append(f"{name}: p95 {result['p95_ms']:.1f}ms, allowed {allowed_ms:.1f}ms")
+            if result['queries'] > budget['queries'] or result['p95_ms'] > budget['p95_ms']:
+                slower.append((name, budget, result))
+
+        if slower:
+            lines = ['', 'Endpoints slower than baseline:',
+                     f"{'route':<36} {'queries':>15} {'p95 ms':>21}"]
+            for name, budget, result in sorted(slower, key=lambda item: item[0]):
+                lines.append(
+                    f"{name:<36} {budget['queries']:>6} -> {result['queries']:<6} "
+                    f"{budget['p95_ms']:>8.1f} -> {result['p95_ms']:<8.1f}"
+                )
+            sys.stderr.write('\n'.join(lines) + '\n')
+
+        stale = sorted(set(baseline) - set(results))
+        if stale:
+            sys.stderr.write(f"Baseline entries with no matching route: {', '.join(stale)}\n")
+
+        self.assertFalse(failures, 'Performance budget exceeded:\n' + '\n'.join(failures))
+
+
+class CalendarFeedTests(TestCase):
+    """Polling an unchanged iCal subscription costs one query and a 304"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.user = User.objects.create_user(username='subscriber', email='subscriber@example.edu', password='password123')
+        portfolio = ClassPortfolio.objects.create(
+            professor='Dr. Feed', semester='Fall', year=2026, created_by=cls.user
+        )
+        cls.date = ImportantDate.objects.create(
+            portfolio=portfolio, title='Midterm; chapters 1, 2', date_type='midterm', due_date=now + timedelta(days=7)
+        )
+        cls.event = CalendarEvent.objects.create(
+            user=cls.user, class_portfolio=portfolio, title='Lab report', event_type='lab', due_date=now + timedelta(days=3)
+        )
+        cls.url = reverse('calendar-feed', kwargs={'token': CalendarFeedToken.objects.create(user=cls.user, token='feed').token})
+
+    def fetch(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content).decode() if response.streaming else ''
+        return response, body
+
+    def test_feed_covers_important_dates_and_events(self):
+        response, body = self.fetch()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertIn(f'UID:important-date-{self.date.pk}@', body)
+        self.assertIn(f'UID:calendar-event-{self.event.pk}@', body)
+        self.assertIn(r'SUMMARY:Midterm\; chapters 1\, 2', body)
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+
+    def test_unchanged_feed_answers_304_in_one_query(self):
+        response, _ = self.fetch()
+        with self.assertNumQueries(1):
+            revalidated, body = self.fetch(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(body, '')
+
+    def test_deleting_an_event_changes_the_etag(self):
+        response, _ = self.fetch()
+        self.event.delete()
+        changed, body = self.fetch(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotIn('calendar-event-', body)
+
+    def test_unknown_token_is_404(self):
+        response = self.client.get(reverse('calendar-feed', kwargs={'token': 'missing'}))
+        self.assertEqual(response.status_code, 404)
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages cover every row exactly once, ties included"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', email='reader@example.edu', password='password123')
+        created_at = timezone.now()
+        videos = YouTubeVideo.objects.bulk_create([
+            YouTubeVideo(user=cls.user, url=f'https://www.youtube.com/watch?v=page{index}', title=f'Video {index}')
+            for index in range(7)
+        ])
+        # Identical created_at values force the id tie-breaker
+        YouTubeVideo.objects.filter(pk__in=[video.pk for video in videos]).update(created_at=created_at)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_pages_cover_all_rows_once(self):
+        url = reverse('user-youtube-videos')
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 3, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(video['id'] for video in response.data['results'])
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), sorted(YouTubeVideo.objects.values_list('pk', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_total_is_only_counted_on_request(self):
+        url = reverse('user-youtube-videos')
+        self.assertNotIn('count', self.client.get(url).data)
+        response = self.client.get(url, {'total': 'exact'})
+        self.assertEqual(response.data['count'], 7)
+        self.assertFalse(response.data['count_is_estimate'])
+
+    def test_invalid_cursor_is_400(self):
+        response = self.client.get(reverse('user-youtube-videos'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class LinkDirectoryTests(TestCase):
+    """The public link directory filters on stored columns and serves repeats from cache"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='curator', email='curator@example.edu', password='password123')
+        for url in ('https://www.youtube.com/watch?v=abc123', 'https://www.coursera.org/learn/algorithms',
+                    'https://github.com/example/notes'):
+            YouTubeVideo.objects.create(user=user, url=url)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('public-youtube-videos')
+
+    def test_filters_by_link_type_and_domain(self):
+        response = self.client.get(self.url, {'link_type': 'youtube'})
+        self.assertEqual([card['video_id'] for card in response.json()['results']], ['abc123'])
+        response = self.client.get(self.url, {'domain': 'www.Coursera.org'})
+        self.assertEqual([card['link_type'] for card in response.json()['results']], ['Coursera'])
+        self.assertEqual(self.client.get(self.url, {'link_type': 'nope'}).status_code, 400)
+
+    def test_repeat_requests_only_read_the_generation(self):
+        first = self.client.get(self.url)
+        self.assertIn('public', first['Cache-Control'])
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).json(), first.json())
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_saving_a_link_invalidates_cached_pages(self):
+        self.client.get(self.url)
+        YouTubeVideo.objects.create(user=User.objects.get(username='curator'), url='https://vimeo.com/42')
+        self.assertEqual(len(self.client.get(self.url).json()['results']), 4)
+
+    def test_stored_link_details_fit_their_columns(self):
+        user = User.objects.get(username='curator')
+        long_path = YouTubeVideo.objects.create(user=user, url='https://youtu.be/abc123/' + 'x' * 100)
+        self.assertEqual(long_path.video_id, 'abc123')
+        long_id = YouTubeVideo.objects.create(user=user, url='https://www.youtube.com/watch?v=' + 'a' * 100)
+        self.assertEqual(len(long_id.video_id), YouTubeVideo._meta.get_field('video_id').max_length)
+
+    def test_generation_bumped_elsewhere_retires_cached_pages(self):
+        self.client.get(self.url)
+        # Another worker: a save there (bulk_create sends no signal here) and its bump, in the shared database only
+        YouTubeVideo.objects.bulk_create([YouTubeVideo(user=User.objects.get(username='curator'), url='https://vimeo.com/7')])
+        CacheGeneration.objects.filter(name=link_directory.GENERATION_NAME).update(value=F('value') + 1)
+        self.assertEqual(len(self.client.get(self.url).json()['results']), 4)
+
+
+class PortfolioAccessTests(TestCase):
+    """Owners, buyers and the public see exactly the portfolios the access policy allows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='author', email='author@example.edu', password='password123')
+        cls.buyer = User.objects.create_user(username='buyer', email='buyer@example.edu', password='password123')
+        cls.stranger = User.objects.create_user(username='stranger', email='stranger@example.edu', password='password123')
+        cls.public, cls.sold, cls.hidden = [
+            ClassPortfolio.objects.create(
+                professor=professor, course='Topology', semester='Fall', year=2025,
+                is_public=is_public, created_by=cls.owner
+            )
+            for professor, is_public in (('Dr. Open', True), ('Dr. Sold', False), ('Dr. Hidden', False))
+        ]
+        listing = MarketplaceListing.objects.create(portfolio=cls.sold, price=Decimal('10.00'))
+        PortfolioPurchase.objects.create(listing=listing, buyer=cls.buyer, purchase_price=listing.price)
+        ProcessedFile.objects.create(
+            original_file='processed_files/private.txt', file_name='private.txt', file_type='txt', file_size=64,
+            extracted_text='Eigenvalues of the private study notes', ai_summary='Eigenvalues summary',
+            uploaded_by=cls.owner, portfolio=cls.public, processing_status='completed'
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user=user)
+        return client
+
+    def assert_search_hides(self, client, *portfolios):
+        hidden = {portfolio.pk for portfolio in portfolios}
+        for name in ('global-search', 'search-portfolios'):
+            response = client.get(reverse(name), {'q': 'topology'})
+            self.assertEqual(response.status_code, 200)
+            found = {item['id'] for item in response.data['results']}
+            self.assertIn(self.public.pk, found)
+            self.assertFalse(found & hidden)
+            self.assertFalse({hit['portfolio_id'] for hit in response.data.get('hits', [])} & hidden)
+
+    def test_policy_matches_each_audience(self):
+        expected = [
+            (self.owner, {self.public, self.sold, self.hidden}),
+            (self.buyer, {self.public, self.sold}),
+            (self.stranger, {self.public}),
+            (AnonymousUser(), {self.public}),
+            (None, {self.public}),
+        ]
+        for user, portfolios in expected:
+            with self.subTest(user=str(user)):
+                self.assertEqual(set(accessible_portfolios(user)), portfolios)
+                for portfolio in (self.public, self.sold, self.hidden):
+                    self.assertEqual(can_access_portfolio(portfolio, user), portfolio in portfolios)
+
+    def test_queryset_argument_is_narrowed_not_replaced(self):
+        queryset = ClassPortfolio.objects.exclude(pk=self.public.pk)
+        self.assertEqual(set(accessible_portfolios(self.buyer, queryset)), {self.sold})
+
+    def test_private_unpurchased_portfolio_is_hidden_from_list_detail_and_search(self):
+        for user in (self.buyer, self.stranger):
+            with self.subTest(user=user.username):
+                client = self.client_for(user)
+                listed = {item['id'] for item in client.get(reverse('portfolio-list')).data['results']}
+                self.assertNotIn(self.hidden.pk, listed)
+                self.assertIn(self.public.pk, listed)
+                self.assertEqual(self.sold.pk in listed, user == self.buyer)
+                detail = client.get(reverse('portfolio-detail', kwargs={'pk': self.hidden.pk}))
+                self.assertEqual(detail.status_code, 404)
+                self.assert_search_hides(client, self.hidden)
+
+        self.assertEqual(self.client_for(self.owner).get(
+            reverse('portfolio-detail', kwargs={'pk': self.hidden.pk})
+        ).status_code, 200)
+        self.assert_search_hides(self.client_for(None), self.hidden, self.sold)
+
+    def test_processed_files_in_a_visible_portfolio_are_only_searchable_by_their_uploader(self):
+        for user in (self.buyer, self.stranger, None):
+            with self.subTest(user=str(user)):
+                response = self.client_for(user).get(reverse('global-search'), {'q': 'eigenvalues'})
+                self.assertEqual(response.data['hits'], [])
+                self.assertEqual(response.data['results'], [])
+        hits = self.client_for(self.owner).get(reverse('global-search'), {'q': 'eigenvalues'}).data['hits']
+        self.assertEqual([hit['kind'] for hit in hits], ['processed_file'])
+
+
+class SearchSnippetTests(TestCase):
+    """Search snippets highlight matches without passing indexed markup through"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='indexer', email='indexer@example.edu', password='password123')
+        portfolio = ClassPortfolio.objects.create(professor='Dr. Escape', semester='Fall', year=2025, created_by=cls.user)
+        ProcessedFile.objects.create(
+            original_file='processed_files/notes.txt', file_name='notes.txt', file_type='txt', file_size=64,
+            extracted_text='Heaps <script>alert("heapsort")</script> & <b>priority</b> queues',
+            uploaded_by=cls.user, portfolio=portfolio, processing_status='completed'
+        )
+
+    def assert_escaped(self, snippet):
+        self.assertIn('<mark>', snippet)
+        self.assertNotIn('<script>', snippet)
+        self.assertNotIn('<b>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+
+    def test_every_backend_escapes_snippets(self):
+        names = ['basic'] + (['sqlite'] if search._detect_backend_name() == 'sqlite' else [])
+        for name in names:
+            with self.subTest(backend=name):
+                hits = search.BACKENDS[name]().search('heapsort', owner=self.user)
+                self.assertEqual(len(hits), 1)
+                self.assert_escaped(hits[0]['snippet'])
+
+    def test_search_endpoint_returns_escaped_snippets(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(reverse('global-search'), {'q': 'heapsort'})
+        self.assertEqual(response.status_code, 200)
+        snippets = [hit['snippet'] for hit in response.data['hits']]
+        self.assertTrue(snippets)
+        for snippet in snippets:
+            self.assert_escaped(snippet)
+
+
+class FacetCacheTests(TestCase):
+    """Search facets are cached per filter set and retired by a generation every worker shares"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='browser', email='browser@example.edu', password='password123')
+        ClassPortfolio.objects.create(professor='Dr. Facet', semester='Fall', year=2025, is_public=True, created_by=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('global-search')
+
+    def professors(self):
+        return {item['name']: item['count'] for item in self.client.get(self.url).data['facets']['professors']}
+
+    def test_saving_a_portfolio_invalidates_cached_facets(self):
+        self.assertEqual(self.professors(), {'Dr. Facet': 1})
+        ClassPortfolio.objects.create(professor='Dr. Facet', semester='Spring', year=2026, is_public=True, created_by=self.user)
+        self.assertEqual(self.professors(), {'Dr. Facet': 2})
+
+    def test_generation_bumped_elsewhere_retires_cached_facets(self):
+        self.professors()
+        # Another worker: a save there (bulk_create sends no signal here) and its bump, in the shared database only
+        ClassPortfolio.objects.bulk_create([
+            ClassPortfolio(professor='Dr. Elsewhere', semester='Fall', year=2025, is_public=True, created_by=self.user)
+        ])
+        self.assertNotIn('Dr. Elsewhere', self.professors())
+        CacheGeneration.objects.filter(name=facets.GENERATION_NAME).update(value=F('value') + 1)
+        self.assertEqual(self.professors(), {'Dr. Facet': 1, 'Dr. Elsewhere': 1})
+
+
+class SyllabusExtractorTests(SimpleTestCase):
+    """The single-pass extractor reads fields from labelled sections"""
+
+    SYLLABUS = (
+        "Course Title: Programming Principles I\n"
+        "Course Code: CS 1411\n"
+        "Credits: 4\n"
+        "Instructor: Dr. Jane Smith, jane.smith@ttu.edu\n"
+        "Office Hours: MWF 2:00-3:30 PM\n"
+        "or by appointment\n"
+        "\n"
+        "Meets MWF 10:00 - 10:50 AM, Fall 2025\n"
+        "Homework 1 due: 09/05/2025\n"
+        "Quizzes review: 09/26/2025\n"
+        "Midterm Exam: 10/15/2025\n"
+        "Final Exam: 12/10/2025\n"
+        "Homework: 20%\n"
+        "Final = 30%\n"
+    )
+
+    def setUp(self):
+        self.data = SyllabusExtractor().extract_from_text(self.SYLLABUS)
+
+    def test_labelled_fields(self):
+        self.assertEqual(self.data['course_title'], 'Programming Principles I')
+        self.assertEqual(self.data['course_code'], 'CS 1411')
+        self.assertEqual(self.data['credits'], 4)
+        self.assertEqual(self.data['professor_name'], 'Dr. Jane Smith, jane.smith@ttu.edu')
+        self.assertEqual(self.data['professor_office_hours'], 'MWF 2:00-3:30 PM\nor by appointment')
+        self.assertEqual(self.data['grade_breakdown'], {'homework': 20, 'final': 30})
+
+    def test_full_instructor_email(self):
+        self.assertEqual(self.data['professor_email'], 'jane.smith@ttu.edu')
+
+    def test_unlabelled_days_and_semester(self):
+        self.assertNotIn('extraction_error', self.data)
+        self.assertEqual(self.data['class_days'], 'MWF')
+        self.assertEqual(self.data['semester'], 'Fall 2025')
+
+    def test_dated_items(self):
+        self.assertEqual(
+            [(item['title'], item['date']) for item in self.data['exam_dates']],
+            [('Exam', '10/15/2025'), ('Exam', '12/10/2025'), ('Midterm', '10/15/2025'), ('Final', '12/10/2025')]
+        )
+        self.assertEqual([item['title'] for item in self.data['homework_dates']], ['Homework', 'Due'])
+        self.assertEqual([item['title'] for item in self.data['quiz_dates']], ['Quiz', 'Quizzes'])
+        self.assertEqual(self.data['final_exam_date'].date().isoformat(), '2025-12-10')
+
+
+class SyllabusDateImportTests(TestCase):
+    """Extracted dates are resolved against the semester and upserted in one statement"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner', email='planner@example.edu', password='password123')
+        portfolio = ClassPortfolio.objects.create(professor='Dr. Dates', semester='Fall', year=2025, created_by=cls.user)
+        syllabus = Syllabus.objects.create(portfolio=portfolio, file='syllabi/dates.pdf', extraction_status='completed')
+        fields = {key: value for key, value in SyllabusExtractor().extract_from_text(
+            "Homework 1 due: Week 2 Friday\n"
+            "Midterm Exam: Oct. 15\n"
+            "Final Exam: 12/10/2025\n"
+            "Quiz 3: January 12\n"
+        ).items() if key.endswith('_dates') or key == 'final_exam_date'}
+        # The extractor returns a naive datetime; the model field expects an aware one
+        fields['final_exam_date'] = timezone.make_aware(fields['final_exam_date'])
+        cls.extraction = SyllabusExtraction.objects.create(syllabus=syllabus, semester='Fall 2025', **fields)
+        cls.portfolio, cls.url = portfolio, reverse('create-dates-from-extraction', kwargs={'syllabus_id': syllabus.pk})
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_dates_are_normalized_and_deduplicated(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 200)
+        dates = {
+            date.title: (date.date_type, timezone.localtime(date.due_date).date().isoformat())
+            for date in ImportantDate.objects.filter(portfolio=self.portfolio)
+        }
+        self.assertEqual(dates, {
+            'Homework 1 due': ('assignment', '2025-09-05'),
+            'Midterm Exam': ('midterm', '2025-10-15'),
+            'Final Exam': ('final', '2025-12-10'),
+            'Quiz 3': ('quiz', '2026-01-12'),
+        })
+
+    def test_reimport_upserts_in_one_write(self):
+        self.client.post(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url)
+        self.assertEqual(ImportantDate.objects.filter(portfolio=self.portfolio).count(), 4)
+        self.assertEqual(sum(query['sql'].startswith('INSERT') for query in queries.captured_queries), 1)
+
+    def test_reimport_moves_rescheduled_dates_and_drops_removed_ones(self):
+        self.client.post(self.url)
+        manual = ImportantDate.objects.create(
+            portfolio=self.portfolio, title='Office hours', date_type='other', due_date=timezone.now()
+        )
+        self.extraction.homework_dates = [
+            dict(entry, date='Week 2 Sunday') for entry in self.extraction.homework_dates
+        ]
+        self.extraction.quiz_dates = []
+        self.extraction.save()
+
+        self.client.post(self.url)
+        dates = {
+            date.title: timezone.localtime(date.due_date).date().isoformat()
+            for date in ImportantDate.objects.filter(portfolio=self.portfolio)
+        }
+        self.assertEqual(dates, {
+            'Homework 1 due': '2025-09-07',
+            'Midterm Exam': '2025-10-15',
+            'Final Exam': '2025-12-10',
+            'Office hours': timezone.localtime(manual.due_date).date().isoformat(),
+        })
+
+
+class ReextractSyllabiTests(TestCase):
+    """reextract_syllabi upserts extractions in batches and resumes from its checkpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='archivist', email='archivist@example.edu', password='password123')
+        cls.syllabi = []
+        for index in range(5):
+            portfolio = ClassPortfolio.objects.create(
+                professor=f'Dr. Batch {index}', semester='Fall', year=2025, created_by=user
+            )
+            cls.syllabi.append(Syllabus.objects.create(
+                portfolio=portfolio, file=f'syllabi/batch{index}.pdf',
+                extracted_text=f"Course Title: Batch Course {index}\nCourse Code: CS {1000 + index}\n"
+            ))
+        SyllabusExtraction.objects.create(syllabus=cls.syllabi[0], course_title='Stale title')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'reextract.checkpoint')
+
+    def reextract(self):
+        call_command(
+            'reextract_syllabi', workers=1, batch_size=2, checkpoint=self.checkpoint, stdout=StringIO()
+        )
+
+    def test_every_syllabus_is_extracted_once(self):
+        self.reextract()
+        titles = dict(SyllabusExtraction.objects.values_list('syllabus_id', 'course_title'))
+        self.assertEqual(titles, {syllabus.pk: f'Batch Course {index}' for index, syllabus in enumerate(self.syllabi)})
+        self.assertEqual(set(Syllabus.objects.values_list('extraction_status', flat=True)), {'completed'})
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_resumes_after_checkpoint(self):
+        write_checkpoint(self.checkpoint, self.syllabi[2].pk, {})
+        self.reextract()
+        extracted = set(SyllabusExtraction.objects.exclude(course_title='Stale title').values_list('syllabus_id', flat=True))
+        self.assertEqual(extracted, {syllabus.pk for syllabus in self.syllabi[3:]})
+
+
+class LearningContentTests(TestCase):
+    """Summary, flashcards and quiz are generated concurrently, saved, and bounded by the deadline"""
+
+    DELAY = 0.3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='tutor', email='tutor@example.edu', password='password123')
+        cls.portfolio = ClassPortfolio.objects.create(professor='Dr. Async', semester='Fall', year=2025, created_by=cls.user)
+        cls.material = LectureMaterial.objects.create(
+            portfolio=cls.portfolio, title='Graph Algorithms', material_type='notes',
+            file='materials/graphs.pdf', uploaded_by=cls.user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        patcher = mock.patch.object(learning_content, 'get_async_client', return_value=object())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @classmethod
+    async def fake_create(cls, client, params):
+        cls.calls += 1
+        system = params['messages'][0]['content']
+        if 'quiz' in system:
+            await asyncio.sleep(cls.quiz_delay)
+            return chat_response(json.dumps([{'question': 'Dijkstra needs?', 'options': ['Weights >= 0', 'A heap', 'DFS', 'BFS'], 'correct_answer': 0}]))
+        await asyncio.sleep(cls.DELAY)
+        if 'flashcards' in system:
+            return chat_response('Cards: ' + json.dumps([{'front': 'BFS', 'back': 'Breadth-first search'}, {'front': 'DFS', 'back': 'Depth-first search'}]))
+        return chat_response('Graphs and the algorithms that search them.')
+
+    def generate(self, quiz_delay, deadline=60):
+        type(self).quiz_delay, type(self).calls = quiz_delay, 0
+        with mock.patch.object(learning_content, '_create', self.fake_create), \
+                mock.patch.object(learning_content, 'DEADLINE_SECONDS', deadline):
+            started = time.perf_counter()
+            response = self.client.post(
+                reverse('generate-content', kwargs={'portfolio_id': self.portfolio.pk}),
+                {'material_id': self.material.pk}, format='json'
+            )
+            return response, time.perf_counter() - started
+
+    def test_artifacts_are_generated_concurrently_and_saved(self):
+        response, elapsed = self.generate(quiz_delay=self.DELAY)
+        self.assertEqual(response.status_code, 200)
+        # Three calls of DELAY each finish in about one DELAY, not three
+        self.assertLess(elapsed, self.DELAY * 2.5)
+        content = response.data['generated_content']
+        self.assertEqual(content['summary']['summary'], 'Graphs and the algorithms that search them.')
+        self.assertEqual(
+            sorted(Flashcard.objects.filter(material=self.material).values_list('front', flat=True)), ['BFS', 'DFS']
+        )
+        question = QuizQuestion.objects.get(quiz_id=response.data['saved']['quiz_id'])
+        self.assertEqual((question.question_text, question.correct_option_index), ('Dijkstra needs?', 0))
+
+    def test_artifacts_past_the_deadline_are_dropped(self):
+        response, elapsed = self.generate(quiz_delay=30, deadline=1.0)
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(elapsed, 5)
+        self.assertEqual(response.data['generated_content']['quiz'][0]['question'], 'Error generating quiz')
+        self.assertNotIn('quiz_id', response.data['saved'])
+        self.assertFalse(Quiz.objects.filter(portfolio=self.portfolio).exists())
+        self.assertEqual(Flashcard.objects.filter(material=self.material).count(), 2)
+
+    def test_repeated_requests_are_served_from_the_cache(self):
+        self.generate(quiz_delay=0)
+        response, _ = self.generate(quiz_delay=0)
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(response.data['generated_content']['summary']['summary'], 'Graphs and the algorithms that search them.')
+        usage = LLMUsage.objects.get(user=self.user)
+        self.assertEqual((usage.requests, usage.cached_requests), (6, 3))
+        self.assertEqual((usage.prompt_tokens, usage.completion_tokens), (30, 60))
+
+
+    def test_repeated_requests_do_not_duplicate_saved_content(self):
+        first, _ = self.generate(quiz_delay=0)
+        second, _ = self.generate(quiz_delay=0)
+        self.assertEqual(first.data['saved'], second.data['saved'])
+        self.assertEqual(Flashcard.objects.filter(material=self.material).count(), 2)
+        self.assertEqual(Quiz.objects.filter(portfolio=self.portfolio).count(), 1)
+        self.assertEqual(QuizQuestion.objects.filter(quiz__portfolio=self.portfolio).count(), 1)
+
+def chat_response(content, prompt_tokens=10, completion_tokens=20):
+    """Stand-in for an OpenAI chat completion response"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    )
+
+
+class LLMGatewayTests(TestCase):
+    """OpenAI calls share per-minute budgets across workers and identical calls are answered from the cache"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='spender', email='spender@example.edu', password='password123')
+        self.openai = mock.Mock()
+        self.openai.chat.completions.create.return_value = chat_response('Notes', prompt_tokens=100, completion_tokens=50)
+        self.params = llm_gateway.chat_params(
+            'gpt-3.5-turbo', [{'role': 'user', 'content': 'Summarize graphs'}], 200, 0.3
+        )
+
+    def test_identical_calls_are_cached_and_accounted(self):
+        first = llm_gateway.complete(self.openai, self.params, user_id=self.user.pk)
+        second = llm_gateway.complete(self.openai, self.params, user_id=self.user.pk)
+        other = llm_gateway.complete(self.openai, dict(self.params, temperature=0.9), user_id=self.user.pk)
+        self.assertEqual([first.cached, second.cached, other.cached], [False, True, False])
+        self.assertEqual(self.openai.chat.completions.create.call_count, 2)
+        usage = LLMUsage.objects.get(user=self.user)
+        self.assertEqual((usage.requests, usage.cached_requests, usage.prompt_tokens), (3, 1, 200))
+        self.assertEqual(usage.cost, Decimal('0.000250'))
+
+    def test_requests_per_minute_are_shared(self):
+        with mock.patch.dict(llm_gateway.BUCKETS, {'requests': 2}):
+            llm_gateway.complete(self.openai, self.params, use_cache=False, wait=0)
+            llm_gateway.complete(self.openai, self.params, use_cache=False, wait=0)
+            with self.assertRaises(llm_gateway.RateLimited):
+                llm_gateway.complete(self.openai, self.params, use_cache=False, wait=0)
+        self.assertEqual(self.openai.chat.completions.create.call_count, 2)
+
+    def test_unused_tokens_are_returned(self):
+        with mock.patch.dict(llm_gateway.BUCKETS, {'tokens': 1000}):
+            for _ in range(5):
+                llm_gateway.complete(self.openai, self.params, use_cache=False, wait=0)
+        # Each call reserves its prompt plus max_tokens but only keeps the 150 it used
+        self.assertEqual(self.openai.chat.completions.create.call_count, 5)
+
+
+@override_settings(JOBS_RUN_EAGERLY=False)
+class JobQueueTests(TestCase):
+    """Jobs abandoned by a dead worker are retried until they run out of attempts"""
+
+    def setUp(self):
+        self.failures = []
+        patcher = mock.patch.dict(jobs.TASKS, {
+            'noop': jobs.TaskSpec(lambda **payload: None, on_failure=lambda error, **payload: self.failures.append(error)),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def abandon(self, job):
+        """Claim the job and leave it running with a lease older than the stale cutoff"""
+        jobs._claim(job.pk, 'dead-worker')
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=jobs.STALE_AFTER_SECONDS + 1)
+        )
+
+    def test_stale_jobs_are_requeued_then_failed(self):
+        job = jobs.enqueue('noop', max_attempts=2)
+        self.abandon(job)
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+
+        self.abandon(job)
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertEqual(self.failures, ['Worker lease expired'])
+
+    def test_running_jobs_with_a_fresh_lease_are_left_alone(self):
+        job = jobs.enqueue('noop')
+        jobs._claim(job.pk, 'live-worker')
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+
+
+class QuizScoringTests(TestCase):
+    """Quizzes are graded against a cached answer key that every question change retires"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='examiner', email='examiner@example.edu', password='password123')
+        cls.student = User.objects.create_user(username='examinee', email='examinee@example.edu', password='password123')
+        portfolio = ClassPortfolio.objects.create(professor='Dr. Key', semester='Fall', year=2025, created_by=cls.owner)
+        cls.quiz = Quiz.objects.create(portfolio=portfolio, title='Sorting', created_by=cls.owner)
+        cls.choice = QuizQuestion.objects.create(
+            quiz=cls.quiz, question_text='Fastest average sort?', question_type='multiple_choice',
+            options=['Bubble', 'Quick', 'Selection'], correct_option_index=1, points=2
+        )
+        cls.true_false = QuizQuestion.objects.create(
+            quiz=cls.quiz, question_text='Merge sort is stable', question_type='true_false', is_true=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def fresh_quiz(self):
+        return Quiz.objects.get(pk=self.quiz.pk)
+
+    def test_submission_is_graded(self):
+        response = self.client.post(
+            reverse('submit-quiz', kwargs={'quiz_id': self.quiz.pk}),
+            {'answers': {str(self.choice.pk): 'Quick', str(self.true_false.pk): 'false'}}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        submission = QuizSubmission.objects.get(pk=response.data['submission_id'])
+        self.assertEqual((submission.score, submission.total_points), (Decimal('66.67'), 3))
+
+    def test_answer_key_is_cached_per_version(self):
+        quiz = self.fresh_quiz()
+        quiz_scoring.get_answer_key(quiz)
+        with self.assertNumQueries(0):
+            key = quiz_scoring.get_answer_key(quiz)
+        self.assertEqual(key[str(self.choice.pk)]['correct_answer'], 'Quick')
+
+        self.choice.correct_option_index = 0
+        self.choice.save()
+        quiz = self.fresh_quiz()
+        with self.assertNumQueries(1):
+            key = quiz_scoring.get_answer_key(quiz)
+        self.assertEqual(key[str(self.choice.pk)]['correct_answer'], 'Bubble')
+
+    def test_question_save_and_delete_bump_the_version(self):
+        version = self.fresh_quiz().answer_key_version
+        self.choice.save()
+        self.assertEqual(self.fresh_quiz().answer_key_version, version + 1)
+        self.true_false.delete()
+        self.assertEqual(self.fresh_quiz().answer_key_version, version + 2)
+
+    def test_full_quiz_save_does_not_rewind_the_version(self):
+        stale = self.fresh_quiz()
+        self.choice.save()
+        stale.title = 'Sorting algorithms'
+        stale.save()
+        quiz = self.fresh_quiz()
+        self.assertEqual(quiz.title, 'Sorting algorithms')
+        self.assertEqual(quiz.answer_key_version, stale.answer_key_version + 1)
+
+    @override_settings(JOBS_RUN_EAGERLY=True)
+    def test_changing_the_answer_key_regrades_submissions(self):
+        submission = QuizSubmission.objects.create(
+            quiz=self.quiz, user=self.student, answers={str(self.choice.pk): 'Bubble'},
+            score=Decimal('0'), total_points=2
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.choice.correct_option_index = 0
+            self.choice.save()
+        submission.refresh_from_db()
+        self.assertEqual(submission.score, Decimal('100'))
+        self.assertEqual(Job.objects.get(name=quiz_scoring.REGRADE_TASK).status, 'succeeded')
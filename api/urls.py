@@ -49,6 +49,7 @@ urlpatterns = [
     path('dmca/takedown/', views.dmca_takedown_request, name='dmca-takedown'),
     path('security/status/', views.security_status, name='security-status'),
     path('performance/metrics/', views.performance_metrics, name='performance-metrics'),
+    path('metrics/', views.prometheus_metrics, name='prometheus-metrics'),
     path('accessibility/features/', views.accessibility_features, name='accessibility-features'),
     path('analytics/user/', views.user_analytics, name='user-analytics'),
     path('audit/log/', views.audit_log, name='audit-log'),
@@ -107,6 +108,7 @@ urlpatterns = [
     path('portfolios/public/', views.public_portfolios, name='public-portfolios'),
     path('portfolios/<int:portfolio_id>/update/', views.update_portfolio, name='update-portfolio'),
     path('portfolios/<int:pk>/', views.PortfolioDetailView.as_view(), name='portfolio-detail'),
+    path('portfolios/<int:pk>/collections/<str:collection>/', views.portfolio_collection, name='portfolio-collection'),
     
     # Marketplace
     path('marketplace/', views.MarketplaceListingListCreateView.as_view(), name='marketplace-list'),
@@ -196,6 +198,7 @@ urlpatterns = [
     path('files/<int:pk>/', views.ProcessedFileDetailView.as_view(), name='processed-file-detail'),
     path('files/upload/', views.upload_and_process_file, name='upload-and-process-file'),
     path('files/<int:file_id>/reprocess/', views.reprocess_file, name='reprocess-file'),
+    path('files/<int:file_id>/status/', views.processed_file_status, name='processed-file-status'),
     
     # Documents
     path('documents/', views.DocumentListCreateView.as_view(), name='document-list'),
@@ -221,10 +224,15 @@ urlpatterns = [
     # Calendar Events
     path('calendar-events/', views.CalendarEventListCreateView.as_view(), name='calendar-event-list'),
     path('calendar-events/user/', views.user_calendar_events, name='user-calendar-events'),
+    path('calendar-events/range/', views.calendar_events_range, name='calendar-events-range'),
     path('calendar-events/create/', views.create_calendar_event, name='create-calendar-event'),
     path('calendar-events/<int:pk>/', views.CalendarEventDetailView.as_view(), name='calendar-event-detail'),
     path('calendar-events/<int:event_id>/complete/', views.mark_event_completed, name='mark-event-completed'),
     path('calendar-events/<int:event_id>/link-resource/', views.link_resource_to_event, name='link-resource-to-event'),
     path('calendar-events/<int:event_id>/unlink-resource/<int:resource_id>/', views.unlink_resource_from_event, name='unlink-resource-from-event'),
     
+    # iCal subscriptions
+    path('calendar/subscription/', views.calendar_subscription, name='calendar-subscription'),
+    path('calendar/feed/<str:token>.ics', views.calendar_feed, name='calendar-feed'),
+    
 ]
\ No newline at end of file
@@ -1,11 +1,17 @@
 from rest_framework import generics, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
+from django.http import HttpResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate
-from django.db.models import Q, Count, Avg, Min, Max, F
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Count, Avg, Min, Max, F, Prefetch, FloatField, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 from datetime import datetime, timedelta
 import os
 
@@ -16,7 +22,8 @@ from .models import (
     MarketplaceListing, PortfolioPurchase, Syllabus, SyllabusExtraction,
     ImportantDate, LectureMaterial, Flashcard, Quiz, QuizQuestion, QuizSubmission,
     ClassReview, StudyGroup, Notification, ResourceRecommendation,
-    Post, Like, Comment, ProcessedFile, Document, DocumentQuiz, YouTubeVideo, CalendarEvent
+    Post, Like, Comment, ProcessedFile, Document, DocumentQuiz, YouTubeVideo, CalendarEvent,
+    PortfolioTag, TagCount
 )
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, PasswordResetRequestSerializer, 
@@ -30,9 +37,29 @@ from .serializers import (
     PostSerializer, PostCreateSerializer, CommentSerializer, ProcessedFileSerializer,
     ProcessedFileCreateSerializer, DocumentSerializer, DocumentCreateSerializer,
     DocumentQuizSerializer, DocumentQuizCreateSerializer, YouTubeVideoSerializer, YouTubeVideoCreateSerializer,
-    CalendarEventSerializer, CalendarEventCreateSerializer
+    CalendarEventSerializer, CalendarEventCreateSerializer, CalendarEventCompactSerializer
 )
 from .permissions import IsStudentOrReadOnly, IsModeratorOrReadOnly, IsAdminOnly, IsOwnerOrModerator, IsOwnerOrReadOnly
+from .access import accessible_portfolios
+from .search import filter_portfolios_by_text, order_by_hits, search_documents
+from .facets import PAID_Q, get_facets, visibility_q
+from .tags import current_trending_score, normalize_tags
+from .jobs import enqueue
+from .extractors import extract_plain_text
+from .feeds import comments_after, feed_queryset
+from .quiz_scoring import get_answer_key, grade, question_results
+from .snapshots import get_snapshot_content, portfolio_visibility, snapshot_level
+from .link_directory import DIRECTORY_MAX_AGE, directory_page
+from .calendar_feed import events_in_range, parse_range, portfolio_refs
+from .syllabus_dates import import_important_dates
+from .learning_content import generate_artifacts, save_artifacts
+from .ical_feed import (
+    alarms_from_reminder_settings, feed_etag, feed_path, get_feed_token, iter_feed, last_modified,
+    parse_alarms, resolve_feed, rotate_feed_token
+)
+from .pagination import keyset_page, clamp_limit as clamp_page_limit, page_payload, request_page
+from .portfolio_detail import COLLECTIONS, PAGE_SIZE as COLLECTION_PAGE_SIZE, clamp_limit, collection_page, detail_queryset
+from . import metrics
 
 # Visitor Landing & Onboarding Views
 @api_view(['GET'])
@@ -40,9 +67,7 @@ from .permissions import IsStudentOrReadOnly, IsModeratorOrReadOnly, IsAdminOnly
 def visitor_landing(request):
     """Visitor landing page with featured portfolios and search"""
     # Get featured portfolios (public_full and public_preview)
-    featured_portfolios = ClassPortfolio.objects.filter(
-        visibility__in=['public_full', 'public_preview']
-    ).order_by('-created_at')[:6]
+    featured_portfolios = accessible_portfolios(None).order_by('-created_at')[:6]
     
     # Get popular marketplace listings
     popular_listings = MarketplaceListing.objects.filter(
@@ -74,30 +99,17 @@ def search_portfolios(request):
     term = request.query_params.get('term', '')
     min_price = request.query_params.get('min_price', '')
     max_price = request.query_params.get('max_price', '')
-    sort_by = request.query_params.get('sort', 'newest')  # newest, helpful, rated, purchased
+    sort_by = request.query_params.get('sort', 'relevance' if query else 'newest')  # relevance, newest, helpful, rated, purchased
     
     # Base queryset - show portfolios user can access
     user = request.user if request.user.is_authenticated else None
-    queryset = ClassPortfolio.objects.all()
-    
-    # Apply visibility filtering
-    if not user:
-        # Visitors can only see public portfolios
-        queryset = queryset.filter(visibility__in=['public_full', 'public_preview'])
-    else:
-        # Authenticated users can see portfolios they have access to
-        accessible_portfolios = []
-        for portfolio in queryset:
-            if portfolio.can_user_access(user):
-                accessible_portfolios.append(portfolio.id)
-        queryset = queryset.filter(id__in=accessible_portfolios)
+    queryset = accessible_portfolios(user)
     
     # Apply search filters
+    hits = []
     if query:
-        queryset = queryset.filter(
-            Q(professor__icontains=query) |
-            Q(semester__icontains=query)
-        )
+        hits = search_documents(query, user)
+        queryset = filter_portfolios_by_text(queryset, query)
     
     if department:
         # No department filtering since we removed course field
@@ -111,8 +123,9 @@ def search_portfolios(request):
         queryset = queryset.filter(professor__icontains=professor)
     
     if tags:
-        tag_list = [tag.strip() for tag in tags.split(',')]
-        queryset = queryset.filter(tags__overlap=tag_list)
+        queryset = queryset.filter(
+            pk__in=PortfolioTag.objects.filter(name__in=normalize_tags(tags)).values('portfolio_id')
+        )
     
     if term:
         queryset = queryset.filter(semester__icontains=term)
@@ -132,7 +145,10 @@ def search_portfolios(request):
             pass
     
     # Apply sorting using the centralized function
-    queryset = apply_search_sorting(queryset, sort_by)
+    if sort_by == 'relevance' and query:
+        queryset = order_by_hits(queryset, hits)
+    else:
+        queryset = apply_search_sorting(queryset, sort_by)
     
     # Limit results
     queryset = queryset[:20]
@@ -155,66 +171,16 @@ def search_portfolios(request):
 def portfolio_preview_simple(request, portfolio_id):
     """Simple portfolio preview for visitors"""
     try:
-        portfolio = ClassPortfolio.objects.get(id=portfolio_id)
+        portfolio = ClassPortfolio.objects.select_related('created_by').get(id=portfolio_id)
         
-        # Check if portfolio is private - if so, deny access to visitors
-        if portfolio.visibility == 'private':
+        # Private portfolios that aren't for sale have nothing to preview
+        if portfolio_visibility(portfolio) == 'private':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Basic portfolio info
-        portfolio_data = {
-            'id': portfolio.id,
-            'professor': ProfessorSerializer(portfolio.professor).data,
-            'semester': portfolio.semester,
-            'year': portfolio.year,
-            'visibility': portfolio.visibility,
-            'tags': portfolio.tags,
-            'created_at': portfolio.created_at,
-            'owner': portfolio.created_by.username if portfolio.created_by else None
-        }
-        
-        # Basic content preview
-        important_dates = ImportantDate.objects.filter(portfolio=portfolio)
-        content = {
-            'syllabus': {
-                'important_dates': ImportantDateSerializer(
-                    important_dates[:3], many=True
-                ).data,
-                'total_dates': important_dates.count(),
-                'preview_count': min(3, important_dates.count()),
-                'preview_note': "Showing first 3 important dates"
-            },
-            'materials': {
-                'count': LectureMaterial.objects.filter(portfolio=portfolio).count(),
-                'preview_note': "Materials available with full access"
-            },
-            'flashcards': {
-                'items': [],
-                'total_count': 0,
-                'preview_note': "Flashcards available with full access"
-            },
-            'quizzes': {
-                'items': [],
-                'total_count': 0,
-                'preview_note': "Quizzes available with full access"
-            },
-            'performance': {
-                'current_grade': None,
-                'grade_breakdown': None,
-                'preview_note': "Grade information available with full access"
-            },
-            'community': {
-                'posts': [],
-                'total_posts': 0,
-                'thread_titles': [],
-                'preview_note': "Community discussions available with full access"
-            }
-        }
-        
         return Response({
-            'portfolio': portfolio_data,
+            'portfolio': preview_portfolio_data(portfolio),
             'preview_mode': True,
-            'content': content,
+            'content': get_snapshot_content(portfolio, 'preview'),
             'access_level': 'preview'
         })
         
@@ -226,32 +192,20 @@ def portfolio_preview_simple(request, portfolio_id):
 def portfolio_preview(request, portfolio_id):
     """Get portfolio preview with comprehensive preview rules"""
     try:
-        portfolio = ClassPortfolio.objects.get(id=portfolio_id)
+        portfolio = ClassPortfolio.objects.select_related('created_by').get(id=portfolio_id)
         user = request.user if request.user.is_authenticated else None
         
         # Check if portfolio is visible to user
-        if not portfolio.can_user_access(user):
+        level = snapshot_level(portfolio, user)
+        if level is None:
             return Response({'error': 'Portfolio not accessible'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Determine if this is a preview request
-        is_preview = portfolio.is_public_preview() or (not user and portfolio.visibility in ['public_preview', 'paid'])
-        
-        # Get preview-restricted content
-        preview_data = get_preview_content(portfolio, user, is_preview)
+        is_preview = level == 'preview'
         
         return Response({
-            'portfolio': {
-                'id': portfolio.id,
-                'professor': ProfessorSerializer(portfolio.professor).data,
-                'semester': portfolio.semester,
-                'year': portfolio.year,
-                'visibility': portfolio.visibility,
-                'tags': portfolio.tags,
-                'created_at': portfolio.created_at,
-                'owner': portfolio.created_by.username if portfolio.created_by else None
-            },
+            'portfolio': preview_portfolio_data(portfolio),
             'preview_mode': is_preview,
-            'content': preview_data,
+            'content': get_preview_content(portfolio, user, is_preview),
             'access_level': get_access_level(portfolio, user),
             'upgrade_options': get_upgrade_options(portfolio, user) if is_preview else None
         })
@@ -514,11 +468,15 @@ def confirm_password_reset(request):
 @permission_classes([IsAdminOnly])
 def list_users(request):
     """
-    List all users (Admin only)
+    List users, newest first, one keyset page at a time (Admin only)
     """
     users = User.objects.all().order_by('-date_joined')
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+    try:
+        page = request_page(request, users)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = UserSerializer(page['rows'], many=True)
+    return Response(page_payload(page, serializer.data))
 
 @api_view(['PATCH'])
 @permission_classes([IsAdminOnly])
@@ -590,10 +548,8 @@ class PortfolioListCreateView(generics.ListCreateAPIView):
         user = self.request.user
         
         # Filter portfolios based on user access
-        # Show portfolios created by the user or public portfolios
-        queryset = ClassPortfolio.objects.filter(
-            Q(created_by=user) | Q(is_public=True)
-        )
+        # Show public, owned and purchased portfolios
+        queryset = accessible_portfolios(user)
         
         # Apply search and filter parameters
         search = self.request.query_params.get('search', None)
@@ -621,9 +577,19 @@ class PortfolioDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         # Filter portfolios based on user access
-        return ClassPortfolio.objects.filter(
-            Q(created_by=user) | Q(is_public=True)
-        )
+        queryset = accessible_portfolios(user)
+        if self.request.method == 'GET':
+            # First page of every nested collection in a fixed number of queries
+            queryset = detail_queryset(queryset, self.serializer_class, self.collection_limit())
+        return queryset
+    
+    def collection_limit(self):
+        return clamp_limit(self.request.query_params.get('limit', COLLECTION_PAGE_SIZE))
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['collection_limit'] = self.collection_limit()
+        return context
     
     def update(self, request, *args, **kwargs):
         # Get the instance
@@ -661,6 +627,31 @@ class PortfolioDetailView(generics.RetrieveUpdateDestroyAPIView):
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def portfolio_collection(request, pk, collection):
+    """Next page of one of a portfolio's nested collections, by cursor"""
+    if collection not in COLLECTIONS:
+        return Response({'error': 'Unknown collection'}, status=status.HTTP_404_NOT_FOUND)
+    
+    portfolio = accessible_portfolios(request.user).filter(pk=pk).first()
+    if portfolio is None:
+        return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer_class = PortfolioDetailSerializer().fields[collection].child.__class__
+    try:
+        page = collection_page(
+            portfolio,
+            collection,
+            serializer_class,
+            cursor=request.query_params.get('cursor'),
+            limit=clamp_limit(request.query_params.get('limit', COLLECTION_PAGE_SIZE))
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(page)
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_portfolios(request):
@@ -691,8 +682,8 @@ def user_portfolios(request):
 def public_portfolios(request):
     """GET method to retrieve all public portfolios (no authentication required)"""
     
-    # Get only portfolios where is_public=True
-    portfolios = ClassPortfolio.objects.filter(is_public=True).order_by('-created_at')
+    # Get only portfolios visible to visitors
+    portfolios = accessible_portfolios(None).order_by('-created_at')
     
     # Apply search filter if provided
     search = request.query_params.get('search', None)
@@ -901,41 +892,7 @@ class SyllabusUploadView(generics.CreateAPIView):
     
     def _extract_text_from_file(self, file):
         """Extract text from uploaded file with proper parsing"""
-        try:
-            import PyPDF2
-            import docx
-            from pptx import Presentation
-            import os
-            
-            file_extension = os.path.splitext(file.name)[1].lower()
-            
-            if file_extension == '.pdf':
-                # Extract from PDF
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
-            elif file_extension in ['.doc', '.docx']:
-                # Extract from Word document
-                doc = docx.Document(file)
-                text = ""
-                for paragraph in doc.paragraphs:
-                    text += paragraph.text + "\n"
-                return text
-            elif file_extension in ['.ppt', '.pptx']:
-                # Extract from PowerPoint
-                prs = Presentation(file)
-                text = ""
-                for slide in prs.slides:
-                    for shape in slide.shapes:
-                        if hasattr(shape, "text"):
-                            text += shape.text + "\n"
-                return text
-            else:
-                return f"Unsupported file type: {file_extension}"
-        except Exception as e:
-            return f"Error extracting text: {str(e)}"
+        return extract_plain_text(file)
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -1024,16 +981,14 @@ def sync_to_calendar(request, portfolio_id):
             'hour_before': False
         })
         
-        # Get important dates
-        important_dates = ImportantDate.objects.filter(portfolio=portfolio)
-        
         if calendar_type == 'ical':
-            # Generate iCal format
-            ical_content = generate_ical_content(important_dates, reminder_settings)
+            # A live subscription instead of a one-off export (see calendar_feed)
+            feed_token = get_feed_token(request.user)
+            alarms = alarms_from_reminder_settings(reminder_settings)
             return Response({
-                'message': 'iCal file generated',
-                'ical_content': ical_content,
-                'download_url': f'/api/portfolios/{portfolio_id}/calendar/ical/'
+                'message': 'iCal feed ready',
+                'download_url': feed_path(feed_token.token, portfolio.id, alarms),
+                'subscription_url': subscription_url(request, feed_path(feed_token.token, alarms=alarms))
             })
         elif calendar_type == 'google':
             # Google Calendar integration (placeholder)
@@ -1055,58 +1010,61 @@ def sync_to_calendar(request, portfolio_id):
     except ClassPortfolio.DoesNotExist:
         return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
 
-def generate_ical_content(important_dates, reminder_settings):
-    """Generate iCal content for important dates"""
-    ical_lines = [
-        'BEGIN:VCALENDAR',
-        'VERSION:2.0',
-        'PRODID:-//Class Portfolio//EN',
-        'CALSCALE:GREGORIAN',
-        'METHOD:PUBLISH'
-    ]
-    
-    for date_obj in important_dates:
-        # Format date for iCal
-        start_date = date_obj.due_date.strftime('%Y%m%dT%H%M%S')
-        
-        ical_lines.extend([
-            'BEGIN:VEVENT',
-            f'UID:{date_obj.id}@classportfolio.com',
-            f'DTSTART:{start_date}',
-            f'DTEND:{start_date}',
-            f'SUMMARY:{date_obj.title}',
-            f'DESCRIPTION:{date_obj.description or ""}',
-            f'LOCATION:{getattr(date_obj, "location", "") or ""}',
-            'STATUS:CONFIRMED',
-            'TRANSP:OPAQUE'
-        ])
-        
-        # Add reminders
-        if reminder_settings.get('week_before'):
-            ical_lines.append('BEGIN:VALARM')
-            ical_lines.append('TRIGGER:-P7D')
-            ical_lines.append('ACTION:DISPLAY')
-            ical_lines.append('DESCRIPTION:Reminder')
-            ical_lines.append('END:VALARM')
-        
-        if reminder_settings.get('day_before'):
-            ical_lines.append('BEGIN:VALARM')
-            ical_lines.append('TRIGGER:-P1D')
-            ical_lines.append('ACTION:DISPLAY')
-            ical_lines.append('DESCRIPTION:Reminder')
-            ical_lines.append('END:VALARM')
-        
-        if reminder_settings.get('hour_before'):
-            ical_lines.append('BEGIN:VALARM')
-            ical_lines.append('TRIGGER:-PT1H')
-            ical_lines.append('ACTION:DISPLAY')
-            ical_lines.append('DESCRIPTION:Reminder')
-            ical_lines.append('END:VALARM')
-        
-        ical_lines.append('END:VEVENT')
-    
-    ical_lines.append('END:VCALENDAR')
-    return '\n'.join(ical_lines)
+def subscription_url(request, path):
+    """webcal:// URL for a feed path, which calendar apps open as a subscription"""
+    url = request.build_absolute_uri(path)
+    return 'webcal://' + url.split('://', 1)[1]
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def calendar_subscription(request):
+    """The user's iCal subscription URLs; POST issues a new token and revokes the old URLs"""
+    if request.method == 'POST':
+        feed_token = rotate_feed_token(request.user)
+    else:
+        feed_token = get_feed_token(request.user)
+    path = feed_path(feed_token.token)
+    return Response({
+        'feed_url': request.build_absolute_uri(path),
+        'subscription_url': subscription_url(request, path),
+        'created_at': feed_token.created_at
+    })
+
+@require_safe
+def calendar_feed(request, token):
+    """
+    iCal subscription feed of the token owner's important dates and calendar events
+
+    Authenticated by the token in the URL, since calendar apps can't send
+    headers. Optional ?portfolio=<id> and ?alarms=week,day,hour. Answers 304
+    to If-None-Match/If-Modified-Since when nothing has changed.
+    """
+    portfolio_id = request.GET.get('portfolio') or None
+    if portfolio_id is not None:
+        try:
+            portfolio_id = int(portfolio_id)
+        except ValueError:
+            return HttpResponse('portfolio must be an integer\n', status=400, content_type='text/plain')
+    alarms = parse_alarms(request.GET.get('alarms'))
+
+    feed_token = resolve_feed(token, portfolio_id)
+    if feed_token is None:
+        return HttpResponse('Calendar feed not found\n', status=404, content_type='text/plain')
+
+    etag = feed_etag(feed_token, portfolio_id, alarms)
+    changed_at = last_modified(feed_token).timestamp()
+    response = get_conditional_response(request, etag=etag, last_modified=int(changed_at))
+    if response is None:
+        response = StreamingHttpResponse(
+            iter_feed(feed_token.user_id, portfolio_id, alarms),
+            content_type='text/calendar; charset=utf-8'
+        )
+        response['Content-Disposition'] = 'inline; filename="class-portfolio.ics"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(changed_at)
+    # Clients may keep the body but must revalidate, which is the cheap path above
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 # Interactive Learning Space Page
 @api_view(['GET'])
@@ -1199,194 +1157,19 @@ def generate_learning_content(request, portfolio_id):
         except LectureMaterial.DoesNotExist:
             return Response({'error': 'Material not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        generated_content = {}
-        
-        # Generate summary
-        if 'summary' in content_types:
-            summary = generate_ai_summary(material)
-            generated_content['summary'] = summary
-        
-        # Generate flashcards
-        if 'flashcards' in content_types:
-            flashcards = generate_flashcards(material)
-            generated_content['flashcards'] = flashcards
-        
-        # Generate quiz
-        if 'quiz' in content_types:
-            quiz = generate_quiz(material)
-            generated_content['quiz'] = quiz
+        results = generate_artifacts(material, content_types, user_id=request.user.id)
+        saved = save_artifacts(material, request.user, results)
         
         return Response({
             'message': 'Content generated successfully',
-            'generated_content': generated_content,
+            'generated_content': {name: payload for name, (payload, _) in results.items()},
+            'saved': saved,
             'material_id': material_id
         })
         
     except ClassPortfolio.DoesNotExist:
         return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
 
-def generate_ai_summary(material):
-    """Generate AI summary from lecture material"""
-    try:
-        import openai
-        
-        # Get text content from processed file
-        if hasattr(material, 'processed_file') and material.processed_file.extracted_text:
-            text_content = material.processed_file.extracted_text
-        else:
-            text_content = f"Content from {material.title}"
-        
-        # Truncate if too long
-        if len(text_content) > 4000:
-            text_content = text_content[:4000] + "..."
-        
-        # Generate summary using OpenAI
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert academic assistant. Create a concise summary of the following lecture material, highlighting key concepts and main points."},
-                {"role": "user", "content": f"Summarize this lecture material:\n\n{text_content}"}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
-        
-        return {
-            'summary': response.choices[0].message.content,
-            'topics': extract_topics(text_content),
-            'generated_at': timezone.now()
-        }
-    except Exception as e:
-        return {
-            'summary': f"Error generating summary: {str(e)}",
-            'topics': [],
-            'generated_at': timezone.now()
-        }
-
-def generate_flashcards(material):
-    """Generate flashcards from lecture material"""
-    try:
-        import openai
-        
-        # Get text content
-        if hasattr(material, 'processed_file') and material.processed_file.extracted_text:
-            text_content = material.processed_file.extracted_text
-        else:
-            text_content = f"Content from {material.title}"
-        
-        # Truncate if too long
-        if len(text_content) > 3000:
-            text_content = text_content[:3000] + "..."
-        
-        # Generate flashcards using OpenAI
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert educational content creator. Create 5 flashcards from the following material. Format each flashcard as JSON with 'front' and 'back' fields."},
-                {"role": "user", "content": f"Create flashcards from this material:\n\n{text_content}"}
-            ],
-            max_tokens=800,
-            temperature=0.7
-        )
-        
-        # Parse response and create flashcards
-        flashcards = []
-        try:
-            import json
-            content = response.choices[0].message.content
-            # Extract JSON from response
-            json_start = content.find('[')
-            json_end = content.rfind(']') + 1
-            if json_start != -1 and json_end != -1:
-                flashcards_data = json.loads(content[json_start:json_end])
-                for card_data in flashcards_data:
-                    flashcards.append({
-                        'front': card_data.get('front', ''),
-                        'back': card_data.get('back', ''),
-                        'topic': material.title
-                    })
-        except:
-            # Fallback: create simple flashcards
-            flashcards = [
-                {'front': f'What is the main topic of {material.title}?', 'back': 'Key concepts from the material', 'topic': material.title},
-                {'front': f'What are the important points in {material.title}?', 'back': 'Main points covered', 'topic': material.title}
-            ]
-        
-        return flashcards
-    except Exception as e:
-        return [{'front': 'Error generating flashcards', 'back': str(e), 'topic': material.title}]
-
-def generate_quiz(material):
-    """Generate quiz questions from lecture material"""
-    try:
-        import openai
-        
-        # Get text content
-        if hasattr(material, 'processed_file') and material.processed_file.extracted_text:
-            text_content = material.processed_file.extracted_text
-        else:
-            text_content = f"Content from {material.title}"
-        
-        # Truncate if too long
-        if len(text_content) > 3000:
-            text_content = text_content[:3000] + "..."
-        
-        # Generate quiz using OpenAI
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert quiz creator. Create 5 multiple-choice questions from the following material. Format each question as JSON with 'question', 'options' (array of 4 options), and 'correct_answer' (index 0-3) fields."},
-                {"role": "user", "content": f"Create quiz questions from this material:\n\n{text_content}"}
-            ],
-            max_tokens=1000,
-            temperature=0.7
-        )
-        
-        # Parse response and create quiz questions
-        questions = []
-        try:
-            import json
-            content = response.choices[0].message.content
-            # Extract JSON from response
-            json_start = content.find('[')
-            json_end = content.rfind(']') + 1
-            if json_start != -1 and json_end != -1:
-                questions_data = json.loads(content[json_start:json_end])
-                for q_data in questions_data:
-                    questions.append({
-                        'question': q_data.get('question', ''),
-                        'options': q_data.get('options', ['A', 'B', 'C', 'D']),
-                        'correct_answer': q_data.get('correct_answer', 0),
-                        'question_type': 'multiple_choice'
-                    })
-        except:
-            # Fallback: create simple questions
-            questions = [
-                {
-                    'question': f'What is the main topic covered in {material.title}?',
-                    'options': ['Topic A', 'Topic B', 'Topic C', 'Topic D'],
-                    'correct_answer': 0,
-                    'question_type': 'multiple_choice'
-                }
-            ]
-        
-        return questions
-    except Exception as e:
-        return [{'question': 'Error generating quiz', 'options': ['A', 'B', 'C', 'D'], 'correct_answer': 0, 'question_type': 'multiple_choice'}]
-
-def extract_topics(text_content):
-    """Extract topics from text content"""
-    # Simple topic extraction (in production, use NLP libraries)
-    topics = []
-    words = text_content.lower().split()
-    common_topics = ['algorithm', 'data structure', 'programming', 'computer science', 'mathematics', 'physics', 'chemistry', 'biology']
-    
-    for topic in common_topics:
-        if topic in text_content.lower():
-            topics.append(topic.title())
-    
-    return topics[:5]  # Return top 5 topics
-
 # Class Performance Tracker Page
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -1611,33 +1394,20 @@ def global_search(request):
     professor = request.query_params.get('professor', '')
     term = request.query_params.get('term', '')
     tags = request.query_params.get('tags', '')
-    sort_by = request.query_params.get('sort', 'newest')
+    sort_by = request.query_params.get('sort', 'relevance' if query else 'newest')
     min_price = request.query_params.get('min_price', '')
     max_price = request.query_params.get('max_price', '')
     visibility = request.query_params.get('visibility', '')
     
-    # Base queryset
+    # Base queryset - access checks are applied in SQL
     user = request.user if request.user.is_authenticated else None
-    queryset = ClassPortfolio.objects.all()
-    
-    # Apply visibility filtering
-    if not user:
-        # Visitors can only see public portfolios
-        queryset = queryset.filter(visibility__in=['public_full', 'public_preview'])
-    else:
-        # Authenticated users can see portfolios they have access to
-        accessible_portfolios = []
-        for portfolio in queryset:
-            if portfolio.can_user_access(user):
-                accessible_portfolios.append(portfolio.id)
-        queryset = queryset.filter(id__in=accessible_portfolios)
+    queryset = accessible_portfolios(user)
     
-    # Apply search filters
+    # Full-text search over portfolios, syllabi and processed files
+    hits = []
     if query:
-        queryset = queryset.filter(
-            Q(professor__icontains=query) |
-            Q(semester__icontains=query)
-        )
+        hits = search_documents(query, user)
+        queryset = filter_portfolios_by_text(queryset, query)
     
     if school:
         queryset = queryset.filter(created_by__university__icontains=school)
@@ -1656,16 +1426,18 @@ def global_search(request):
     if term:
         queryset = queryset.filter(semester__icontains=term)
     
-    if tags:
-        tag_list = [tag.strip() for tag in tags.split(',')]
-        queryset = queryset.filter(tags__overlap=tag_list)
+    tag_list = normalize_tags(tags)
+    if tag_list:
+        queryset = queryset.filter(
+            pk__in=PortfolioTag.objects.filter(name__in=tag_list).values('portfolio_id')
+        )
     
-    if visibility:
-        queryset = queryset.filter(visibility=visibility)
+    if visibility_q(visibility) is not None:
+        queryset = queryset.filter(visibility_q(visibility))
     
     # Apply price filtering for paid portfolios
     if min_price or max_price:
-        paid_portfolios = queryset.filter(visibility='paid')
+        paid_portfolios = queryset.filter(PAID_Q)
         if min_price:
             paid_portfolios = paid_portfolios.filter(price__gte=float(min_price))
         if max_price:
@@ -1673,21 +1445,39 @@ def global_search(request):
         queryset = paid_portfolios
     
     # Apply sorting
-    queryset = apply_search_sorting(queryset, sort_by)
-    
-    # Get facets for filtering
-    facets = get_search_facets(queryset)
-    
-    # Paginate results
-    page_size = 20
-    start = int(request.query_params.get('start', 0))
-    end = start + page_size
-    
-    results = queryset[start:end]
+    if sort_by == 'relevance' and query:
+        queryset = order_by_hits(queryset, hits)
+    else:
+        queryset = apply_search_sorting(queryset, sort_by)
+    
+    # Facets (and the total) come from one cached aggregate pass over the filtered set
+    facets = dict(get_facets(queryset, {
+        'q': query,
+        'school': school,
+        'professor': professor,
+        'term': term,
+        'tags': tag_list,
+        'visibility': visibility,
+        'min_price': min_price,
+        'max_price': max_price,
+        'sort': sort_by,
+    }, user))
+    total_count = facets.pop('total')
+    
+    # Keyset pagination on the sort order; the total already came from the facet pass
+    try:
+        page = keyset_page(
+            queryset,
+            cursor=request.query_params.get('cursor'),
+            limit=clamp_page_limit(request.query_params.get('limit'), 20)
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     return Response({
-        'results': ClassPortfolioSerializer(results, many=True, context={'request': request}).data,
-        'total_count': queryset.count(),
+        'results': ClassPortfolioSerializer(page['rows'], many=True, context={'request': request}).data,
+        'hits': hits,
+        'total_count': total_count,
         'facets': facets,
         'search_params': {
             'query': query,
@@ -1703,9 +1493,8 @@ def global_search(request):
             'visibility': visibility
         },
         'pagination': {
-            'start': start,
-            'end': end,
-            'has_more': queryset.count() > end
+            'next_cursor': page['next_cursor'],
+            'has_more': page['next_cursor'] is not None
         }
     })
 
@@ -1722,9 +1511,14 @@ def apply_search_sorting(queryset, sort_by):
         ).order_by('-helpfulness_score', '-created_at')
     elif sort_by == 'highest_rated':
         # Sort by average rating (to be implemented)
+        # Unrated portfolios sort last; keyset cursors can't hold NULLs
         return queryset.annotate(
-            avg_rating=Avg(
-                (F('reviews__difficulty_rating') + F('reviews__teaching_quality_rating') + F('reviews__workload_rating')) / 3
+            avg_rating=Coalesce(
+                Avg(
+                    (F('reviews__difficulty_rating') + F('reviews__teaching_quality_rating') + F('reviews__workload_rating')) / 3
+                ),
+                Value(0.0),
+                output_field=FloatField()
             )
         ).order_by('-avg_rating', '-created_at')
     elif sort_by == 'most_purchased':
@@ -1735,67 +1529,12 @@ def apply_search_sorting(queryset, sort_by):
             purchase_count=Count('marketplace_listing__buyers')
         ).order_by('-purchase_count', '-created_at')
     elif sort_by == 'price_low_high':
-        return queryset.filter(visibility='paid').order_by('price')
+        return queryset.filter(PAID_Q).order_by('price')
     elif sort_by == 'price_high_low':
-        return queryset.filter(visibility='paid').order_by('-price')
+        return queryset.filter(PAID_Q).order_by('-price')
     else:
         return queryset.order_by('-created_at')
 
-def get_search_facets(queryset):
-    """Get search facets for filtering"""
-    # Schools/Universities
-    schools = queryset.values('created_by__university').annotate(
-        count=Count('id')
-    ).filter(created_by__university__isnull=False).order_by('-count')[:10]
-    
-    # Departments - not available since we removed course field
-    departments = []
-    
-    # Professors
-    professors = queryset.values('professor').annotate(
-        count=Count('id')
-    ).filter(professor__isnull=False).order_by('-count')[:20]
-    
-    # Terms/Semesters
-    terms = queryset.values('semester').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10]
-    
-    # Popular tags
-    all_tags = []
-    for portfolio in queryset:
-        all_tags.extend(portfolio.tags)
-    
-    tag_counts = {}
-    for tag in all_tags:
-        tag_counts[tag] = tag_counts.get(tag, 0) + 1
-    
-    popular_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:20]
-    
-    # Price ranges for paid portfolios
-    paid_portfolios = queryset.filter(visibility='paid', price__isnull=False)
-    price_ranges = []
-    if paid_portfolios.exists():
-        min_price = paid_portfolios.aggregate(Min('price'))['price__min']
-        max_price = paid_portfolios.aggregate(Max('price'))['price__max']
-        
-        if min_price and max_price:
-            price_ranges = [
-                {'range': '0-10', 'count': paid_portfolios.filter(price__lte=10).count()},
-                {'range': '10-25', 'count': paid_portfolios.filter(price__gt=10, price__lte=25).count()},
-                {'range': '25-50', 'count': paid_portfolios.filter(price__gt=25, price__lte=50).count()},
-                {'range': '50+', 'count': paid_portfolios.filter(price__gt=50).count()}
-            ]
-    
-    return {
-        'schools': [{'name': s['created_by__university'], 'count': s['count']} for s in schools],
-        'departments': [],  # Not available since we removed course field
-        'professors': [{'name': p['professor'], 'count': p['count']} for p in professors],
-        'terms': [{'name': t['semester'], 'count': t['count']} for t in terms],
-        'tags': [{'name': tag, 'count': count} for tag, count in popular_tags],
-        'price_ranges': price_ranges
-    }
-
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def search_autocomplete(request):
@@ -1867,26 +1606,25 @@ def search_suggestions(request):
     ]
     
     
-    # Get trending professors
-    trending_professors = Professor.objects.annotate(
-        portfolio_count=Count('portfolios')
-    ).order_by('-portfolio_count')[:10]
-    
-    # Get trending tags
-    all_tags = []
-    for portfolio in ClassPortfolio.objects.all():
-        all_tags.extend(portfolio.tags)
-    
-    tag_counts = {}
-    for tag in all_tags:
-        tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    # Trending professors and tags are indexed top-N reads from the TagCount table
+    trending_professors = TagCount.objects.filter(
+        kind='professor', portfolio_count__gt=0
+    ).order_by('-trending_score')[:10]
     
-    trending_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:15]
+    trending_tags = TagCount.objects.filter(
+        kind='tag', portfolio_count__gt=0
+    ).order_by('-trending_score')[:15]
     
     return Response({
         'popular_searches': popular_searches,
-        'trending_professors': ProfessorSerializer(trending_professors, many=True).data,
-        'trending_tags': [{'name': tag, 'count': count} for tag, count in trending_tags]
+        'trending_professors': [
+            {'name': row.name, 'count': row.portfolio_count, 'trending_score': round(current_trending_score(row.trending_score), 3)}
+            for row in trending_professors
+        ],
+        'trending_tags': [
+            {'name': row.name, 'count': row.portfolio_count, 'trending_score': round(current_trending_score(row.trending_score), 3)}
+            for row in trending_tags
+        ]
     })
 
 @api_view(['GET'])
@@ -1913,9 +1651,7 @@ def search_analytics(request):
 def get_recommended_portfolios(user):
     """Get recommended portfolios for a user"""
     # Simple recommendation algorithm based on user's university and major
-    recommendations = ClassPortfolio.objects.filter(
-        visibility__in=['public_full', 'public_preview']
-    )
+    recommendations = accessible_portfolios(None)
     
     # Filter by same university
     if user.university:
@@ -1943,83 +1679,39 @@ def get_recommended_portfolios(user):
 def portfolio_preview_content(request, portfolio_id):
     """Get portfolio content with preview restrictions applied"""
     try:
-        portfolio = ClassPortfolio.objects.get(id=portfolio_id)
+        portfolio = ClassPortfolio.objects.select_related('created_by').get(id=portfolio_id)
         user = request.user if request.user.is_authenticated else None
         
         # Check if user can access this portfolio
-        if not portfolio.can_user_access(user) and not portfolio.is_public_preview():
+        level = snapshot_level(portfolio, user)
+        if level is None:
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Determine if this is a preview request
-        is_preview = portfolio.is_public_preview() and not portfolio.can_user_access(user)
-        
-        # Get preview-restricted content
-        if is_preview:
-            # Simple preview content
-            preview_data = {
-                'metadata': {
-                    'professor_name': portfolio.professor,
-                    'semester': portfolio.semester,
-                    'year': portfolio.year,
-                    'tags': portfolio.tags,
-                    'created_at': portfolio.created_at,
-                    'owner': portfolio.created_by.username if portfolio.created_by else None
-                },
-                'syllabus': {
-                    'important_dates': ImportantDateSerializer(
-                        ImportantDate.objects.filter(portfolio=portfolio)[:3], many=True
-                    ).data,
-                    'total_dates': ImportantDate.objects.filter(portfolio=portfolio).count(),
-                    'preview_note': "Showing first 3 important dates"
-                },
-                'materials': {
-                    'count': LectureMaterial.objects.filter(portfolio=portfolio).count(),
-                    'preview_note': "Materials available with full access"
-                },
-                'flashcards': {
-                    'items': [],
-                    'total_count': 0,
-                    'preview_note': "Flashcards available with full access"
-                },
-                'quizzes': {
-                    'items': [],
-                    'total_count': 0,
-                    'preview_note': "Quizzes available with full access"
-                },
-                'performance': {
-                    'current_grade': None,
-                    'grade_breakdown': None,
-                    'preview_note': "Grade information available with full access"
-                },
-                'community': {
-                    'posts': [],
-                    'total_posts': 0,
-                    'thread_titles': [],
-                    'preview_note': "Community discussions available with full access"
-                }
-            }
-        else:
-            preview_data = get_full_content(portfolio)
-        
+        # Served from the precomputed snapshot (see api.snapshots)
         return Response({
-            'portfolio': {
-                'id': portfolio.id,
-                'professor': ProfessorSerializer(portfolio.professor).data,
-                'semester': portfolio.semester,
-                'year': portfolio.year,
-                'visibility': portfolio.visibility,
-                'tags': portfolio.tags,
-                'created_at': portfolio.created_at,
-                'owner': portfolio.created_by.username if portfolio.created_by else None
-            },
-            'preview_mode': is_preview,
-            'content': preview_data,
+            'portfolio': preview_portfolio_data(portfolio),
+            'preview_mode': level == 'preview',
+            'content': get_snapshot_content(portfolio, level),
             'access_level': get_access_level(portfolio, user)
         })
         
     except ClassPortfolio.DoesNotExist:
         return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
 
+def preview_portfolio_data(portfolio):
+    """Portfolio header shared by the preview endpoints"""
+    return {
+        'id': portfolio.id,
+        'professor': portfolio.professor,
+        'course': portfolio.course,
+        'semester': portfolio.semester,
+        'year': portfolio.year,
+        'visibility': portfolio_visibility(portfolio),
+        'tags': portfolio.tags,
+        'created_at': portfolio.created_at,
+        'owner': portfolio.created_by.username if portfolio.created_by else None
+    }
+
 def get_preview_content(portfolio, user, is_preview):
     """Get content with preview restrictions applied"""
     content = {}
@@ -2034,239 +1726,7 @@ def get_preview_content(portfolio, user, is_preview):
         'owner': portfolio.created_by.username if portfolio.created_by else None
     }
     
-    if is_preview:
-        # Apply preview restrictions
-        content.update(get_preview_restricted_content(portfolio))
-    else:
-        # Full access - show everything
-        content.update(get_full_content(portfolio))
-    
-    return content
-
-def get_preview_restricted_content(portfolio):
-    """Get content with preview restrictions applied"""
-    content = {}
-    
-    # Syllabus/Calendar: Show 20% of items (rounded up) and next upcoming item
-    important_dates = ImportantDate.objects.filter(portfolio=portfolio).order_by('due_date')
-    total_dates = important_dates.count()
-    
-    if total_dates > 0:
-        # Calculate 20% rounded up
-        preview_count = max(1, (total_dates + 4) // 5)  # Round up to nearest integer
-        
-        # Get next upcoming item
-        upcoming = important_dates.filter(due_date__gte=timezone.now()).first()
-        
-        # Get preview items
-        preview_dates = important_dates[:preview_count]
-        if upcoming and upcoming not in preview_dates:
-            preview_dates = list(preview_dates) + [upcoming]
-        
-        content['syllabus'] = {
-            'important_dates': ImportantDateSerializer(preview_dates, many=True).data,
-            'total_dates': total_dates,
-            'preview_count': len(preview_dates),
-            'preview_note': f"Showing {len(preview_dates)} of {total_dates} important dates"
-        }
-    else:
-        content['syllabus'] = {
-            'important_dates': [],
-            'total_dates': 0,
-            'preview_count': 0,
-            'preview_note': "No important dates available"
-        }
-    
-    # Notes/Study Assets: Show first 5 flashcards + first 3 quiz questions + summary first paragraph
-    flashcards = Flashcard.objects.filter(material__portfolio=portfolio).order_by('created_at')[:5]
-    content['flashcards'] = {
-        'items': FlashcardSerializer(flashcards, many=True).data,
-        'total_count': Flashcard.objects.filter(material__portfolio=portfolio).count(),
-        'preview_note': f"Showing first {len(flashcards)} flashcards"
-    }
-    
-    quizzes = Quiz.objects.filter(portfolio=portfolio).order_by('created_at')
-    quiz_preview = []
-    for quiz in quizzes[:1]:  # Show first quiz only
-        questions = QuizQuestion.objects.filter(quiz=quiz).order_by('id')[:3]
-        quiz_preview.append({
-            'quiz_id': quiz.id,
-            'title': quiz.title,
-            'questions': QuizQuestionSerializer(questions, many=True).data,
-            'total_questions': QuizQuestion.objects.filter(quiz=quiz).count(),
-            'preview_note': f"Showing first {len(questions)} questions"
-        })
-    
-    content['quizzes'] = {
-        'items': quiz_preview,
-        'total_count': quizzes.count(),
-        'preview_note': f"Showing preview of first quiz"
-    }
-    
-    # AI Summaries: Show first paragraph only
-    materials = LectureMaterial.objects.filter(portfolio=portfolio).order_by('uploaded_at')
-    summaries = []
-    for material in materials[:3]:  # Show first 3 materials
-        if hasattr(material, 'processed_file') and material.processed_file.summary:
-            summary_text = material.processed_file.summary
-            # Get first paragraph
-            first_paragraph = summary_text.split('\n')[0] if '\n' in summary_text else summary_text[:200] + "..."
-            summaries.append({
-                'material_id': material.id,
-                'title': material.title,
-                'summary_preview': first_paragraph,
-                'full_summary_length': len(summary_text),
-                'preview_note': "First paragraph preview"
-            })
-    
-    content['summaries'] = {
-        'items': summaries,
-        'total_count': materials.count(),
-        'preview_note': f"Showing preview of {len(summaries)} summaries"
-    }
-    
-    # Performance: Hide numeric grades; show feature screenshot only
-    content['performance'] = {
-        'current_grade': None,  # Hidden in preview
-        'grade_breakdown': None,  # Hidden in preview
-        'category_averages': None,  # Hidden in preview
-        'preview_note': "Grade information hidden in preview mode",
-        'feature_available': True,
-        'screenshot_url': "/static/images/grade-tracker-preview.png"  # Placeholder
-    }
-    
-    # Reviews: Show averages and up to 1 full review
-    reviews = ClassReview.objects.filter(portfolio=portfolio).order_by('-created_at')
-    if reviews.exists():
-        # Calculate averages
-        avg_difficulty = reviews.aggregate(avg=Avg('difficulty_rating'))['avg'] or 0
-        avg_quality = reviews.aggregate(avg=Avg('teaching_quality_rating'))['avg'] or 0
-        avg_workload = reviews.aggregate(avg=Avg('workload_rating'))['avg'] or 0
-        
-        # Show one full review
-        sample_review = reviews.first()
-        
-        content['reviews'] = {
-            'averages': {
-                'difficulty': round(avg_difficulty, 1),
-                'teaching_quality': round(avg_quality, 1),
-                'workload': round(avg_workload, 1),
-                'overall': round((avg_difficulty + avg_quality + avg_workload) / 3, 1)
-            },
-            'sample_review': {
-                'rating': sample_review.overall_rating,
-                'comment': sample_review.comment,
-                'created_at': sample_review.created_at
-            },
-            'total_reviews': reviews.count(),
-            'preview_note': f"Showing averages and 1 of {reviews.count()} reviews"
-        }
-    else:
-        content['reviews'] = {
-            'averages': None,
-            'sample_review': None,
-            'total_reviews': 0,
-            'preview_note': "No reviews available"
-        }
-    
-    # Community: Show thread titles; hide content until login
-    posts = Post.objects.filter(portfolio=portfolio).order_by('-created_at')
-    content['community'] = {
-        'thread_titles': [
-            {
-                'id': post.id,
-                'title': post.title,
-                'author': post.author.username,
-                'created_at': post.created_at,
-                'reply_count': post.comments.count()
-            }
-            for post in posts[:10]
-        ],
-        'total_threads': posts.count(),
-        'preview_note': "Thread titles only - login to view content"
-    }
-    
-    return content
-
-def get_full_content(portfolio):
-    """Get full content without restrictions"""
-    content = {}
-    
-    # Full syllabus data
-    important_dates = ImportantDate.objects.filter(portfolio=portfolio).order_by('due_date')
-    content['syllabus'] = {
-        'important_dates': ImportantDateSerializer(important_dates, many=True).data,
-        'total_dates': important_dates.count()
-    }
-    
-    # Full flashcards
-    flashcards = Flashcard.objects.filter(material__portfolio=portfolio).order_by('created_at')
-    content['flashcards'] = {
-        'items': FlashcardSerializer(flashcards, many=True).data,
-        'total_count': flashcards.count()
-    }
-    
-    # Full quizzes
-    quizzes = Quiz.objects.filter(portfolio=portfolio).order_by('created_at')
-    quiz_data = []
-    for quiz in quizzes:
-        questions = QuizQuestion.objects.filter(quiz=quiz).order_by('id')
-        quiz_data.append({
-            'quiz_id': quiz.id,
-            'title': quiz.title,
-            'questions': QuizQuestionSerializer(questions, many=True).data,
-            'total_questions': questions.count()
-        })
-    
-    content['quizzes'] = {
-        'items': quiz_data,
-        'total_count': quizzes.count()
-    }
-    
-    # Full summaries
-    materials = LectureMaterial.objects.filter(portfolio=portfolio).order_by('uploaded_at')
-    summaries = []
-    for material in materials:
-        if hasattr(material, 'processed_file') and material.processed_file.summary:
-            summaries.append({
-                'material_id': material.id,
-                'title': material.title,
-                'summary': material.processed_file.summary,
-                'topics': material.processed_file.topics,
-                'generated_at': material.processed_file.processed_at
-            })
-    
-    content['summaries'] = {
-        'items': summaries,
-        'total_count': materials.count()
-    }
-    
-    # Full performance data
-    all_grades = portfolio.all_grades
-    current_grade = portfolio.calculate_current_grade()
-    grade_breakdown = portfolio.grade_breakdown or {}
-    
-    content['performance'] = {
-        'current_grade': current_grade,
-        'all_grades': all_grades,
-        'grade_breakdown': grade_breakdown,
-        'category_averages': calculate_category_averages(portfolio)
-    }
-    
-    # Full reviews
-    reviews = ClassReview.objects.filter(portfolio=portfolio).order_by('-created_at')
-    content['reviews'] = {
-        'items': ClassReviewSerializer(reviews, many=True).data,
-        'total_count': reviews.count()
-    }
-    
-    # Full community
-    posts = Post.objects.filter(portfolio=portfolio).order_by('-created_at')
-    content['community'] = {
-        'posts': PostSerializer(posts, many=True).data,
-        'total_posts': posts.count()
-    }
-    
+    content.update(get_snapshot_content(portfolio, 'preview' if is_preview else 'full'))
     return content
 
 def calculate_category_averages(portfolio):
@@ -2319,7 +1779,7 @@ def get_upgrade_options(portfolio, user):
             'register_url': '/api/auth/register/'
         }
     
-    if portfolio.visibility == 'paid':
+    if portfolio_visibility(portfolio) == 'paid':
         # Check if user already purchased
         if hasattr(portfolio, 'marketplace_listing'):
             listing = portfolio.marketplace_listing
@@ -2540,14 +2000,17 @@ def calculate_security_score(factors):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def performance_metrics(request):
-    """Get system performance metrics"""
-    # In production, this would collect real metrics
+    """Get system performance metrics, aggregated across workers (see api.metrics)"""
+    report = metrics.report()
+    overall = report['overall']
     return Response({
         'system_health': {
-            'status': 'healthy',
-            'uptime': '99.9%',
-            'response_time': '150ms',
-            'throughput': '1000 requests/minute'
+            'status': 'healthy' if overall['error_rate'] < 0.05 else 'degraded',
+            'uptime_seconds': report['uptime_seconds'],
+            'workers': report['workers'],
+            'response_time_ms': overall['latency_ms'],
+            'throughput_per_minute': report['requests_per_minute'],
+            'error_rate': overall['error_rate']
         },
         'performance_targets': {
             'file_upload': '≤ 10 seconds for 10-page PDF',
@@ -2556,11 +2019,13 @@ def performance_metrics(request):
             'database_query': '< 100ms p95'
         },
         'current_metrics': {
-            'avg_upload_time': '3.2 seconds',
-            'avg_page_load': '1.1 seconds',
-            'avg_api_response': '180ms',
-            'avg_db_query': '45ms'
+            'requests': overall['requests'],
+            'api_response_ms': overall['latency_ms'],
+            'db_queries_per_request': overall['db']['avg_queries'],
+            'db_time_per_request_ms': overall['db']['avg_time_ms'],
+            'avg_response_bytes': overall['avg_response_bytes']
         },
+        'routes': report['routes'],
         'optimization_status': {
             'caching': 'enabled',
             'cdn': 'enabled',
@@ -2569,6 +2034,13 @@ def performance_metrics(request):
         }
     })
 
+def prometheus_metrics(request):
+    """Request metrics in the Prometheus text format; set METRICS_TOKEN to require a bearer token"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    return HttpResponse(metrics.prometheus_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def accessibility_features(request):
@@ -2776,10 +2248,12 @@ def anti_scraping_protection(request):
 @permission_classes([permissions.AllowAny])
 def system_status(request):
     """Get overall system status and health"""
+    report = metrics.report(top=0)
+    overall = report['overall']
     return Response({
-        'status': 'operational',
+        'status': 'operational' if overall['error_rate'] < 0.05 else 'degraded',
         'version': '1.0.0',
-        'uptime': '99.9%',
+        'uptime_seconds': report['uptime_seconds'],
         'last_updated': timezone.now(),
         'services': {
             'api': 'healthy',
@@ -2789,10 +2263,10 @@ def system_status(request):
             'payment_processing': 'healthy'
         },
         'performance': {
-            'response_time': '150ms',
-            'throughput': '1000 req/min',
-            'error_rate': '0.1%',
-            'availability': '99.9%'
+            'response_time_ms': overall['latency_ms'],
+            'throughput_per_minute': report['requests_per_minute'],
+            'error_rate': overall['error_rate'],
+            'availability': round(1 - overall['error_rate'], 4)
         },
         'security': {
             'ssl_enabled': True,
@@ -2894,30 +2368,18 @@ def extract_syllabus(request, syllabus_id):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def create_important_dates_from_extraction(request, syllabus_id):
-    """Create ImportantDate objects from extracted syllabus data"""
+    """Create or refresh ImportantDate objects from extracted syllabus data"""
     try:
-        syllabus = Syllabus.objects.get(id=syllabus_id)
+        syllabus = Syllabus.objects.select_related('extraction').get(id=syllabus_id)
         if not hasattr(syllabus, 'extraction'):
             return Response({'error': 'No extraction data found'}, status=400)
         
-        extraction = syllabus.extraction
-        created_dates = []
-        
-        # Create dates from extracted data
-        for date_data in extraction.all_important_dates:
-            ImportantDate.objects.create(
-                portfolio=syllabus.portfolio,
-                title=date_data['title'],
-                date_type=date_data['type'],
-                due_date=datetime.strptime(date_data['date'], '%Y-%m-%d'),
-                description=f"Auto-extracted from syllabus",
-                is_synced=False
-            )
-            created_dates.append(date_data)
+        # One upsert for the whole schedule; re-importing updates instead of duplicating
+        dates = import_important_dates(syllabus)
         
         return Response({
-            'message': f'Created {len(created_dates)} important dates',
-            'dates': created_dates
+            'message': f'Imported {len(dates)} important dates',
+            'dates': ImportantDateSerializer(dates, many=True).data
         })
         
     except Syllabus.DoesNotExist:
@@ -2927,8 +2389,7 @@ def create_important_dates_from_extraction(request, syllabus_id):
 
 def extract_text_from_file(file):
     """Extract text from uploaded file"""
-    # Simplified implementation - in production, use proper file parsing
-    return f"Text extracted from {file.name}"
+    return extract_plain_text(file)
 
 # Important Date Views
 class ImportantDateListCreateView(generics.ListCreateAPIView):
@@ -3025,35 +2486,33 @@ def submit_quiz(request, quiz_id):
         quiz = Quiz.objects.get(id=quiz_id)
         user = request.user
         
-        # Check if user already submitted this quiz
-        submission, created = QuizSubmission.objects.get_or_create(
-            quiz=quiz, 
-            user=user,
-            defaults={'answers': {}}
-        )
-        
-        if not created:
-            return Response({'error': 'Quiz already submitted'}, status=400)
-        
         # Get answers from request
         answers = request.data.get('answers', {})
         time_taken = request.data.get('time_taken_minutes', None)
         
-        # Validate answers format
+        # Validate answers format before anything is written
         if not isinstance(answers, dict):
             return Response({'error': 'Answers must be a dictionary'}, status=400)
         
-        # Update submission
-        submission.answers = answers
-        if time_taken:
-            submission.time_taken_minutes = time_taken
-        
-        # Calculate score
-        score = submission.calculate_score()
+        # Grade in memory against the cached answer key, then write the submission once
+        result = grade(get_answer_key(quiz), answers)
+        try:
+            with transaction.atomic():
+                submission = QuizSubmission.objects.create(
+                    quiz=quiz,
+                    user=user,
+                    answers=answers,
+                    score=result['score'],
+                    total_points=result['total_points'],
+                    time_taken_minutes=time_taken or None
+                )
+        except IntegrityError:
+            # unique_together (quiz, user)
+            return Response({'error': 'Quiz already submitted'}, status=400)
         
         return Response({
             'message': 'Quiz submitted successfully',
-            'score': score,
+            'score': result['score'] if result['score'] is not None else 0,
             'total_points': submission.total_points,
             'submission_id': submission.id
         })
@@ -3069,29 +2528,13 @@ def quiz_results(request, quiz_id):
     """Get quiz results for a specific quiz"""
     try:
         quiz = Quiz.objects.get(id=quiz_id)
-        submissions = QuizSubmission.objects.filter(quiz=quiz, user=request.user)
+        latest_submission = QuizSubmission.objects.filter(quiz=quiz, user=request.user).first()
         
-        if not submissions.exists():
+        if latest_submission is None:
             return Response({'message': 'No submissions found'})
         
-        latest_submission = submissions.first()
-        
         # Get detailed results
-        results = []
-        for question in quiz.questions.all():
-            user_answer = latest_submission.answers.get(str(question.id), '')
-            is_correct = question.validate_answer(user_answer)
-            
-            results.append({
-                'question_id': question.id,
-                'question_text': question.question_text,
-                'question_type': question.question_type,
-                'user_answer': user_answer,
-                'correct_answer': question.get_correct_answer(),
-                'is_correct': is_correct,
-                'points': question.points,
-                'explanation': question.explanation
-            })
+        results = question_results(get_answer_key(quiz), latest_submission.answers)
         
         return Response({
             'quiz_title': quiz.title,
@@ -3304,6 +2747,9 @@ class PostListCreateView(generics.ListCreateAPIView):
     queryset = Post.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        return feed_queryset(self.request.user, super().get_queryset())
+
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return PostCreateSerializer
@@ -3317,6 +2763,9 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        return feed_queryset(self.request.user, super().get_queryset())
+
     def perform_update(self, serializer):
         serializer.save(author=self.request.user)
 
@@ -3334,8 +2783,26 @@ def like_post(request, post_id):
     likes_count = post.likes.count()
     return Response({'is_liked': is_liked, 'likes_count': likes_count})
 
-@api_view(['POST'])
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticatedOrReadOnly])
 def comment_post(request, post_id):
+    if request.method == 'GET':
+        # "Load more" for the comments embedded in a post: ?cursor=<next_comments_cursor>&limit=
+        if not Post.objects.filter(id=post_id).exists():
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = int(request.GET.get('limit', 20))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            comments, next_cursor = comments_after(post_id, request.GET.get('cursor'), limit)
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'comments': CommentSerializer(comments, many=True).data,
+            'next_cursor': next_cursor
+        })
+
     post = Post.objects.get(id=post_id)
     serializer = CommentSerializer(data=request.data)
     
@@ -3529,7 +2996,6 @@ def delete_user_account(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # File Processing Views
-from .file_processor import FileProcessor
 from .models import ProcessedFile
 from .serializers import ProcessedFileSerializer, ProcessedFileCreateSerializer
 import os
@@ -3558,6 +3024,18 @@ class ProcessedFileDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return ProcessedFile.objects.filter(uploaded_by=self.request.user)
 
+def queue_file_processing(processed_file, priority=0):
+    """Enqueue extraction + summarization for a ProcessedFile and link the job to it"""
+    processed_file.processing_status = 'pending'
+    processed_file.processing_error = ''
+    processed_file.save(update_fields=['processing_status', 'processing_error'])
+    
+    job = enqueue('process_file', {'file_id': processed_file.id}, priority=priority)
+    ProcessedFile.objects.filter(id=processed_file.id).update(processing_job=job)
+    # Eager mode (JOBS_RUN_EAGERLY) has already processed the file by now
+    processed_file.refresh_from_db()
+    return job
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def upload_and_process_file(request):
@@ -3615,44 +3093,21 @@ def upload_and_process_file(request):
             context=context,
             uploaded_by=request.user,
             portfolio=portfolio,
-            processing_status='processing',
-            extracted_text='',  # Will be filled during processing
-            ai_summary=''  # Will be filled during processing
+            processing_status='pending',
+            extracted_text='',  # Will be filled by the background job
+            ai_summary=''  # Will be filled by the background job
         )
         
-        # Process the file
-        processor = FileProcessor()
-        result = processor.process_file_with_summary(uploaded_file, context)
-        
-        if result['success']:
-            # Update the ProcessedFile with results
-            processed_file.extracted_text = result['extraction']['text']
-            processed_file.ai_summary = result['summary']['summary']
-            processed_file.processing_status = 'completed'
-            processed_file.metadata = result['extraction']['metadata']
-            processed_file.word_count = result['extraction']['word_count']
-            processed_file.char_count = result['extraction']['char_count']
-            processed_file.processed_at = timezone.now()
-            processed_file.save()
-            
-            # Return success response
-            serializer = ProcessedFileSerializer(processed_file)
-            return Response({
-                'message': 'File processed successfully',
-                'file': serializer.data,
-                'status': 'success'
-            }, status=status.HTTP_201_CREATED)
-        else:
-            # Update with error
-            processed_file.processing_status = 'failed'
-            processed_file.processing_error = result.get('error', 'Unknown error')
-            processed_file.processed_at = timezone.now()
-            processed_file.save()
-            
-            return Response({
-                'error': f'File processing failed: {result.get("error", "Unknown error")}',
-                'status': 'error'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # Extraction and summarization run on the job worker, not in the request
+        queue_file_processing(processed_file, priority=10)
+        
+        serializer = ProcessedFileSerializer(processed_file)
+        return Response({
+            'message': 'File uploaded and queued for processing',
+            'file': serializer.data,
+            'status_url': f'/api/files/{processed_file.id}/status/',
+            'status': 'queued'
+        }, status=status.HTTP_202_ACCEPTED)
     
     except Exception as e:
         return Response({
@@ -3670,43 +3125,23 @@ def reprocess_file(request, file_id):
         # Get the file
         processed_file = ProcessedFile.objects.get(id=file_id, uploaded_by=request.user)
         
-        # Update status
-        processed_file.processing_status = 'processing'
-        processed_file.save()
-        
-        # Reprocess the file
-        processor = FileProcessor()
-        result = processor.process_file_with_summary(processed_file.original_file, processed_file.context)
-        
-        if result['success']:
-            # Update with new results
-            processed_file.extracted_text = result['extraction']['text']
-            processed_file.ai_summary = result['summary']['summary']
-            processed_file.processing_status = 'completed'
-            processed_file.metadata = result['extraction']['metadata']
-            processed_file.word_count = result['extraction']['word_count']
-            processed_file.char_count = result['extraction']['char_count']
-            processed_file.processed_at = timezone.now()
-            processed_file.processing_error = ''
-            processed_file.save()
-            
-            serializer = ProcessedFileSerializer(processed_file)
+        job = processed_file.processing_job
+        if job is not None and job.status in ['queued', 'running']:
             return Response({
-                'message': 'File reprocessed successfully',
-                'file': serializer.data,
-                'status': 'success'
-            }, status=status.HTTP_200_OK)
-        else:
-            # Update with error
-            processed_file.processing_status = 'failed'
-            processed_file.processing_error = result.get('error', 'Unknown error')
-            processed_file.processed_at = timezone.now()
-            processed_file.save()
-            
-            return Response({
-                'error': f'File reprocessing failed: {result.get("error", "Unknown error")}',
+                'error': 'File is already being processed',
+                'status_url': f'/api/files/{processed_file.id}/status/',
                 'status': 'error'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            }, status=status.HTTP_409_CONFLICT)
+        
+        queue_file_processing(processed_file)
+        
+        serializer = ProcessedFileSerializer(processed_file)
+        return Response({
+            'message': 'File queued for reprocessing',
+            'file': serializer.data,
+            'status_url': f'/api/files/{processed_file.id}/status/',
+            'status': 'queued'
+        }, status=status.HTTP_202_ACCEPTED)
     
     except ProcessedFile.DoesNotExist:
         return Response({
@@ -3719,6 +3154,39 @@ def reprocess_file(request, file_id):
             'status': 'error'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def processed_file_status(request, file_id):
+    """Lightweight processing status for polling after an upload or reprocess"""
+    processed_file = ProcessedFile.objects.filter(
+        id=file_id, uploaded_by=request.user
+    ).select_related('processing_job').only(
+        'id', 'processing_status', 'processing_error', 'processed_at', 'word_count',
+        'processing_job__status', 'processing_job__attempts', 'processing_job__max_attempts',
+        'processing_job__run_after'
+    ).first()
+    if processed_file is None:
+        return Response({
+            'error': 'File not found or access denied',
+            'status': 'error'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    job = processed_file.processing_job
+    return Response({
+        'id': processed_file.id,
+        'processing_status': processed_file.processing_status,
+        'processing_error': processed_file.processing_error,
+        'processed_at': processed_file.processed_at,
+        'word_count': processed_file.word_count,
+        'is_finished': processed_file.processing_status in ['completed', 'failed'],
+        'job': {
+            'status': job.status,
+            'attempts': job.attempts,
+            'max_attempts': job.max_attempts,
+            'next_attempt_at': job.run_after if job.status == 'queued' else None,
+        } if job else None
+    })
+
 # Document Views
 class DocumentListCreateView(generics.ListCreateAPIView):
     """List and create documents"""
@@ -3776,7 +3244,7 @@ class DocumentDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_documents(request):
-    """GET method to retrieve only the authenticated user's documents"""
+    """GET method to retrieve the authenticated user's documents, newest first, one keyset page at a time"""
     user = request.user
     
     # Get only documents uploaded by the current user
@@ -3795,13 +3263,13 @@ def user_documents(request):
     if portfolio_id:
         documents = documents.filter(portfolio_id=portfolio_id)
     
-    # Serialize the data
-    serializer = DocumentSerializer(documents, many=True, context={'request': request})
+    try:
+        page = request_page(request, documents)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    return Response({
-        'count': documents.count(),
-        'results': serializer.data
-    })
+    serializer = DocumentSerializer(page['rows'], many=True, context={'request': request})
+    return Response(page_payload(page, serializer.data))
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -3911,7 +3379,7 @@ class DocumentQuizDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_document_quizzes(request):
-    """GET method to retrieve all document quizzes for the authenticated user"""
+    """GET method to retrieve the authenticated user's document quizzes, one keyset page at a time"""
     quizzes = DocumentQuiz.objects.filter(user=request.user).order_by('-created_at')
     
     # Optional filtering by document
@@ -3924,11 +3392,13 @@ def user_document_quizzes(request):
     if topic:
         quizzes = quizzes.filter(topic__icontains=topic)
     
-    serializer = DocumentQuizSerializer(quizzes, many=True, context={'request': request})
-    return Response({
-        'count': quizzes.count(),
-        'results': serializer.data
-    })
+    try:
+        page = request_page(request, quizzes)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = DocumentQuizSerializer(page['rows'], many=True, context={'request': request})
+    return Response(page_payload(page, serializer.data))
 
 
 @api_view(['POST'])
@@ -3979,19 +3449,21 @@ class YouTubeVideoDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_youtube_videos(request):
-    """GET method to retrieve all learning resource links for the authenticated user"""
-    videos = YouTubeVideo.objects.filter(user=request.user).order_by('-created_at')
+    """GET method to retrieve the authenticated user's learning resource links, one keyset page at a time"""
+    videos = YouTubeVideo.objects.filter(user=request.user).select_related('user').order_by('-created_at')
     
     # Optional filtering by title
     title = request.GET.get('title')
     if title:
         videos = videos.filter(title__icontains=title)
     
-    serializer = YouTubeVideoSerializer(videos, many=True, context={'request': request})
-    return Response({
-        'count': videos.count(),
-        'results': serializer.data
-    })
+    try:
+        page = request_page(request, videos)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = YouTubeVideoSerializer(page['rows'], many=True, context={'request': request})
+    return Response(page_payload(page, serializer.data))
 
 
 @api_view(['POST'])
@@ -4015,26 +3487,24 @@ def create_youtube_video(request):
 
 
 @api_view(['GET'])
+@authentication_classes([])
 @permission_classes([permissions.AllowAny])
 def public_youtube_videos(request):
-    """GET method to retrieve all public learning resource links (no authentication required)"""
-    videos = YouTubeVideo.objects.all().order_by('-created_at')
-    
-    # Optional filtering by title
-    title = request.GET.get('title')
-    if title:
-        videos = videos.filter(title__icontains=title)
+    """
+    Public directory of learning resource links (no authentication required)
     
-    # Optional filtering by user
-    user_id = request.GET.get('user_id')
-    if user_id:
-        videos = videos.filter(user_id=user_id)
+    Keyset-paged cards, filterable by link_type, domain, title and user_id.
+    Pages are cached and publicly cacheable; If-None-Match gets a 304.
+    """
+    try:
+        payload, etag = directory_page(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = YouTubeVideoSerializer(videos, many=True, context={'request': request})
-    return Response({
-        'count': videos.count(),
-        'results': serializer.data
-    })
+    response = get_conditional_response(request, etag=etag) or Response(payload)
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=DIRECTORY_MAX_AGE)
+    return response
 
 
 # Calendar Event Views
@@ -4064,7 +3534,7 @@ class CalendarEventDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_calendar_events(request):
-    """GET method to retrieve all calendar events for the authenticated user"""
+    """GET method to page through the authenticated user's calendar events by due date"""
     events = CalendarEvent.objects.filter(user=request.user).order_by('due_date')
     
     # Optional filtering
@@ -4093,10 +3563,41 @@ def user_calendar_events(request):
     if class_id:
         events = events.filter(class_portfolio_id=class_id)
     
-    serializer = CalendarEventSerializer(events, many=True, context={'request': request})
+    # The nested serializers would otherwise query per event
+    events = events.select_related('user', 'class_portfolio__created_by').prefetch_related(
+        Prefetch('linked_resources', queryset=YouTubeVideo.objects.select_related('user'))
+    )
+    
+    try:
+        page = request_page(request, events)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = CalendarEventSerializer(page['rows'], many=True, context={'request': request})
+    return Response(page_payload(page, serializer.data))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def calendar_events_range(request):
+    """
+    Compact calendar events due in [start, end)
+    
+    start and end are required ISO 8601 dates or datetimes. Portfolios are
+    returned once under 'portfolios' and referenced from events by id.
+    """
+    try:
+        start_at, end_at = parse_range(request.GET.get('start'), request.GET.get('end'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    events = list(events_in_range(request.user, start_at, end_at, request.GET))
     return Response({
-        'count': events.count(),
-        'results': serializer.data
+        'start': start_at,
+        'end': end_at,
+        'count': len(events),
+        'results': CalendarEventCompactSerializer(events, many=True).data,
+        'portfolios': portfolio_refs(events)
     })
 
 
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -130,6 +131,7 @@ MONGODB_URI = config('MONGODB_URI', default='mongodb+srv://adminN:nSkTkOFijiEWfd
 MONGODB_DATABASE = config('MONGODB_DATABASE', default='hackwesttx_db')
 MONGODB_ENABLED = config('MONGODB_ENABLED', default=True, cast=bool)
 MONGODB_TIMEOUT = config('MONGODB_TIMEOUT', default=10, cast=int)  # Connection timeout in seconds
+MONGODB_MAX_POOL_SIZE = config('MONGODB_MAX_POOL_SIZE', default=50, cast=int)  # Connections per process (client is shared)
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -181,3 +183,77 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 # OpenAI API Key for file processing and summarization
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
+
+# Full-text search backend: 'postgres', 'sqlite' or 'basic' (empty picks one from the database engine)
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='')
+SEARCH_MAX_BODY_CHARS = config('SEARCH_MAX_BODY_CHARS', default=200000, cast=int)
+
+# Cache (per-process memory by default; point these at a shared cache such as
+# django.core.cache.backends.db.DatabaseCache or Redis when running several workers)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='hackwesttx-cache'),
+    }
+}
+FACET_CACHE_TIMEOUT = config('FACET_CACHE_TIMEOUT', default=300, cast=int)
+
+# Background jobs (api.jobs). Run `python manage.py run_jobs` next to the web server on the
+# same machine, since jobs read uploads from local disk (the Procfile and render.yaml start both);
+# JOBS_RUN_EAGERLY runs jobs inline during the request, which is handy for local development.
+JOBS_RUN_EAGERLY = config('JOBS_RUN_EAGERLY', default=False, cast=bool)
+JOBS_RETRY_BASE_SECONDS = config('JOBS_RETRY_BASE_SECONDS', default=30, cast=int)
+JOBS_STALE_AFTER_SECONDS = config('JOBS_STALE_AFTER_SECONDS', default=900, cast=int)
+
+# Content-addressed cache for text extraction and AI summaries (api.content_cache)
+CONTENT_CACHE_TTL_DAYS = config('CONTENT_CACHE_TTL_DAYS', default=30, cast=int)
+CONTENT_CACHE_MAX_ENTRIES = config('CONTENT_CACHE_MAX_ENTRIES', default=5000, cast=int)
+
+# PDF extraction budgets; PDF_EXTRACTION_WORKERS > 1 fans long documents out to a process pool
+PDF_MAX_PAGES = config('PDF_MAX_PAGES', default=1000, cast=int)
+PDF_MAX_TEXT_CHARS = config('PDF_MAX_TEXT_CHARS', default=5000000, cast=int)
+PDF_EXTRACTION_WORKERS = config('PDF_EXTRACTION_WORKERS', default=1, cast=int)
+PDF_PARALLEL_MIN_PAGES = config('PDF_PARALLEL_MIN_PAGES', default=40, cast=int)
+
+# Summaries: text longer than SUMMARY_CHUNK_CHARS is summarized in chunks, SUMMARY_WORKERS at a time
+SUMMARY_CHUNK_CHARS = config('SUMMARY_CHUNK_CHARS', default=12000, cast=int)
+SUMMARY_WORKERS = config('SUMMARY_WORKERS', default=4, cast=int)
+
+# Seconds generate-content waits for its concurrent AI calls before returning what finished (api.learning_content)
+LEARNING_CONTENT_DEADLINE = config('LEARNING_CONTENT_DEADLINE', default=60, cast=float)
+
+# OpenAI gateway (api.llm_gateway): per-minute budgets shared by every worker through the database
+# (0 disables a limit), how long a call may wait for budget, and how long responses stay cached
+LLM_REQUESTS_PER_MINUTE = config('LLM_REQUESTS_PER_MINUTE', default=300, cast=int)
+LLM_TOKENS_PER_MINUTE = config('LLM_TOKENS_PER_MINUTE', default=90000, cast=int)
+LLM_RATE_LIMIT_WAIT = config('LLM_RATE_LIMIT_WAIT', default=30, cast=float)
+LLM_CACHE_TTL_DAYS = config('LLM_CACHE_TTL_DAYS', default=7, cast=int)
+
+# Request metrics (api.metrics): each worker writes a snapshot to METRICS_DIR every
+# METRICS_FLUSH_INTERVAL seconds so /api/performance/metrics/ and /api/metrics/ cover all workers
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=int)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Quiz answer keys are cached per quiz version (api.quiz_scoring); editing a question starts a new version
+QUIZ_ANSWER_KEY_TIMEOUT = config('QUIZ_ANSWER_KEY_TIMEOUT', default=3600, cast=int)
+
+# Portfolio preview snapshots (api.snapshots): rebuilt by the job worker SNAPSHOT_REBUILD_DELAY seconds
+# after the last content change, and cached for SNAPSHOT_CACHE_TIMEOUT seconds per version
+SNAPSHOT_CACHE_TIMEOUT = config('SNAPSHOT_CACHE_TIMEOUT', default=3600, cast=int)
+SNAPSHOT_REBUILD_DELAY = config('SNAPSHOT_REBUILD_DELAY', default=5, cast=int)
+
+# Portfolio detail embeds this many rows of each nested collection; the rest are paged by cursor
+PORTFOLIO_DETAIL_PAGE_SIZE = config('PORTFOLIO_DETAIL_PAGE_SIZE', default=20, cast=int)
+
+# Widest window /api/calendar-events/range/ serves in one request
+CALENDAR_MAX_RANGE_DAYS = config('CALENDAR_MAX_RANGE_DAYS', default=366, cast=int)
+
+# Keyset-paginated list endpoints (api.pagination): default page size, and how far ?total=estimate counts
+KEYSET_PAGE_SIZE = config('KEYSET_PAGE_SIZE', default=20, cast=int)
+KEYSET_ESTIMATE_CAP = config('KEYSET_ESTIMATE_CAP', default=1000, cast=int)
+
+# Public learning-link directory (api.link_directory): server-side page cache and client Cache-Control max-age
+LINK_DIRECTORY_CACHE_TIMEOUT = config('LINK_DIRECTORY_CACHE_TIMEOUT', default=300, cast=int)
+LINK_DIRECTORY_MAX_AGE = config('LINK_DIRECTORY_MAX_AGE', default=60, cast=int)